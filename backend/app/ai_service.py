@@ -1,46 +1,321 @@
-"""AI Service for generating artwork interpretations using Google Gemini API.
+"""AI Service for generating artwork interpretations.
 
 This service encapsulates all AI interaction logic, providing curator-style
 interpretations of artworks with strict boundaries on what the AI can say.
+Text comes from the provider selected with ``AI_PROVIDER`` (Gemini or a
+local stub).
 """
 
+import asyncio
+import hashlib
 import os
+import threading
+import time
+from enum import Enum
+from typing import Protocol
 
-import httpx
 from dotenv import load_dotenv
-from google import genai
-from google.genai import types
 
+from app.cassettes import CassetteProvider, cassette
+from app.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.downloads import ByteBudget, ImageTooLargeError, Lease, NotAnImageError, read_image
+from app.lazy import LazyModule
 from app.models import Artwork
+from app.prompts import PromptTemplate, get_prompt
+from app.usage import Generation, Usage, UsageLog, usage_log
+
+httpx = LazyModule("httpx")
+genai = LazyModule("google.genai")
+types = LazyModule("google.genai.types")
 
 # Load environment variables
 load_dotenv()
 
+DEFAULT_GEMINI_MODEL = "gemini-2.0-flash-lite"
 
-class AIService:
-    """Service for generating AI interpretations of artworks using Google Gemini.
+# Upper bounds on how long one interpretation request may wait on upstreams
+IMAGE_TIMEOUT_SECONDS = 10.0
+GENERATION_TIMEOUT_SECONDS = float(os.getenv("AI_GENERATION_TIMEOUT", "20"))
+
+# Largest image sent to the provider; Gemini rejects requests with more
+# than 20 MB of inline data anyway
+IMAGE_MAX_BYTES = int(os.getenv("AI_IMAGE_MAX_BYTES", str(20 * 1024 * 1024)))
+# Image bytes all requests in this process may hold at once
+IMAGE_MEMORY_BYTES = int(os.getenv("AI_IMAGE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+
+# Parallel provider calls per batch request; keeps a "read all notes" view
+# from bursting through the provider's rate limit
+BATCH_CONCURRENCY = int(os.getenv("AI_BATCH_CONCURRENCY", "4"))
+
+# What Gemini bills for one image of up to 384x384 pixels; the stub provider
+# reports it so offline usage reports look like real ones
+STUB_IMAGE_TOKENS = 258
+
+
+class InterpretationErrorCode(Enum):
+    """Why an interpretation could not be generated."""
+
+    CIRCUIT_OPEN = "CIRCUIT_OPEN"
+    TIMEOUT = "TIMEOUT"
+    IMAGE_FETCH_FAILED = "IMAGE_FETCH_FAILED"
+    IMAGE_TOO_LARGE = "IMAGE_TOO_LARGE"
+    GENERATION_FAILED = "GENERATION_FAILED"
+    ARTWORK_NOT_FOUND = "ARTWORK_NOT_FOUND"
 
-    The AI acts as a curator providing observational notes about artworks,
-    focusing on visual elements (color, composition, mood, texture) without
-    inventing facts or claiming authority.
+
+class InterpretationError(Exception):
+    """An interpretation failed; ``code`` says why."""
+
+    def __init__(self, message: str, code: InterpretationErrorCode):
+        super().__init__(message)
+        self.code = code
+
+
+# Shared by every AIService instance so failures seen by one request protect
+# the next. Slow successes count as failures, so a degraded upstream trips
+# the breaker before it ties up every worker.
+default_image_breaker = CircuitBreaker("images", slow_call_seconds=5.0)
+default_generation_breaker = CircuitBreaker("ai_generation", slow_call_seconds=10.0)
+# Shared for the same reason: memory is per process, not per request
+image_budget = ByteBudget(IMAGE_MEMORY_BYTES)
+
+
+class AIProvider(Protocol):
+    """Backend that turns an image and a prompt into interpretation text."""
+
+    name: str
+
+    async def generate(self, image_bytes: bytes, mime_type: str, prompt: str) -> Generation:
+        """Generate text for the given image and prompt."""
+        ...
+
+
+class GeminiProvider:
+    """Provider backed by the Google Gemini API.
 
     Attributes:
         client: Initialized Google Gemini API client
+        model: Gemini model name used for generation
     """
 
-    def __init__(self):
-        """Initialize the AI service with Gemini API client.
+    name = "gemini"
+
+    def __init__(self, api_key: str | None = None, model: str | None = None):
+        """Initialize the Gemini API client.
+
+        Args:
+            api_key: Gemini API key; defaults to the GEMINI_API_KEY variable
+            model: Model name; defaults to GEMINI_MODEL or gemini-2.0-flash-lite
 
         Raises:
-            ValueError: If GEMINI_API_KEY environment variable is not set
+            ValueError: If no API key is provided or configured
         """
-        api_key = os.getenv("GEMINI_API_KEY")
+        api_key = api_key or os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise ValueError(
                 "GEMINI_API_KEY environment variable not set. "
                 "Please add your API key to the .env file."
             )
         self.client = genai.Client(api_key=api_key)
+        self.model = model or os.getenv("GEMINI_MODEL", DEFAULT_GEMINI_MODEL)
+
+    async def generate(self, image_bytes: bytes, mime_type: str, prompt: str) -> Generation:
+        # Build multimodal content: image + text prompt
+        contents = [
+            types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
+            prompt,
+        ]
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=contents,
+            config=types.GenerateContentConfig(
+                temperature=0.7,  # Creative but not random
+                max_output_tokens=200,  # Keep responses concise (1-2 paragraphs)
+            ),
+        )
+        return Generation(response.text, self.model, gemini_usage(response.usage_metadata))
+
+
+def gemini_usage(metadata) -> Usage | None:
+    """Token counts from a Gemini response's ``usage_metadata``, if present."""
+    if metadata is None:
+        return None
+    input_tokens = int(metadata.prompt_token_count or 0)
+    output_tokens = int(metadata.candidates_token_count or 0)
+    # The total also counts tokens a thinking model spent before answering
+    total_tokens = int(metadata.total_token_count or input_tokens + output_tokens)
+    return Usage(input_tokens, output_tokens, total_tokens)
+
+
+class StubProvider:
+    """Deterministic local provider that never leaves the process.
+
+    The same image and prompt always produce the same note, assembled from
+    fixed phrases picked by a hash of the inputs. An optional latency
+    simulates a remote model for load testing. Reported usage is a rough
+    estimate in Gemini's terms: one small image plus four characters of
+    text per token.
+
+    Attributes:
+        latency: Seconds to sleep before answering
+    """
+
+    name = "stub"
+
+    PALETTES = (
+        "muted ochres and soft greys",
+        "cool blues washed against warm sand tones",
+        "deep greens broken by patches of pale light",
+        "warm terracotta set against a quiet sky",
+    )
+    COMPOSITIONS = (
+        "a low horizon that leaves room for the sky",
+        "strong diagonals that pull the eye inward",
+        "a balanced arrangement of simple geometric shapes",
+        "layered planes receding gently into the distance",
+    )
+    MOODS = ("calm", "contemplative", "sunlit", "hushed")
+
+    def __init__(self, latency: float | None = None):
+        if latency is None:
+            latency = float(os.getenv("AI_STUB_LATENCY", "0"))
+        self.latency = latency
+
+    async def generate(self, image_bytes: bytes, mime_type: str, prompt: str) -> Generation:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        digest = hashlib.sha256(image_bytes + prompt.encode()).digest()
+        palette = self.PALETTES[digest[0] % len(self.PALETTES)]
+        composition = self.COMPOSITIONS[digest[1] % len(self.COMPOSITIONS)]
+        mood = self.MOODS[digest[2] % len(self.MOODS)]
+        text = (
+            f"The artist works with {palette}, built around {composition}. "
+            f"The overall mood feels {mood}, inviting a slower second look."
+        )
+        input_tokens = STUB_IMAGE_TOKENS + len(prompt) // 4
+        output_tokens = len(text) // 4
+        return Generation(
+            text, self.name, Usage(input_tokens, output_tokens, input_tokens + output_tokens)
+        )
+
+
+PROVIDERS: dict[str, type[AIProvider]] = {
+    GeminiProvider.name: GeminiProvider,
+    StubProvider.name: StubProvider,
+}
+
+
+def create_provider(name: str | None = None) -> AIProvider:
+    """Create the AI provider selected by name or the AI_PROVIDER variable.
+
+    Args:
+        name: Provider name ("gemini" or "stub"); defaults to AI_PROVIDER,
+            falling back to "gemini"
+
+    Raises:
+        ValueError: If the provider name is unknown or the provider is
+            misconfigured (e.g. missing Gemini API key)
+    """
+    name = name or os.getenv("AI_PROVIDER", GeminiProvider.name)
+    try:
+        provider_class = PROVIDERS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown AI provider {name!r}. Choose one of: {', '.join(PROVIDERS)}"
+        ) from None
+    if cassette.active:
+        # Records the provider's answers, or replays them without creating it
+        return CassetteProvider(cassette, provider_class.name, provider_class)
+    return provider_class()
+
+
+# Shared by every AIService without an injected provider, so the Gemini
+# client is created once per process rather than once per request
+_default_provider: AIProvider | None = None
+_default_provider_lock = threading.Lock()
+
+
+def get_default_provider() -> AIProvider:
+    """The provider selected by AI_PROVIDER, created on first call.
+
+    Raises:
+        ValueError: If the configured provider cannot be created; the next
+            call tries again
+    """
+    global _default_provider
+    if _default_provider is None:
+        with _default_provider_lock:
+            if _default_provider is None:
+                _default_provider = create_provider()
+    return _default_provider
+
+
+def reset_default_provider() -> None:
+    """Forget the shared provider; the next call creates it from the current config."""
+    global _default_provider
+    with _default_provider_lock:
+        _default_provider = None
+
+
+class AIService:
+    """Service for generating AI interpretations of artworks.
+
+    The AI acts as a curator providing observational notes about artworks,
+    focusing on visual elements (color, composition, mood, texture) without
+    inventing facts or claiming authority.
+
+    Constructing the service is cheap: the default provider is shared by
+    every service in the process and only created the first time an
+    interpretation is requested, so requests that never touch the AI path
+    never pay for (or fail on) provider setup.
+    """
+
+    def __init__(
+        self,
+        provider: AIProvider | None = None,
+        image_breaker: CircuitBreaker | None = None,
+        generation_breaker: CircuitBreaker | None = None,
+        prompt: PromptTemplate | None = None,
+        budget: ByteBudget | None = None,
+        usage: UsageLog | None = None,
+    ):
+        """Initialize the AI service.
+
+        Args:
+            provider: Provider to generate text with; defaults to the shared
+                ``get_default_provider()``
+            image_breaker: Breaker guarding image downloads; defaults to the
+                process-wide ``default_image_breaker``
+            generation_breaker: Breaker guarding the provider; defaults to the
+                process-wide ``default_generation_breaker``
+            prompt: Prompt template; defaults to the version selected by
+                PROMPT_VERSION
+            budget: Byte budget image downloads reserve from; defaults to
+                the process-wide ``image_budget``
+            usage: Log every provider call is recorded in; defaults to the
+                process-wide ``usage_log``
+
+        Raises:
+            ValueError: If PROMPT_VERSION names an unknown prompt version
+        """
+        self._provider = provider
+        self.image_breaker = image_breaker or default_image_breaker
+        self.generation_breaker = generation_breaker or default_generation_breaker
+        self.prompt = prompt or get_prompt()
+        self.budget = budget or image_budget
+        self.usage = usage or usage_log
+
+    @property
+    def provider(self) -> AIProvider:
+        """The AI provider; the shared default unless one was injected.
+
+        Raises:
+            ValueError: If the configured provider cannot be created
+        """
+        if self._provider is None:
+            self._provider = get_default_provider()
+        return self._provider
 
     async def interpret_artwork(self, artwork: Artwork) -> str:
         """Generate an AI interpretation for an artwork.
@@ -60,62 +335,218 @@ class AIService:
             A string containing the AI-generated interpretation (1-2 paragraphs)
 
         Raises:
-            Exception: If the API call fails (network error, rate limit, etc.)
-            httpx.HTTPError: If image fetching fails
+            ValueError: If the configured provider cannot be created
+            InterpretationError: If the image fetch or the API call fails, times
+                out, or is rejected because its circuit breaker is open
         """
         prompt_text = self._build_prompt(artwork)
+        # Resolve the provider first so misconfiguration fails before the image fetch
+        provider = self.provider
+
+        async with self.budget.lease() as lease:
+            async with httpx.AsyncClient(transport=cassette.transport()) as http_client:
+                image_bytes, mime_type = await self._fetch_image(
+                    http_client, artwork.image_url, lease
+                )
+            return await self._generate(provider, artwork, image_bytes, mime_type, prompt_text)
+
+    async def interpret_artworks(
+        self, artworks: list[Artwork], max_concurrency: int | None = None
+    ) -> list[str | InterpretationError]:
+        """Generate interpretations for several artworks at once.
+
+        All images are downloaded concurrently over one shared HTTP client,
+        as far as the image budget allows; provider calls are then fanned
+        out with at most ``max_concurrency`` in flight. Each artwork gets its
+        own request so every note is grounded in a single image.
+
+        Args:
+            artworks: Artwork model instances to interpret
+            max_concurrency: Parallel provider calls; defaults to
+                AI_BATCH_CONCURRENCY (4)
+
+        Returns:
+            One entry per artwork, in order: the interpretation text, or the
+            InterpretationError that prevented it
 
-        # Fetch the artwork image from URL
-        async with httpx.AsyncClient() as http_client:
+        Raises:
+            ValueError: If the configured provider cannot be created
+        """
+        provider = self.provider
+        semaphore = asyncio.Semaphore(max_concurrency or BATCH_CONCURRENCY)
+
+        async def interpret(http_client: "httpx.AsyncClient", artwork: Artwork):
             try:
-                image_response = await http_client.get(artwork.image_url, timeout=10.0)
-                image_response.raise_for_status()
-                image_bytes = image_response.content
+                async with self.budget.lease() as lease:
+                    image_bytes, mime_type = await self._fetch_image(
+                        http_client, artwork.image_url, lease
+                    )
+                    async with semaphore:
+                        return await self._generate(
+                            provider, artwork, image_bytes, mime_type, self._build_prompt(artwork)
+                        )
+            except InterpretationError as e:
+                return e
+
+        async with httpx.AsyncClient(transport=cassette.transport()) as http_client:
+            return list(
+                await asyncio.gather(*(interpret(http_client, artwork) for artwork in artworks))
+            )
 
-                # Detect MIME type from Content-Type header, fallback to jpeg
-                mime_type = image_response.headers.get("content-type", "image/jpeg")
+    async def _fetch_image(
+        self, http_client: "httpx.AsyncClient", image_url: str, lease: Lease
+    ) -> tuple[bytes, str]:
+        """Download an artwork image through the image circuit breaker.
 
-            except httpx.HTTPError as e:
-                raise Exception(
-                    f"Failed to fetch artwork image from {artwork.image_url}: {str(e)}"
-                ) from e
+        Args:
+            http_client: Client to download with
+            image_url: The artwork's image URL
+            lease: Holds the image's share of the budget; the caller keeps
+                it until the bytes are no longer needed
 
-        # Build multimodal content: image + text prompt
-        contents = [
-            types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
-            prompt_text,
-        ]
+        Returns:
+            The image bytes and their MIME type, sniffed from the bytes
 
+        Raises:
+            InterpretationError: If the download fails, times out, is too
+                large or not an image, or the circuit is open
+        """
         try:
-            response = await self.client.aio.models.generate_content(
-                model="gemini-2.0-flash-lite",
-                contents=contents,
-                config=types.GenerateContentConfig(
-                    temperature=0.7,  # Creative but not random
-                    max_output_tokens=200,  # Keep responses concise (1-2 paragraphs)
-                ),
+            return await self.image_breaker.call(
+                self._download_image, http_client, image_url, lease
+            )
+        except CircuitOpenError as e:
+            raise InterpretationError(
+                f"Image host unavailable: {e}", InterpretationErrorCode.CIRCUIT_OPEN
+            ) from e
+
+    async def _download_image(
+        self, http_client: "httpx.AsyncClient", image_url: str, lease: Lease
+    ) -> tuple[bytes, str]:
+        try:
+            async with http_client.stream(
+                "GET", image_url, timeout=IMAGE_TIMEOUT_SECONDS
+            ) as image_response:
+                image_response.raise_for_status()
+                return await read_image(image_response, IMAGE_MAX_BYTES, lease)
+        except ImageTooLargeError as e:
+            raise InterpretationError(
+                f"Artwork image at {image_url} is too large: {e}",
+                InterpretationErrorCode.IMAGE_TOO_LARGE,
+            ) from e
+        except NotAnImageError as e:
+            raise InterpretationError(
+                f"Failed to fetch artwork image from {image_url}: {e}",
+                InterpretationErrorCode.IMAGE_FETCH_FAILED,
+            ) from e
+        except httpx.HTTPError as e:
+            code = (
+                InterpretationErrorCode.TIMEOUT
+                if isinstance(e, httpx.TimeoutException)
+                else InterpretationErrorCode.IMAGE_FETCH_FAILED
+            )
+            raise InterpretationError(
+                f"Failed to fetch artwork image from {image_url}: {str(e)}", code
+            ) from e
+
+    async def _generate(
+        self,
+        provider: AIProvider,
+        artwork: Artwork,
+        image_bytes: bytes,
+        mime_type: str,
+        prompt_text: str,
+    ) -> str:
+        """Call the provider through the generation circuit breaker.
+
+        Every call that reaches the provider is recorded in the usage log,
+        failed ones included.
+
+        Raises:
+            InterpretationError: If generation fails, times out, returns
+                nothing or the circuit is open
+        """
+        started = time.perf_counter()
+        generation = None
+        try:
+            generation = await self.generation_breaker.call(
+                provider.generate,
+                image_bytes,
+                mime_type,
+                prompt_text,
+                timeout=GENERATION_TIMEOUT_SECONDS,
             )
 
             # Ensure we have text content in the response
-            if not response.text:
+            if not generation.text:
                 raise Exception("AI service returned empty response")
 
-            return response.text
-
+            self._record_call(provider, artwork, image_bytes, started, generation)
+            return generation.text
+
+        except CircuitOpenError as e:
+            # Rejected before reaching the provider, so nothing to record
+            raise InterpretationError(
+                f"AI provider unavailable: {e}", InterpretationErrorCode.CIRCUIT_OPEN
+            ) from e
+        except TimeoutError as e:
+            self._record_call(
+                provider, artwork, image_bytes, started, error=InterpretationErrorCode.TIMEOUT
+            )
+            raise InterpretationError(
+                f"AI provider did not answer within {GENERATION_TIMEOUT_SECONDS}s",
+                InterpretationErrorCode.TIMEOUT,
+            ) from e
         except Exception as e:
+            self._record_call(
+                provider,
+                artwork,
+                image_bytes,
+                started,
+                generation,
+                error=InterpretationErrorCode.GENERATION_FAILED,
+            )
             # Re-raise with more context for debugging
-            raise Exception(f"Failed to generate AI interpretation: {str(e)}") from e
+            raise InterpretationError(
+                f"Failed to generate AI interpretation: {str(e)}",
+                InterpretationErrorCode.GENERATION_FAILED,
+            ) from e
+
+    def _record_call(
+        self,
+        provider: AIProvider,
+        artwork: Artwork,
+        image_bytes: bytes,
+        started: float,
+        generation: Generation | None = None,
+        error: InterpretationErrorCode | None = None,
+    ) -> None:
+        """Record one provider call and what it consumed in the usage log."""
+        self.usage.record(
+            artwork_id=artwork.id,
+            provider=provider.name,
+            model=generation.model if generation else getattr(provider, "model", None),
+            prompt_version=self.prompt.version,
+            prompt_hash=self.prompt.hash,
+            usage=generation.usage if generation else None,
+            image_bytes=len(image_bytes),
+            latency_ms=(time.perf_counter() - started) * 1000,
+            error_code=error.value if error else None,
+        )
 
     def _build_prompt(self, artwork: Artwork) -> str:
         """Construct the prompt for the AI interpretation.
 
         The prompt includes:
         - Role setting (curator writing a gallery note)
-        - Artwork metadata (title, artist)
+        - Artwork metadata (title)
         - Focus areas (color, composition, mood, texture)
         - Hard boundaries (no invented facts, interpretation only)
         - Tone guidance (third person, poetic but restrained)
 
+        The text comes from the versioned template in ``self.prompt`` (see
+        ``app/prompts.py``).
+
         Note: The artwork image is provided separately via multimodal input,
         so the AI can base its interpretation on what it actually sees.
 
@@ -125,36 +556,4 @@ class AIService:
         Returns:
             Formatted prompt string for the AI
         """
-        # Note: This is the initial prompt design. It will likely be refined
-        # based on user feedback during Step 4 (Manual Testing & Calibration).
-        #
-        # Prompt engineering considerations:
-        # - Third person is enforced to avoid conversational tone
-        # - "Based on what you see" emphasizes visual grounding
-        # - "Observed, not factual" guides AI away from claiming material knowledge
-        # - "Poetic language sparingly" prevents overwrought prose
-        # - Explicit length constraint (1-2 paragraphs)
-
-        return f"""You are writing a curator's note for an art gallery visitor.
-Write a brief, observational interpretation of this artwork based on what you see in the image.
-
-Artwork: "{artwork.title}"
-
-Focus on what you observe in the image:
-- Colors and palette
-- Composition and structure
-- Mood and emotional tone
-- Texture and technique (visual observation only)
-
-Constraints:
-- Write in third person
-- Always refer to the creator as "the artist" (never by name)
-- Do not mention the title of the artwork.
-- 1-2 paragraphs maximum
-- Base your interpretation only on what you can see in the image
-- Do not invent facts (dates, materials, provenance, artist intent)
-- Offer interpretation only, not assertions
-- Use poetic language sparingly - avoid overwrought or gushy prose
-- Avoid art world jargon unless essential
-
-Write the curator's note:"""
+        return self.prompt.render(artwork)
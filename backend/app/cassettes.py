@@ -0,0 +1,316 @@
+"""Record upstream calls once and replay them offline, with their timing.
+
+The unit tests mock Gemini, the image host and Cloudinary away, so nothing
+exercises the real payloads and latencies of the AI and seed paths. A
+cassette records those exchanges at the points where the application
+already talks to upstreams:
+
+- Image downloads (``AIService``, the similarity index) through httpx, via
+  ``CassetteTransport``
+- AI provider calls via ``CassetteProvider``, which wraps the provider
+  selected by ``AI_PROVIDER`` (the Gemini SDK's own HTTP client cannot be
+  swapped in the pinned SDK version, so calls are recorded per provider
+  call rather than per HTTP request)
+- The Cloudinary resource listing in ``app/seed.py``, via ``Cassette.call``
+
+``CASSETTE_MODE=record`` passes calls through and stores each one with the
+time it took. ``CASSETTE_MODE=replay`` answers from the cassette without
+touching the network, after sleeping for the recorded time multiplied by
+``CASSETTE_TIME_SCALE`` (1 for the original timing, 0 for none). Requests
+that were recorded several times are replayed in recorded order, starting
+over when they run out, so repeated generations still vary. A request that
+was never recorded raises ``CassetteMissError``.
+
+A cassette is a directory (``CASSETTE_DIR``): ``index.json`` lists the
+exchanges, and response bodies are stored once each under ``bodies/``,
+named by their SHA-256. Only request shapes (URLs, sizes, parameters) are
+kept; credentials never reach the cassette. Recording adds to an
+existing cassette, so remove the directory to start afresh. Record with
+``make record`` and commit the directory to replay it anywhere.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, TypeVar
+
+from app.lazy import LazyModule
+from app.usage import Generation, Usage
+
+httpx = LazyModule("httpx")
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")
+CASSETTE_DIR = os.getenv("CASSETTE_DIR", "./cassettes/default")
+CASSETTE_TIME_SCALE = float(os.getenv("CASSETTE_TIME_SCALE", "1"))
+MODES = ("off", "record", "replay")
+INDEX_VERSION = 1
+# Response headers that describe the transfer rather than the body, which
+# is stored decoded
+TRANSFER_HEADERS = frozenset(
+    {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+)
+
+
+class CassetteMissError(Exception):
+    """A replayed request was never recorded."""
+
+
+def digest(*parts: str | bytes) -> str:
+    """SHA-256 over the parts, each length-prefixed so boundaries count."""
+    hasher = hashlib.sha256()
+    for part in parts:
+        data = part.encode() if isinstance(part, str) else part
+        hasher.update(len(data).to_bytes(8, "big"))
+        hasher.update(data)
+    return hasher.hexdigest()
+
+
+class Cassette:
+    """Recorded upstream exchanges, keyed by kind and request.
+
+    Attributes:
+        mode: "off", "record" or "replay"
+        directory: Where the index and bodies are stored
+        time_scale: Multiplier applied to recorded durations on replay
+    """
+
+    def __init__(self, directory: str | Path, mode: str = "off", time_scale: float = 1.0):
+        self._lock = threading.Lock()
+        self.open(directory, mode, time_scale)
+
+    def open(self, directory: str | Path, mode: str, time_scale: float = 1.0) -> None:
+        """Switch to another cassette or mode, loading its recorded exchanges.
+
+        Raises:
+            ValueError: If ``mode`` is unknown
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}. Choose one of: {', '.join(MODES)}")
+        with self._lock:
+            self.mode = mode
+            self.directory = Path(directory)
+            self.time_scale = time_scale
+            self._entries: dict[tuple[str, str], list[dict]] = {}
+            self._cursors: dict[tuple[str, str], int] = {}
+            if mode != "off":
+                self._load()
+
+    @property
+    def active(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def transport(self) -> "CassetteTransport | None":
+        """An httpx transport that records or replays, or None when off."""
+        return CassetteTransport(self) if self.active else None
+
+    def call(self, kind: str, request: dict, func: Callable[[], T]) -> T:
+        """Run a synchronous upstream call through the cassette.
+
+        Args:
+            kind: Name of the upstream operation
+            request: JSON-serializable parameters identifying the call
+            func: Makes the call; its result must be JSON-serializable
+        """
+        if self.mode == "off":
+            return func()
+        key = json.dumps(request, sort_keys=True)
+        if self.mode == "replay":
+            entry = self.next(kind, key)
+            time.sleep(entry["elapsed"] * self.time_scale)
+            return entry["response"]["result"]
+        started = time.perf_counter()
+        result = func()
+        self.record(kind, key, request, {"result": result}, time.perf_counter() - started)
+        return result
+
+    def next(self, kind: str, key: str) -> dict:
+        """The next recorded exchange for a request, cycling through repeats.
+
+        Raises:
+            CassetteMissError: If the request was never recorded
+        """
+        with self._lock:
+            entries = self._entries.get((kind, key))
+            if not entries:
+                raise CassetteMissError(f"No recorded {kind} for {key} in {self.directory}")
+            cursor = self._cursors.get((kind, key), 0)
+            self._cursors[(kind, key)] = cursor + 1
+            return entries[cursor % len(entries)]
+
+    def record(self, kind: str, key: str, request: dict, response: dict, elapsed: float) -> None:
+        """Store one exchange and rewrite the index."""
+        entry = {
+            "kind": kind,
+            "key": key,
+            "request": request,
+            "response": response,
+            "elapsed": round(elapsed, 6),
+        }
+        with self._lock:
+            self._entries.setdefault((kind, key), []).append(entry)
+            self._save()
+        logger.debug("Recorded %s %s in %.3fs", kind, key, elapsed)
+
+    def store_body(self, body: bytes) -> str:
+        """Write a response body once and return its name."""
+        name = hashlib.sha256(body).hexdigest()
+        path = self.directory / "bodies" / name
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix(".tmp")
+            temporary.write_bytes(body)
+            temporary.replace(path)
+        return name
+
+    def load_body(self, name: str) -> bytes:
+        return (self.directory / "bodies" / name).read_bytes()
+
+    def _load(self) -> None:
+        path = self.directory / "index.json"
+        if not path.exists():
+            return
+        index = json.loads(path.read_text())
+        for entry in index["entries"]:
+            self._entries.setdefault((entry["kind"], entry["key"]), []).append(entry)
+
+    def _save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = [entry for group in self._entries.values() for entry in group]
+        path = self.directory / "index.json"
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps({"version": INDEX_VERSION, "entries": entries}, indent=1))
+        temporary.replace(path)
+
+
+class CassetteTransport:
+    """httpx transport that records real responses or replays recorded ones.
+
+    Recording reads each response whole before returning it, so use it for
+    recording sessions only, not to serve traffic.
+    """
+
+    def __init__(self, cassette: Cassette, inner: "httpx.AsyncBaseTransport | None" = None):
+        self.cassette = cassette
+        self._inner = inner
+
+    async def handle_async_request(self, request: "httpx.Request") -> "httpx.Response":
+        key = f"{request.method} {request.url}"
+        if not self.cassette.recording:
+            entry = self.cassette.next("http", key)
+            await asyncio.sleep(entry["elapsed"] * self.cassette.time_scale)
+            stored = entry["response"]
+            body = self.cassette.load_body(stored["body"]) if stored["body"] else b""
+            return httpx.Response(stored["status"], headers=stored["headers"], content=body)
+
+        if self._inner is None:
+            self._inner = httpx.AsyncHTTPTransport()
+        started = time.perf_counter()
+        response = await self._inner.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        elapsed = time.perf_counter() - started
+        headers = [
+            [name, value]
+            for name, value in response.headers.items()
+            if name.lower() not in TRANSFER_HEADERS
+        ]
+        self.cassette.record(
+            "http",
+            key,
+            {"method": request.method, "url": str(request.url)},
+            {
+                "status": response.status_code,
+                "headers": headers,
+                "body": self.cassette.store_body(body) if body else None,
+                "size": len(body),
+            },
+            elapsed,
+        )
+        return httpx.Response(response.status_code, headers=headers, content=body)
+
+    async def aclose(self) -> None:
+        if self._inner is not None:
+            await self._inner.aclose()
+
+    # httpx.AsyncClient enters and exits its transport
+    async def __aenter__(self) -> "CassetteTransport":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+
+class CassetteProvider:
+    """AI provider that records another provider's answers or replays them.
+
+    Exchanges are keyed by provider, MIME type, prompt and image content,
+    and store the model and token usage with the text. In replay mode the
+    real provider is never created, so no API key is needed.
+    """
+
+    def __init__(self, cassette: Cassette, name: str, factory: Callable[[], Any]):
+        """Create the provider.
+
+        Args:
+            cassette: Where exchanges are recorded or replayed from
+            name: Name of the wrapped provider, reported as this one's
+            factory: Creates the wrapped provider (only when recording)
+        """
+        self.cassette = cassette
+        self.name = name
+        self._inner = factory() if cassette.recording else None
+
+    async def generate(self, image_bytes: bytes, mime_type: str, prompt: str) -> Generation:
+        key = digest(self.name, mime_type, prompt, image_bytes)
+        if not self.cassette.recording:
+            entry = self.cassette.next("generate", key)
+            await asyncio.sleep(entry["elapsed"] * self.cassette.time_scale)
+            stored = entry["response"]
+            usage = Usage(**stored["usage"]) if stored.get("usage") else None
+            return Generation(stored["text"], stored.get("model"), usage)
+
+        started = time.perf_counter()
+        generation = await self._inner.generate(image_bytes, mime_type, prompt)
+        self.cassette.record(
+            "generate",
+            key,
+            {
+                "provider": self.name,
+                "model": getattr(self._inner, "model", None),
+                "mime_type": mime_type,
+                "image_bytes": len(image_bytes),
+                "image_sha256": hashlib.sha256(image_bytes).hexdigest(),
+                "prompt_sha256": hashlib.sha256(prompt.encode()).hexdigest(),
+                "prompt_chars": len(prompt),
+            },
+            {
+                "text": generation.text,
+                "model": generation.model,
+                "usage": asdict(generation.usage) if generation.usage else None,
+            },
+            time.perf_counter() - started,
+        )
+        return generation
+
+
+cassette = Cassette(CASSETTE_DIR, CASSETTE_MODE, CASSETTE_TIME_SCALE)
@@ -0,0 +1,151 @@
+"""Circuit breaker for calls to slow or failing upstream services.
+
+A breaker watches the outcome of recent calls. When too many of them fail
+(or take longer than the slow-call threshold), it opens and rejects calls
+immediately with ``CircuitOpenError`` instead of letting every request wait
+on a struggling upstream. After ``reset_timeout`` seconds it lets a single
+probe call through (half-open); the probe's outcome closes or reopens it.
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Trip on error rate or latency and fail fast while the upstream recovers.
+
+    Attributes:
+        name: Upstream name, used in error messages
+        window_size: Number of recent calls considered for the failure rate
+        min_calls: Calls required in the window before the breaker can trip
+        failure_rate_threshold: Fraction of failed calls that opens the circuit
+        slow_call_seconds: Successful calls slower than this count as failures
+        reset_timeout: Seconds to stay open before allowing a probe call
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        window_size: int = 20,
+        min_calls: int = 5,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float | None = None,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.reset()
+
+    def reset(self) -> None:
+        """Close the circuit and forget all recorded calls."""
+        self._outcomes: deque[bool] = deque(maxlen=self.window_size)
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half_open"."""
+        if self._opened_at is None:
+            return CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    async def call(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args,
+        timeout: float | None = None,
+        **kwargs,
+    ) -> T:
+        """Run ``func`` through the breaker.
+
+        Args:
+            func: Coroutine function to call
+            timeout: Optional limit in seconds; exceeding it counts as a failure
+                and raises ``asyncio.TimeoutError``
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or a probe is already running)
+        """
+        is_probe = self._before_call()
+
+        started = self._clock()
+        try:
+            if timeout is None:
+                result = await func(*args, **kwargs)
+            else:
+                result = await asyncio.wait_for(func(*args, **kwargs), timeout=timeout)
+        except asyncio.CancelledError:
+            # The caller went away; that says nothing about the upstream
+            if is_probe:
+                self._probe_in_flight = False
+            raise
+        except Exception:
+            self._record(success=False, is_probe=is_probe)
+            raise
+
+        elapsed = self._clock() - started
+        slow = self.slow_call_seconds is not None and elapsed > self.slow_call_seconds
+        self._record(success=not slow, is_probe=is_probe)
+        return result
+
+    def _before_call(self) -> bool:
+        """Reject the call if needed; return whether it is the half-open probe."""
+        state = self.state
+        if state == OPEN:
+            retry_after = self.reset_timeout - (self._clock() - self._opened_at)
+            raise CircuitOpenError(self.name, retry_after)
+        if state == HALF_OPEN:
+            if self._probe_in_flight:
+                raise CircuitOpenError(self.name, 0.0)
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def _record(self, success: bool, is_probe: bool) -> None:
+        if is_probe:
+            # The probe decides alone: close and start fresh, or reopen
+            if success:
+                self.reset()
+            else:
+                self._probe_in_flight = False
+                self._opened_at = self._clock()
+            return
+        if self._opened_at is not None:
+            # Calls started before the circuit opened no longer matter
+            return
+
+        self._outcomes.append(success)
+        failures = self._outcomes.count(False)
+        if (
+            len(self._outcomes) >= self.min_calls
+            and failures / len(self._outcomes) >= self.failure_rate_threshold
+        ):
+            self._opened_at = self._clock()
+            self._outcomes.clear()
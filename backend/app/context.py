@@ -0,0 +1,125 @@
+"""Lazy GraphQL request context.
+
+Resolvers read the context like a dict (``info.context["db"]``), but the
+expensive entries are only created when a resolver first reads them: the
+database session and the AI service. Introspection, queries answered from
+the read model and other requests that never touch the database never
+create a session or take a pooled connection.
+
+The session is closed by ``ReleaseRequestResources`` as soon as the
+operation has executed, before the response is serialized and sent, so its
+connection goes back to the pool promptly. Streamed (``@stream``/``@defer``)
+operations keep it until the last batch, when ``get_context`` closes it.
+
+For each request the time spent creating entries, which entries were
+created and how long the session was held are logged at debug level on
+``app.context`` (sampled, see app/logs.py).
+"""
+
+import logging
+import time
+from collections.abc import Callable, Iterator, Mapping
+from typing import Any
+
+from strawberry.extensions import SchemaExtension
+from strawberry.fastapi import BaseContext
+
+logger = logging.getLogger(__name__)
+
+# Context entry holding the request's database session
+DB_KEY = "db"
+
+
+class RequestContext(BaseContext, Mapping[str, Any]):
+    """GraphQL context whose entries are created on first access.
+
+    Attributes:
+        created: Lazy entries created so far, in order
+        setup_ms: Time spent creating them
+        db_held_ms: Time the database session was open
+    """
+
+    def __init__(
+        self,
+        values: Mapping[str, Any] | None = None,
+        factories: Mapping[str, Callable[[], Any]] | None = None,
+    ):
+        """Create the context.
+
+        Args:
+            values: Entries available immediately
+            factories: Entries created by calling the factory on first access
+        """
+        super().__init__()
+        self._values = dict(values or {})
+        self._factories = dict(factories or {})
+        self.created: list[str] = []
+        self.setup_ms = 0.0
+        self.db_held_ms = 0.0
+        self._db_opened_at: float | None = None
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        factory = self._factories[key]
+        started = time.perf_counter()
+        value = factory()
+        finished = time.perf_counter()
+        self.setup_ms += (finished - started) * 1000
+        self.created.append(key)
+        if key == DB_KEY:
+            self._db_opened_at = finished
+        self._values[key] = value
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        # Without this, Mapping would create the entry to answer
+        return key in self._values or key in self._factories
+
+    def __iter__(self) -> Iterator[str]:
+        return iter({**self._factories, **self._values})
+
+    def __len__(self) -> int:
+        return len(self._factories.keys() | self._values.keys())
+
+    def release(self) -> None:
+        """Close the database session if one was created.
+
+        A resolver that runs afterwards (e.g. a later batch of a stream)
+        gets a new session.
+        """
+        db = self._values.pop(DB_KEY, None)
+        if db is None:
+            return
+        db.close()
+        if self._db_opened_at is not None:
+            self.db_held_ms += (time.perf_counter() - self._db_opened_at) * 1000
+            self._db_opened_at = None
+
+    def close(self) -> None:
+        """Release resources at the end of the request and log its context metrics."""
+        self.release()
+        logger.debug(
+            "Request context",
+            extra={
+                "context_created": self.created,
+                "context_setup_ms": round(self.setup_ms, 3),
+                "db_held_ms": round(self.db_held_ms, 3),
+            },
+        )
+
+
+class ReleaseRequestResources(SchemaExtension):
+    """Close the request's database session as soon as its operation has executed."""
+
+    def on_operation(self):
+        yield
+        context = self.execution_context.context
+        if not isinstance(context, RequestContext):
+            return
+        # Incremental results are still being produced from the session
+        if hasattr(self.execution_context.result, "subsequent_results"):
+            return
+        context.release()
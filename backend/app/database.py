@@ -1,24 +1,156 @@
+"""Database engines and sessions.
+
+``SessionLocal`` sessions use the primary database (``DATABASE_URL``) and
+are for anything that writes: seeding, stored interpretations, usage
+records, the CLIs. Request reads use ``ReadSessionLocal``, which goes to a
+fresh read replica when ``DATABASE_REPLICA_URLS`` lists any (see
+``app/replicas.py``) and to the primary otherwise.
+
+With ``EDGE_DATABASE`` set, both read from that read-only, memory-mapped
+SQLite snapshot instead (exported by ``python -m app.edge``), and the
+instance needs no database server at all. Writes fail; ``READ_ONLY`` tells
+the components that would make them (variant pools, the usage log) to keep
+their state in memory instead.
+"""
+
 import os
+import threading
+from pathlib import Path
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.generation import track_gallery_changes
+from app.logs import instrument_engine
 from app.models import Base
+from app.replicas import ReplicaRouter
+from app.search import create_search_index, rebuild_search_index, track_search_index
 
 # Use environment variable for database URL
 # Tests can override this to use a separate test database
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./gallery.db")
+# Comma-separated read replica URLs for request reads
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+REPLICA_CHECK_SECONDS = float(os.getenv("DATABASE_REPLICA_CHECK_SECONDS", "5"))
+# Read-only SQLite snapshot to serve from instead of DATABASE_URL
+EDGE_DATABASE = os.getenv("EDGE_DATABASE")
+READ_ONLY = bool(EDGE_DATABASE)
+# Bytes of the edge snapshot SQLite may memory-map (more than the file is fine)
+EDGE_MMAP_BYTES = int(os.getenv("EDGE_MMAP_BYTES", str(1024 * 1024 * 1024)))
+
+# The engine is created on first use (normally by the FastAPI lifespan), not at
+# import, so importing the app stays cheap and never loads a database driver.
+_engine: Engine | None = None
+_engine_lock = threading.Lock()
+
+
+def create_app_engine(url: str) -> Engine:
+    """Create an instrumented engine for a database URL."""
+    # Only use check_same_thread for SQLite (Postgres doesn't need it)
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args)
+    # Statements go to the app.sql loggers (see app/logs.py)
+    instrument_engine(engine)
+    return engine
+
+
+def create_edge_engine(path: str | Path) -> Engine:
+    """Open an exported SQLite snapshot read-only and memory-mapped.
+
+    ``immutable=1`` tells SQLite the file never changes, so readers take no
+    locks and never check for other writers.
+    """
+    path = Path(path).resolve()
+    if not path.exists():
+        raise FileNotFoundError(f"Edge database {path} does not exist; export it with app.edge")
+    engine = create_app_engine(f"sqlite:///file:{path}?mode=ro&immutable=1&uri=true")
+
+    @event.listens_for(engine, "connect")
+    def configure(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA mmap_size = {EDGE_MMAP_BYTES}")
+        cursor.execute("PRAGMA query_only = 1")
+        cursor.close()
+
+    return engine
+
+
+def get_engine() -> Engine:
+    """Get the application engine, creating it on first call."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                if EDGE_DATABASE:
+                    _engine = create_edge_engine(EDGE_DATABASE)
+                else:
+                    _engine = create_app_engine(DATABASE_URL)
+    return _engine
+
+
+def __getattr__(name: str):
+    # Keep ``from app.database import engine`` working without an import-time engine
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class LazyBindSession(Session):
+    """Session bound to the application engine, created when first needed."""
+
+    def get_bind(self, mapper=None, clause=None, **kwargs) -> Engine:
+        return get_engine()
+
+
+track_gallery_changes(LazyBindSession)
+track_search_index(LazyBindSession)
+
+SessionLocal = sessionmaker(class_=LazyBindSession, autocommit=False, autoflush=False)
+
+# Edge instances read the snapshot only, so they have no replicas
+replica_router = ReplicaRouter(
+    [] if EDGE_DATABASE else DATABASE_REPLICA_URLS,
+    get_engine,
+    create_app_engine,
+    REPLICA_CHECK_SECONDS,
+)
+
+
+class ReadSession(Session):
+    """Session for request reads, bound to a fresh replica or the primary.
+
+    The engine is chosen when the session first needs one and kept for its
+    lifetime, so one request sees one database throughout. Nothing here
+    tracks gallery or search index writes: read sessions must not write.
+    """
+
+    _read_engine: Engine | None = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs) -> Engine:
+        if self._read_engine is None:
+            self._read_engine = replica_router.read_engine()
+        return self._read_engine
 
-# Only use check_same_thread for SQLite (Postgres doesn't need it)
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, connect_args=connect_args, echo=True)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(class_=ReadSession, autocommit=False, autoflush=False)
 
 
 def init_db():
-    """Initialize the database by creating all tables."""
+    """Initialize the database by creating all tables and the search index."""
+    engine = get_engine()
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        created = create_search_index(connection)
+    if created:
+        # Index whatever the database already holds
+        db = SessionLocal()
+        try:
+            rebuild_search_index(db)
+            db.commit()
+        finally:
+            db.close()
 
 
 def get_db() -> Session:
@@ -0,0 +1,224 @@
+"""Bounded, streamed image downloads with process-wide memory accounting.
+
+Reading a response with ``response.content`` buffers however much the host
+sends, and with many interpretations in flight a few large originals can
+spike the worker's memory. Images for the AI provider are instead read
+through ``read_image``:
+
+- The body is streamed and abandoned once it passes ``max_bytes``; a larger
+  ``Content-Length`` is refused before any of the body is read
+- Before the body is read, its size is reserved from a ``ByteBudget`` shared
+  by the whole process. The caller keeps the reservation (a ``Lease``) for
+  as long as it holds the bytes, so the budget bounds the image bytes held
+  at once, not just those being downloaded. Downloads that do not fit wait
+  their turn in arrival order. Without a usable ``Content-Length`` (absent,
+  or the body is compressed) the full ``max_bytes`` is reserved.
+- The MIME type is sniffed from the image's magic bytes; the
+  ``Content-Type`` header is only used when no known signature matches
+
+``ByteBudget.peak`` records the most bytes reserved at once, which the
+benchmarks report per operation.
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+# (offset, signature, MIME type); ISO media files (AVIF, HEIC) are checked
+# separately by their ``ftyp`` brand
+SIGNATURES = (
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (8, b"WEBP", "image/webp"),
+)
+FTYP_BRANDS = {
+    b"avif": "image/avif",
+    b"avis": "image/avif",
+    b"heic": "image/heic",
+    b"heix": "image/heic",
+    b"mif1": "image/heif",
+    b"msf1": "image/heif",
+}
+
+
+class ImageTooLargeError(Exception):
+    """The image is larger than the download limit."""
+
+    def __init__(self, size: int, max_bytes: int):
+        super().__init__(f"Image exceeds {max_bytes} bytes (got at least {size})")
+        self.size = size
+        self.max_bytes = max_bytes
+
+
+class NotAnImageError(Exception):
+    """The response is neither a known image format nor labelled as an image."""
+
+
+def sniff_mime_type(data: bytes, declared: str | None = None) -> str:
+    """Identify an image format from its leading bytes.
+
+    Args:
+        data: The image bytes (only the first few are inspected)
+        declared: The response's ``Content-Type``, used when no signature matches
+
+    Returns:
+        The MIME type
+
+    Raises:
+        NotAnImageError: If no signature matches and ``declared`` is not an image type
+    """
+    for offset, signature, mime_type in SIGNATURES:
+        if data[offset : offset + len(signature)] == signature:
+            if mime_type != "image/webp" or data[:4] == b"RIFF":
+                return mime_type
+    if data[4:8] == b"ftyp" and data[8:12] in FTYP_BRANDS:
+        return FTYP_BRANDS[data[8:12]]
+    media_type = (declared or "").split(";")[0].strip().lower()
+    if media_type.startswith("image/"):
+        return media_type
+    raise NotAnImageError(f"Unrecognized image data (Content-Type: {declared or 'none'})")
+
+
+class ByteBudget:
+    """A pool of bytes that concurrent tasks reserve from and give back.
+
+    Reservations are granted in arrival order, so a large image is not
+    starved by a stream of small ones. A reservation larger than the whole
+    budget is cut down to it, so it still proceeds once it is alone.
+
+    Attributes:
+        limit: Bytes that may be reserved at once
+        in_flight: Bytes currently reserved
+        peak: Most bytes reserved at once since the last ``reset_peak``
+        waits: Reservations that had to wait for bytes to be given back
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.peak = 0
+        self.waits = 0
+        self._waiters: deque[tuple[int, asyncio.Future[None]]] = deque()
+
+    async def acquire(self, size: int) -> int:
+        """Wait until ``size`` bytes are free and reserve them.
+
+        Returns:
+            The bytes reserved, to be passed to ``release``
+        """
+        size = min(size, self.limit)
+        if not self._waiters and self.in_flight + size <= self.limit:
+            self._take(size)
+            return size
+        self.waits += 1
+        entry = (size, asyncio.get_running_loop().create_future())
+        self._waiters.append(entry)
+        try:
+            await entry[1]
+        except asyncio.CancelledError:
+            if entry[1].cancelled():
+                # Never granted: leave the queue and let the next waiter try
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                self._grant()
+            else:
+                self.release(size)
+            raise
+        return size
+
+    def release(self, size: int) -> None:
+        """Give back bytes returned by ``acquire``."""
+        self.in_flight -= size
+        self._grant()
+
+    def reset_peak(self) -> None:
+        """Start measuring the peak afresh from the current reservations."""
+        self.peak = self.in_flight
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator["Lease"]:
+        """A ``Lease`` whose reservation is given back when the block exits."""
+        lease = Lease(self)
+        try:
+            yield lease
+        finally:
+            lease.release()
+
+    def _take(self, size: int) -> None:
+        self.in_flight += size
+        self.peak = max(self.peak, self.in_flight)
+
+    def _grant(self) -> None:
+        while self._waiters:
+            size, future = self._waiters[0]
+            if future.done():
+                # Cancelled while queued; its task skips the removal if it is gone
+                self._waiters.popleft()
+                continue
+            if self.in_flight + size > self.limit:
+                return
+            self._waiters.popleft()
+            self._take(size)
+            future.set_result(None)
+
+
+class Lease:
+    """One holder's reservation from a ``ByteBudget``.
+
+    Reserve once, for everything the holder will keep: a task that holds
+    bytes while waiting for more can deadlock with others doing the same.
+    """
+
+    def __init__(self, budget: ByteBudget):
+        self._budget = budget
+        self.size = 0
+
+    async def reserve(self, size: int) -> None:
+        """Wait for ``size`` bytes of the budget and hold them."""
+        self.size += await self._budget.acquire(size)
+
+    def release(self) -> None:
+        """Give back everything reserved."""
+        if self.size:
+            self._budget.release(self.size)
+            self.size = 0
+
+
+async def read_image(response: Any, max_bytes: int, lease: Lease) -> tuple[bytes, str]:
+    """Read a streamed httpx response as an image, within a byte limit.
+
+    Args:
+        response: A response opened with ``AsyncClient.stream``
+        max_bytes: Largest body accepted
+        lease: Reserves the body's size before it is read; the caller
+            releases it once the bytes are no longer needed
+
+    Returns:
+        The image bytes and their sniffed MIME type
+
+    Raises:
+        ImageTooLargeError: If the body is, or declares itself, over ``max_bytes``
+        NotAnImageError: If the body does not look like an image
+        httpx.HTTPError: If reading the body fails
+    """
+    declared = response.headers.get("content-length")
+    encoding = response.headers.get("content-encoding", "identity").lower()
+    # The decoded size of a compressed body is unknown until it is read
+    length = int(declared) if declared and declared.isdigit() and encoding == "identity" else None
+    if length is not None and length > max_bytes:
+        raise ImageTooLargeError(length, max_bytes)
+    await lease.reserve(max_bytes if length is None else length)
+
+    chunks = []
+    received = 0
+    async for chunk in response.aiter_bytes():
+        received += len(chunk)
+        if received > max_bytes:
+            raise ImageTooLargeError(received, max_bytes)
+        chunks.append(chunk)
+    data = b"".join(chunks)
+    return data, sniff_mime_type(data, response.headers.get("content-type"))
@@ -0,0 +1,369 @@
+"""Per-client fair-use limits and priority lanes for ``/graphql``.
+
+A single visitor or scraper calling the AI fields in a loop could spend the
+whole AI budget and occupy every worker. With ``RATE_LIMIT=1`` each request
+is admitted by ``FairUse`` before it executes:
+
+- Every top-level field a request selects is counted per client (the
+  client's IP address) in a sliding window of ``RATE_LIMIT_WINDOW_SECONDS``.
+  Fields are counted rather than operation names, which clients choose.
+  Each alias counts as a call of its own, and the batch field counts one
+  call per distinct artwork ID. The AI fields (``AI_FIELDS``) allow
+  ``RATE_LIMIT_AI`` calls per window each, everything else
+  ``RATE_LIMIT_READS``.
+- Requests selecting an AI field run in the AI lane: at most
+  ``AI_LANE_CONCURRENCY`` at a time, with up to ``AI_LANE_QUEUE`` waiting.
+  Gallery reads never enter it, so they are never queued behind AI work.
+
+A request over its limit, or arriving at a full AI lane, is rejected with
+``429 Too Many Requests`` and a ``Retry-After`` header. A request that
+alone makes more calls of a field than its limit can never be admitted and
+is rejected with ``400``. Rejected requests are not counted.
+
+Counters are kept in memory with two counts per key (the sliding-window
+counter approximation), so each worker process limits independently: with
+N workers a client gets up to N times the configured rate. Behind a proxy,
+run uvicorn with ``--proxy-headers`` so the client address is the visitor's.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Callable, Iterable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from fastapi import HTTPException, Request
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    InlineFragmentNode,
+    parse,
+)
+from graphql.utilities import get_operation_ast, value_from_ast_untyped
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT", "0") == "1"
+RATE_LIMIT_WINDOW_SECONDS = float(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "60"))
+# Calls per client, field and window; 0 disables a limit
+RATE_LIMIT_AI = int(os.getenv("RATE_LIMIT_AI", "10"))
+RATE_LIMIT_READS = int(os.getenv("RATE_LIMIT_READS", "600"))
+AI_LANE_CONCURRENCY = int(os.getenv("AI_LANE_CONCURRENCY", "4"))
+AI_LANE_QUEUE = int(os.getenv("AI_LANE_QUEUE", "16"))
+# Suggested wait when the AI lane is full, roughly one interpretation
+AI_LANE_RETRY_SECONDS = 5
+
+# Top-level fields that call the AI provider or queue work for it
+AI_FIELDS = frozenset(
+    {
+        "generateArtworkInterpretation",
+        "generateArtworkInterpretations",
+        "artworkInterpretation",
+        "enqueueArtworkInterpretation",
+    }
+)
+# AI fields taking a list of artworks, counted once per distinct ID, and that argument
+BATCH_FIELDS = {"generateArtworkInterpretations": "artworkIds"}
+
+
+class RateLimited(HTTPException):
+    """429 response telling the client when to retry."""
+
+    def __init__(self, retry_after: float, detail: str):
+        seconds = max(1, math.ceil(retry_after))
+        super().__init__(status_code=429, detail=detail, headers={"Retry-After": str(seconds)})
+
+
+def operation_fields(query: str | None, operation_name: str | None) -> frozenset[str]:
+    """Names of the top-level fields an operation selects.
+
+    Documents that do not parse select nothing here; execution rejects them.
+    """
+    return frozenset(field.name.value for field in _top_level_fields(query, operation_name))
+
+
+def operation_calls(
+    query: str | None, operation_name: str | None, variables: dict[str, Any] | None = None
+) -> list[str]:
+    """Top-level fields an operation calls, with one entry per call.
+
+    Each response key (field name or alias) is executed once, so aliases of
+    one field are separate calls. A ``BATCH_FIELDS`` field is one call per
+    distinct ID in its list argument.
+    """
+    calls = []
+    for field in _top_level_fields(query, operation_name):
+        name = field.name.value
+        if name in BATCH_FIELDS:
+            calls += [name] * _batch_size(field, BATCH_FIELDS[name], variables or {})
+        else:
+            calls.append(name)
+    return calls
+
+
+def _batch_size(field: FieldNode, argument: str, variables: dict[str, Any]) -> int:
+    for node in field.arguments:
+        if node.name.value == argument:
+            ids = value_from_ast_untyped(node.value, variables)
+            if isinstance(ids, list):
+                return max(1, len({str(artwork_id) for artwork_id in ids}))
+    # Missing or invalid; execution rejects it without calling the provider
+    return 1
+
+
+@lru_cache(maxsize=256)
+def _top_level_fields(query: str | None, operation_name: str | None) -> tuple[FieldNode, ...]:
+    """The first field node of each response key the operation selects."""
+    if not query:
+        return ()
+    try:
+        document = parse(query)
+    except GraphQLError:
+        return ()
+    operation = get_operation_ast(document, operation_name)
+    if operation is None:
+        return ()
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    fields: dict[str, FieldNode] = {}
+    pending = [operation.selection_set]
+    seen_fragments: set[str] = set()
+    while pending:
+        for selection in pending.pop().selections:
+            if isinstance(selection, FieldNode):
+                key = (selection.alias or selection.name).value
+                fields.setdefault(key, selection)
+            elif isinstance(selection, InlineFragmentNode):
+                pending.append(selection.selection_set)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                if name in fragments and name not in seen_fragments:
+                    seen_fragments.add(name)
+                    pending.append(fragments[name].selection_set)
+    return tuple(fields.values())
+
+
+@dataclass(slots=True)
+class _Window:
+    start: float
+    current: int = 0
+    previous: int = 0
+
+
+class SlidingWindowLimiter:
+    """Sliding-window counters keyed by client and name.
+
+    Each key keeps the counts of the current and the previous fixed window;
+    the rate is estimated as the current count plus the previous count
+    weighted by how much of the previous window the sliding window still
+    covers.
+    """
+
+    def __init__(
+        self,
+        limit_for: Callable[[str], int],
+        window_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Create the limiter.
+
+        Args:
+            limit_for: Calls allowed per window for a name (0 for unlimited)
+            window_seconds: Length of the sliding window
+            clock: Monotonic time source, replaceable in tests
+        """
+        self._limit_for = limit_for
+        self.window = window_seconds
+        self._clock = clock
+        self._windows: dict[tuple[str, str], _Window] = {}
+        self._pruned_at = clock()
+
+    def hit(self, client: str, names: Iterable[str]) -> float | None:
+        """Count one call per occurrence of each name, unless that would exceed a limit.
+
+        Returns:
+            None if the calls were counted, otherwise the seconds until all
+            of them would be allowed (nothing is counted then). That is
+            ``math.inf`` if a name occurs more often than its limit.
+        """
+        now = self._clock()
+        self._prune(now)
+        limited = [
+            (name, count, limit)
+            for name, count in Counter(names).items()
+            if (limit := self._limit_for(name)) > 0
+        ]
+        if any(count > limit for _, count, limit in limited):
+            return math.inf
+        windows = [
+            (self._window(client, name, now), count, limit) for name, count, limit in limited
+        ]
+        retry_after = max(
+            (self._retry_after(window, count, limit, now) for window, count, limit in windows),
+            default=0.0,
+        )
+        if retry_after > 0:
+            return retry_after
+        for window, count, _ in windows:
+            window.current += count
+        return None
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def _window(self, client: str, name: str, now: float) -> _Window:
+        window = self._windows.get((client, name))
+        if window is None:
+            window = self._windows[(client, name)] = _Window(start=now)
+            return window
+        elapsed = now - window.start
+        if elapsed >= self.window:
+            periods = int(elapsed // self.window)
+            window.previous = window.current if periods == 1 else 0
+            window.current = 0
+            window.start += periods * self.window
+        return window
+
+    def _retry_after(self, window: _Window, count: int, limit: int, now: float) -> float:
+        """Seconds until ``count`` more calls fit under ``limit`` (0 if they fit now)."""
+        elapsed = now - window.start
+        weight = 1 - elapsed / self.window
+        if window.previous * weight + window.current + count <= limit:
+            return 0.0
+        if window.current + count <= limit:
+            # Wait for the previous window's share to slide out far enough
+            needed = self.window * (1 - (limit - count - window.current) / window.previous)
+            return max(needed - elapsed, 0.001)
+        # The current window alone is full: wait into the next one
+        needed = self.window * (1 - (limit - count) / window.current) if window.current else 0.0
+        return self.window - elapsed + needed
+
+    def _prune(self, now: float) -> None:
+        # Keys idle for two windows count nothing; drop them once per window
+        if now - self._pruned_at < self.window:
+            return
+        self._pruned_at = now
+        cutoff = now - 2 * self.window
+        self._windows = {key: w for key, w in self._windows.items() if w.start > cutoff}
+
+
+class LaneFullError(Exception):
+    """The lane's slots and queue are all taken."""
+
+
+class Lane:
+    """Bounded concurrency with a bounded queue of waiters."""
+
+    def __init__(self, concurrency: int, queue: int):
+        self.concurrency = concurrency
+        self.queue = queue
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    @property
+    def full(self) -> bool:
+        """Whether ``slot`` would be refused right now."""
+        return self._semaphore.locked() and self._waiting >= self.queue
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one slot of the lane, waiting in its queue if needed.
+
+        Raises:
+            LaneFullError: If every slot is busy and the queue is full
+        """
+        if self.full:
+            raise LaneFullError()
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+def client_key(request: Request) -> str:
+    """Key a client by its address."""
+    return request.client.host if request.client else "unknown"
+
+
+class FairUse:
+    """Admits requests under per-client limits and routes AI work to its lane."""
+
+    def __init__(
+        self,
+        ai_limit: int | None = None,
+        read_limit: int | None = None,
+        window_seconds: float | None = None,
+        ai_concurrency: int | None = None,
+        ai_queue: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ai_limit = RATE_LIMIT_AI if ai_limit is None else ai_limit
+        self.read_limit = RATE_LIMIT_READS if read_limit is None else read_limit
+        self.limiter = SlidingWindowLimiter(
+            self._limit_for,
+            RATE_LIMIT_WINDOW_SECONDS if window_seconds is None else window_seconds,
+            clock,
+        )
+        self.ai_lane = Lane(
+            AI_LANE_CONCURRENCY if ai_concurrency is None else ai_concurrency,
+            AI_LANE_QUEUE if ai_queue is None else ai_queue,
+        )
+
+    @asynccontextmanager
+    async def admit(self, client: str, calls: Iterable[str]) -> AsyncIterator[None]:
+        """Run the body if ``client`` may make ``calls`` now.
+
+        Args:
+            client: Key of the calling client
+            calls: Names of the fields the request calls, once per call
+                (see ``operation_calls``)
+
+        Raises:
+            RateLimited: If a field is over its limit or the AI lane is full
+            HTTPException: 400 if the request alone is over a field's limit
+        """
+        calls = list(calls)
+        fields = sorted(set(calls))
+        uses_ai = not AI_FIELDS.isdisjoint(fields)
+        # Checked before counting, so a request turned away here keeps its quota.
+        # Nothing awaits between the check and taking the slot, so it cannot fill up
+        if uses_ai and self.ai_lane.full:
+            logger.info("AI lane full", extra={"client": client, "fields": fields})
+            raise RateLimited(AI_LANE_RETRY_SECONDS, "Too many interpretations in progress")
+        retry_after = self.limiter.hit(client, calls)
+        if retry_after == math.inf:
+            raise HTTPException(status_code=400, detail="Request exceeds the per-client limit")
+        if retry_after is not None:
+            logger.info("Rate limited", extra={"client": client, "fields": fields})
+            raise RateLimited(retry_after, "Rate limit exceeded")
+        if not uses_ai:
+            yield
+            return
+        async with self.ai_lane.slot():
+            yield
+
+    def _limit_for(self, field: str) -> int:
+        return self.ai_limit if field in AI_FIELDS else self.read_limit
+
+
+fair_use = FairUse()
@@ -0,0 +1,156 @@
+"""Pre-serialized JSON fragments for the frontend's gallery queries.
+
+``GetCollections`` and ``GetArtist`` make up most traffic, and their
+responses only change when the gallery does. Executing them converts every
+artwork to a Strawberry object, completes each field through graphql-core
+and encodes the result, on every request.
+
+With the read model enabled (``READ_MODEL=1``), the GraphQL router
+(``app/graphql_router.py``) answers these operations without executing
+them: each artist, artwork and collection is encoded once into a byte
+fragment, cached under its ID and the gallery generation of the snapshot
+it came from, and responses are spliced together from those fragments. A
+new generation (any gallery write, see ``app/generation.py``) leaves the
+old fragments unused, and they are dropped the first time a newer
+generation is seen.
+
+Only requests whose query is one of these documents (ignoring whitespace)
+and that have no variables take this path; the bytes are identical to what
+execution would produce. Everything else executes as usual.
+"""
+
+import json
+import threading
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from app.operations import GET_ARTIST, GET_COLLECTIONS
+from app.read_model import ArtistView, ArtworkView, CollectionView, GallerySnapshot
+
+# Same output as Strawberry's default json.dumps(..., separators=(",", ":")),
+# without building a new encoder for every call
+json_encoder = json.JSONEncoder(separators=(",", ":"))
+
+
+def encode(data: Any) -> bytes:
+    """Encode a value as compact JSON, as Strawberry does."""
+    return json_encoder.encode(data).encode()
+
+
+class FragmentCache:
+    """Encoded entities keyed by kind, ID and gallery generation."""
+
+    def __init__(self):
+        self._fragments: dict[tuple[str, int, int], bytes] = {}
+        self._generation = -1
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, entity_id: int, generation: int, build: Callable[[], bytes]) -> bytes:
+        """Return the cached fragment, building and storing it on a miss."""
+        key = (kind, entity_id, generation)
+        fragment = self._fragments.get(key)
+        if fragment is None:
+            fragment = build()
+            with self._lock:
+                if generation > self._generation:
+                    # The gallery changed: fragments of older snapshots are dead
+                    self._fragments = {
+                        k: v for k, v in self._fragments.items() if k[2] >= generation
+                    }
+                    self._generation = generation
+                self._fragments[key] = fragment
+        return fragment
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fragments = {}
+            self._generation = -1
+
+
+fragment_cache = FragmentCache()
+
+
+def _artwork(gallery: GallerySnapshot, artwork: ArtworkView) -> bytes:
+    # Field order follows the GetCollections selection
+    return fragment_cache.get(
+        "artwork",
+        artwork.id,
+        gallery.generation,
+        lambda: encode(
+            {
+                "id": str(artwork.id),
+                "title": artwork.title,
+                "imageUrl": artwork.image_url,
+                "artist": {"id": str(artwork.artist.id), "name": artwork.artist.name},
+            }
+        ),
+    )
+
+
+def _collection(gallery: GallerySnapshot, collection: CollectionView) -> bytes:
+    def build() -> bytes:
+        head = encode(
+            {
+                "id": str(collection.id),
+                "title": collection.title,
+                "description": collection.description,
+            }
+        )
+        artworks = b",".join(_artwork(gallery, artwork) for artwork in collection.artworks)
+        return head[:-1] + b',"artworks":[' + artworks + b"]}"
+
+    return fragment_cache.get("collection", collection.id, gallery.generation, build)
+
+
+def _artist(gallery: GallerySnapshot, artist: ArtistView) -> bytes:
+    return fragment_cache.get(
+        "artist",
+        artist.id,
+        gallery.generation,
+        lambda: encode({"id": str(artist.id), "name": artist.name, "bio": artist.bio}),
+    )
+
+
+def collections_data(gallery: GallerySnapshot) -> bytes:
+    """The ``data`` object of a GetCollections response."""
+    collections = b",".join(_collection(gallery, c) for c in gallery.collections)
+    return b'{"collections":[' + collections + b"]}"
+
+
+def artist_data(gallery: GallerySnapshot) -> bytes:
+    """The ``data`` object of a GetArtist response."""
+    artist = _artist(gallery, gallery.artist) if gallery.artist else b"null"
+    return b'{"artist":' + artist + b"}"
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.split())
+
+
+# Normalized document -> (operation name, builds the response data)
+SPLICED_OPERATIONS: Mapping[str, tuple[str, Callable[[GallerySnapshot], bytes]]] = {
+    _normalize(GET_COLLECTIONS): ("GetCollections", collections_data),
+    _normalize(GET_ARTIST): ("GetArtist", artist_data),
+}
+
+
+def spliced_data(
+    query: str | None,
+    variables: Mapping[str, Any] | None,
+    operation_name: str | None,
+    context: Mapping[str, Any],
+) -> bytes | None:
+    """The encoded ``data`` of a request answerable from fragments, else None."""
+    read_model = context.get("read_model")
+    if read_model is None or query is None or variables:
+        return None
+    operation = SPLICED_OPERATIONS.get(_normalize(query))
+    if operation is None:
+        return None
+    name, build = operation
+    if operation_name not in (None, name):
+        return None
+    return build(read_model.snapshot(context["db"]))
@@ -0,0 +1,55 @@
+"""Generation marker for the gallery tables.
+
+Every transaction that writes artists, collections or artworks increments a
+single counter row in ``gallery_generation``. Caches of gallery data (the
+in-memory read model) compare the counter with the one they were built at
+and rebuild only when it has moved.
+
+Writes are tracked through session events, so ORM flushes as well as bulk
+``insert()``/``update()``/``delete()`` statements and ``Query.delete()`` are
+covered. Raw SQL executed on a connection is not.
+"""
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.models import Artist, Artwork, Collection, GalleryGeneration
+
+GALLERY_MODELS = (Artist, Collection, Artwork)
+
+
+def get_generation(db: Session) -> int:
+    """Current gallery generation; 0 before the first tracked write."""
+    generation = db.execute(select(GalleryGeneration.generation)).scalar()
+    return generation or 0
+
+
+def bump_generation(session: Session) -> None:
+    """Increment the generation in the session's current transaction."""
+    connection = session.connection()
+    result = connection.execute(
+        update(GalleryGeneration)
+        .where(GalleryGeneration.id == 1)
+        .values(generation=GalleryGeneration.generation + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(GalleryGeneration).values(id=1, generation=1))
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    changed = (*session.new, *session.dirty, *session.deleted)
+    if any(isinstance(instance, GALLERY_MODELS) for instance in changed):
+        bump_generation(session)
+
+
+def _on_orm_execute(state: ORMExecuteState) -> None:
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    if any(mapper.class_ in GALLERY_MODELS for mapper in state.all_mappers):
+        bump_generation(state.session)
+
+
+def track_gallery_changes(session_class: type[Session]) -> None:
+    """Bump the generation whenever sessions of this class write gallery rows."""
+    event.listen(session_class, "after_flush", _after_flush)
+    event.listen(session_class, "do_orm_execute", _on_orm_execute)
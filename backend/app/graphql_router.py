@@ -0,0 +1,96 @@
+"""The ``/graphql`` endpoint: Strawberry's FastAPI router with two additions.
+
+- With ``fair_use`` set, every request is admitted by it before anything
+  executes: per-client limits and the AI lane (see app/fair_use.py)
+- The frontend's static gallery queries are answered from pre-serialized
+  fragments when the read model is enabled (see app/fragments.py)
+
+Other responses are encoded with a reused encoder instead of a new one per
+response.
+"""
+
+from collections.abc import Mapping
+from typing import Any
+
+from fastapi import Request, Response
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http import GraphQLRequestData
+from strawberry.http.async_base_view import AsyncHTTPRequestAdapter
+from strawberry.types import ExecutionResult
+
+from app.fair_use import FairUse, client_key, operation_calls
+from app.fragments import json_encoder, spliced_data
+
+
+class SplicedData(bytes):
+    """Response ``data`` that is already encoded."""
+
+
+class GalleryGraphQLRouter(GraphQLRouter):
+    """GraphQL router with fair-use admission and spliced gallery responses."""
+
+    def __init__(self, *args: Any, fair_use: FairUse | None = None, **kwargs: Any):
+        """Create the router.
+
+        Args:
+            fair_use: Admits requests before they execute; None admits all
+            *args, **kwargs: Passed to ``GraphQLRouter``
+        """
+        super().__init__(*args, **kwargs)
+        self.fair_use = fair_use
+
+    async def execute_operation(
+        self,
+        request: Request,
+        request_adapter: AsyncHTTPRequestAdapter,
+        request_data: GraphQLRequestData | list[GraphQLRequestData],
+        context: Mapping[str, Any],
+        root_value: Any,
+        sub_response: Response,
+    ) -> Any:
+        arguments = {
+            "request": request,
+            "request_adapter": request_adapter,
+            "request_data": request_data,
+            "context": context,
+            "root_value": root_value,
+            "sub_response": sub_response,
+        }
+        if self.fair_use is None:
+            return await super().execute_operation(**arguments)
+        operations = request_data if isinstance(request_data, list) else [request_data]
+        calls = [
+            name
+            for data in operations
+            for name in operation_calls(data.query, data.operation_name, data.variables)
+        ]
+        async with self.fair_use.admit(client_key(request), calls):
+            return await super().execute_operation(**arguments)
+
+    async def execute_single(
+        self,
+        request: Request,
+        request_adapter: AsyncHTTPRequestAdapter,
+        sub_response: Response,
+        context: Mapping[str, Any],
+        root_value: Any,
+        request_data: GraphQLRequestData,
+    ) -> ExecutionResult:
+        data = spliced_data(
+            request_data.query, request_data.variables, request_data.operation_name, context
+        )
+        if data is not None:
+            return ExecutionResult(data=SplicedData(data), errors=None)
+        return await super().execute_single(
+            request=request,
+            request_adapter=request_adapter,
+            sub_response=sub_response,
+            context=context,
+            root_value=root_value,
+            request_data=request_data,
+        )
+
+    def encode_json(self, data: object) -> str | bytes:
+        if isinstance(data, dict) and isinstance(data.get("data"), SplicedData):
+            return b'{"data":' + data["data"] + b"}"
+        return json_encoder.encode(data)
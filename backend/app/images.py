@@ -0,0 +1,313 @@
+"""Self-hosted artwork images: resized, re-encoded and cached on disk.
+
+Images are normally delivered by Cloudinary, with transforms baked into
+each ``image_url`` by ``app/seed.py``. With ``IMAGE_PROXY=1`` the API also
+serves ``/images/{artwork_id}/{width}.{fmt}`` itself, so images can be
+self-hosted or put behind our own CDN without paying for transforms:
+
+- The original is streamed from the artwork's ``image_url`` under a size
+  cap (``IMAGE_MAX_BYTES``) and the process-wide image budget, and
+  revalidated by ETag once it is older than ``IMAGE_REVALIDATE_SECONDS``
+- Each rendition (one of ``WIDTHS``, WebP or AVIF) is resized and encoded
+  in a process pool (``IMAGE_WORKERS``), off the event loop and the GIL
+- Originals and renditions are kept under ``IMAGE_CACHE_DIR`` with names
+  derived from a hash of the original's bytes and the rendition settings,
+  so a changed image gets new files and concurrent workers never clash
+- Files are sent with ``FileResponse``, which hands the path to the
+  server (``http.response.pathsend``) for ``sendfile`` where supported
+
+URLs carrying ``?v=`` with the current source version (see
+``source_version``) never change content and are served as immutable;
+other URLs are cached briefly and revalidated by ETag.
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+
+from app.ai_service import image_budget
+from app.database import ReadSessionLocal
+from app.downloads import ByteBudget, ImageTooLargeError, NotAnImageError, read_image
+from app.lazy import LazyModule
+from app.repository import ArtworkRepository
+
+httpx = LazyModule("httpx")
+Image = LazyModule("PIL.Image")
+ImageOps = LazyModule("PIL.ImageOps")
+
+IMAGE_PROXY_ENABLED = os.getenv("IMAGE_PROXY", "0") == "1"
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", "./image_cache")
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+# Largest original accepted from an image host
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(20 * 1024 * 1024)))
+# A downloaded original is used this long before its URL is revalidated
+IMAGE_REVALIDATE_SECONDS = float(os.getenv("IMAGE_REVALIDATE_SECONDS", "3600"))
+# Widths on offer; a fixed set bounds the cache and suits srcset
+WIDTHS = (320, 640, 960, 1200, 1600, 2400)
+# URL extension -> (Pillow format, MIME type, encoder options)
+FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "avif": ("AVIF", "image/avif", {"quality": 60, "speed": 6}),
+}
+# Bump when encoding changes so existing renditions are replaced
+RENDITION_VERSION = 1
+FETCH_TIMEOUT_SECONDS = 30.0
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, max-age=300"
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def source_version(source: str) -> str:
+    """Short version tag of an original, for ``?v=``.
+
+    Args:
+        source: The original's SHA-256, as returned by ``ImageProxy.source``
+    """
+    return source[:12]
+
+
+def render(original: str, destination: str, width: int, fmt: str) -> None:
+    """Resize an original to ``width`` (never upscaling) and encode it.
+
+    Runs in a worker process. The file is written under a temporary name
+    and moved into place, so readers never see a partial rendition.
+    """
+    pillow_format, _, options = FORMATS[fmt]
+    with Image.open(original) as source:
+        # Lets the JPEG decoder skip most of the work for large originals
+        source.draft("RGB", (width, width))
+        image = ImageOps.exif_transpose(source)
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.Resampling.LANCZOS)
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        temporary = f"{destination}.{os.getpid()}.tmp"
+        image.save(temporary, format=pillow_format, **options)
+    os.replace(temporary, destination)
+
+
+def _ready() -> None:
+    """No-op run in each worker at startup."""
+
+
+class ImageProxy:
+    """Fetches originals and produces cached renditions.
+
+    Attributes:
+        cache_dir: Directory holding ``originals/`` and ``renditions/``
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        workers: int | None = None,
+        transport: "httpx.AsyncBaseTransport | None" = None,
+        budget: ByteBudget | None = None,
+    ):
+        self.cache_dir = Path(cache_dir or IMAGE_CACHE_DIR)
+        self._workers = workers or IMAGE_WORKERS
+        self._transport = transport
+        self._budget = budget or image_budget
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending: dict[str, asyncio.Future] = {}
+        # Source URL -> (time checked, source record), saved to disk as well
+        self._sources: dict[str, tuple[float, dict[str, Any]]] = {}
+
+    def original_path(self, source: str) -> Path:
+        return self.cache_dir / "originals" / source
+
+    def rendition_path(self, source: str, width: int, fmt: str) -> Path:
+        key = _digest(f"{RENDITION_VERSION}:{width}:{fmt}:{source}")
+        return self.cache_dir / "renditions" / key[:2] / f"{key}.{fmt}"
+
+    async def source(self, image_url: str) -> str:
+        """SHA-256 of the original at ``image_url``, downloading it if needed.
+
+        Raises:
+            httpx.HTTPError: If the original cannot be downloaded
+            ImageTooLargeError: If the original is over ``IMAGE_MAX_BYTES``
+            NotAnImageError: If the host does not answer with an image
+        """
+        checked, record = self._source_record(image_url)
+        if (
+            record is not None
+            and time.time() - checked < IMAGE_REVALIDATE_SECONDS
+            and self.original_path(record["sha256"]).exists()
+        ):
+            return record["sha256"]
+        return await self._once(f"source:{image_url}", lambda: self._fetch(image_url, record))
+
+    def load_sources(self, image_urls: Iterable[str]) -> int:
+        """Read the stored records of these URLs' originals into memory.
+
+        Returns:
+            How many URLs have a record
+        """
+        return sum(self._source_record(image_url)[1] is not None for image_url in image_urls)
+
+    async def rendition(self, image_url: str, width: int, fmt: str) -> Path:
+        """Path of the cached rendition, producing it first if needed.
+
+        Raises:
+            httpx.HTTPError: If the original cannot be downloaded
+            ImageTooLargeError: If the original is over ``IMAGE_MAX_BYTES``
+            NotAnImageError: If the host does not answer with an image
+            PIL.Image.DecompressionBombError: If the original has too many pixels
+            OSError: If the original cannot be decoded
+        """
+        source = await self.source(image_url)
+        path = self.rendition_path(source, width, fmt)
+        if path.exists():
+            return path
+        return await self._once(str(path), lambda: self._render(source, path, width, fmt))
+
+    def start(self) -> None:
+        """Start the worker processes now instead of on the first request."""
+        executor = self._get_executor()
+        for future in [executor.submit(_ready) for _ in range(self._workers)]:
+            future.result()
+
+    def stop(self) -> None:
+        """Shut down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned, not forked: the API process runs threads (logging,
+            # the thread pool) whose locks a fork could copy mid-use
+            self._executor = ProcessPoolExecutor(
+                self._workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _once(self, key: str, produce: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``produce`` once for concurrent requests of the same file."""
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(produce())
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        # A disconnecting client must not cancel the work for the others
+        return await asyncio.shield(task)
+
+    async def _render(self, source: str, path: Path, width: int, fmt: str) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.get_running_loop().run_in_executor(
+            self._get_executor(), render, str(self.original_path(source)), str(path), width, fmt
+        )
+        return path
+
+    async def _fetch(self, image_url: str, record: dict[str, Any] | None) -> str:
+        """Download the original, or confirm by ETag that the stored one is current."""
+        headers = {}
+        if record is not None and record.get("etag"):
+            if self.original_path(record["sha256"]).exists():
+                headers["If-None-Match"] = record["etag"]
+        async with (
+            httpx.AsyncClient(
+                transport=self._transport, timeout=FETCH_TIMEOUT_SECONDS, follow_redirects=True
+            ) as http_client,
+            http_client.stream("GET", image_url, headers=headers) as response,
+        ):
+            if response.status_code == 304 and headers:
+                source = record["sha256"]
+            else:
+                response.raise_for_status()
+                async with self._budget.lease() as lease:
+                    data, _ = await read_image(response, IMAGE_MAX_BYTES, lease)
+                    source = hashlib.sha256(data).hexdigest()
+                    path = self.original_path(source)
+                    if not path.exists():
+                        await asyncio.to_thread(_write_atomically, path, data)
+            record = {"sha256": source, "etag": response.headers.get("etag")}
+        self._sources[image_url] = (time.time(), record)
+        await asyncio.to_thread(
+            _write_atomically, self._source_record_path(image_url), json.dumps(record).encode()
+        )
+        return source
+
+    def _source_record_path(self, image_url: str) -> Path:
+        return self.cache_dir / "sources" / f"{_digest(image_url)}.json"
+
+    def _source_record(self, image_url: str) -> tuple[float, dict[str, Any] | None]:
+        """When the original at ``image_url`` was last checked, and what it was."""
+        if image_url in self._sources:
+            return self._sources[image_url]
+        path = self._source_record_path(image_url)
+        try:
+            entry = (path.stat().st_mtime, json.loads(path.read_text()))
+        except (OSError, ValueError):
+            # Not fetched yet (or by a worker that died mid-write)
+            return 0.0, None
+        self._sources[image_url] = entry
+        return entry
+
+
+def _write_atomically(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+
+
+image_proxy = ImageProxy()
+
+router = APIRouter()
+
+
+def _image_url(artwork_id: int) -> str | None:
+    db = ReadSessionLocal()
+    try:
+        artwork = ArtworkRepository(db).get_by_id(artwork_id)
+        return artwork.image_url if artwork else None
+    finally:
+        db.close()
+
+
+@router.get("/images/{artwork_id}/{width}.{fmt}")
+async def artwork_image(
+    artwork_id: int, width: int, fmt: str, request: Request, v: str | None = None
+) -> Response:
+    """Serve an artwork image at one of ``WIDTHS`` as WebP or AVIF."""
+    if width not in WIDTHS or fmt not in FORMATS:
+        raise HTTPException(status_code=404, detail="Unknown image size or format")
+    image_url = await asyncio.to_thread(_image_url, artwork_id)
+    if image_url is None:
+        raise HTTPException(status_code=404, detail="Artwork not found")
+
+    try:
+        version = source_version(await image_proxy.source(image_url))
+        path = await image_proxy.rendition(image_url, width, fmt)
+    except (
+        httpx.HTTPError,
+        ImageTooLargeError,
+        NotAnImageError,
+        # Not an OSError: raised for originals with more pixels than Pillow will decode
+        Image.DecompressionBombError,
+        OSError,
+    ) as e:
+        raise HTTPException(status_code=502, detail="Original image unavailable") from e
+
+    headers = {
+        "ETag": f'"{path.stem}"',
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if v == version else REVALIDATE_CACHE_CONTROL,
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=FORMATS[fmt][1], headers=headers)
@@ -0,0 +1,134 @@
+"""In-memory cache of the most recent interpretation per artwork.
+
+Live interpretations stay ephemeral (Decision 0008): nothing is written to
+the database per request. The cache only remembers the last good note for
+each artwork so it can be served, flagged with an error code, when the AI
+path is degraded.
+
+By default the cache lives in process memory. With ``CACHE_BACKEND=sqlite``
+it is kept in the host-wide ``SQLiteCache`` instead, so every worker process
+of a multi-worker deployment sees the same entries. Async code uses
+``aget`` and ``aput``, which run the SQLite queries in a worker thread.
+"""
+
+import asyncio
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.shared_cache import SQLiteCache
+
+
+@dataclass(frozen=True)
+class CachedInterpretation:
+    id: str
+    artwork_id: int
+    content: str
+    generated_at: datetime
+
+
+class InterpretationCache:
+    """Bounded LRU mapping of artwork ID to its latest interpretation."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, CachedInterpretation] = OrderedDict()
+
+    def get(self, artwork_id: int) -> CachedInterpretation | None:
+        entry = self._entries.get(artwork_id)
+        if entry is not None:
+            self._entries.move_to_end(artwork_id)
+        return entry
+
+    def put(self, entry: CachedInterpretation) -> None:
+        self._entries[entry.artwork_id] = entry
+        self._entries.move_to_end(entry.artwork_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def aget(self, artwork_id: int) -> CachedInterpretation | None:
+        return self.get(artwork_id)
+
+    async def aput(self, entry: CachedInterpretation) -> None:
+        self.put(entry)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SharedInterpretationCache:
+    """Interpretation cache stored in a ``SQLiteCache`` shared across processes.
+
+    Eviction is by write order rather than by reads, so reads never write.
+    """
+
+    NAMESPACE = "interpretations"
+
+    def __init__(self, store: SQLiteCache, max_entries: int = 1000):
+        self.store = store
+        self.max_entries = max_entries
+
+    def get(self, artwork_id: int) -> CachedInterpretation | None:
+        value = self.store.get(self.NAMESPACE, str(artwork_id))
+        if value is None:
+            return None
+        data = json.loads(value)
+        return CachedInterpretation(
+            id=data["id"],
+            artwork_id=artwork_id,
+            content=data["content"],
+            generated_at=datetime.fromisoformat(data["generated_at"]),
+        )
+
+    def put(self, entry: CachedInterpretation) -> None:
+        value = json.dumps(
+            {
+                "id": entry.id,
+                "content": entry.content,
+                "generated_at": entry.generated_at.isoformat(),
+            }
+        )
+        self.store.set(
+            self.NAMESPACE, str(entry.artwork_id), value.encode(), max_entries=self.max_entries
+        )
+
+    async def aget(self, artwork_id: int) -> CachedInterpretation | None:
+        """``get`` in a worker thread, so the event loop never waits on the file lock."""
+        return await asyncio.to_thread(self.get, artwork_id)
+
+    async def aput(self, entry: CachedInterpretation) -> None:
+        """``put`` in a worker thread, so the event loop never waits on the file lock."""
+        await asyncio.to_thread(self.put, entry)
+
+    def clear(self) -> None:
+        self.store.clear(self.NAMESPACE)
+
+    def __len__(self) -> int:
+        return self.store.count(self.NAMESPACE)
+
+
+def create_interpretation_cache(
+    backend: str | None = None,
+) -> InterpretationCache | SharedInterpretationCache:
+    """Create the cache selected by name or the CACHE_BACKEND variable.
+
+    Args:
+        backend: "memory" (default) or "sqlite"
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    backend = backend or os.getenv("CACHE_BACKEND", "memory")
+    if backend == "memory":
+        return InterpretationCache()
+    if backend == "sqlite":
+        return SharedInterpretationCache(SQLiteCache())
+    raise ValueError(f"Unknown cache backend {backend!r}. Choose one of: memory, sqlite")
+
+
+interpretation_cache = create_interpretation_cache()
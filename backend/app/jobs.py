@@ -0,0 +1,468 @@
+"""Background queue for AI interpretation jobs.
+
+``generateArtworkInterpretation`` holds the HTTP request open for the image
+fetch and the provider call. Clients that would rather not wait enqueue a
+job instead, get its ID back immediately, and poll (or subscribe) for the
+result while a small pool of asyncio workers does the generation.
+
+Jobs live in a local SQLite file (``JOB_STORE_PATH``, default ``jobs.db``),
+so a restart picks up queued and interrupted jobs instead of losing them.
+Worker processes sharing the file hold a lease on each job they run and
+renew it while it runs; a running job is only queued again once its lease
+has expired, so a sibling process never runs a job that is still in hand.
+An artwork can have only one active job per prompt: enqueueing it again
+while a job is queued or running returns that job.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import uuid
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+
+from sqlalchemy.orm import Session
+
+from app.ai_service import AIService, InterpretationError, InterpretationErrorCode
+from app.database import SessionLocal
+from app.interpretation_cache import CachedInterpretation, interpretation_cache
+from app.repository import ArtworkRepository
+
+logger = logging.getLogger(__name__)
+
+# Jobs call the provider one at a time per worker; keep this within the
+# provider's rate limits
+DEFAULT_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Finished jobs older than this are deleted when the queue starts
+FINISHED_JOB_RETENTION = timedelta(days=1)
+# A running job whose lease has not been renewed for this long is queued again
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+# How often watchers re-read a job, which another process may be running
+WATCH_POLL_SECONDS = 1.0
+
+
+class JobStatus(Enum):
+    """Lifecycle of an interpretation job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+ACTIVE_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+
+@dataclass(frozen=True)
+class Job:
+    id: str
+    artwork_id: int
+    status: JobStatus
+    created_at: datetime
+    updated_at: datetime
+    content: str | None = None
+    error_code: InterpretationErrorCode | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status not in ACTIVE_STATUSES
+
+
+class JobStore:
+    """SQLite persistence for jobs.
+
+    Statements are small single-row writes on a local file, so they run
+    directly on the event loop thread.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS interpretation_jobs (
+            id TEXT PRIMARY KEY,
+            artwork_id INTEGER NOT NULL,
+            dedup_key TEXT NOT NULL,
+            status TEXT NOT NULL,
+            content TEXT,
+            error_code TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            owner TEXT,
+            lease_expires_at TEXT
+        );
+        -- At most one queued or running job per artwork and prompt
+        CREATE UNIQUE INDEX IF NOT EXISTS ix_interpretation_jobs_active
+            ON interpretation_jobs (dedup_key) WHERE status IN ('queued', 'running');
+        CREATE INDEX IF NOT EXISTS ix_interpretation_jobs_status
+            ON interpretation_jobs (status, created_at);
+    """
+
+    def __init__(self, path: str | None = None):
+        """Open (and create if needed) the job database.
+
+        Args:
+            path: SQLite file path or ":memory:"; defaults to JOB_STORE_PATH,
+                falling back to ./jobs.db
+        """
+        self.path = path or os.getenv("JOB_STORE_PATH", "./jobs.db")
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+        self._add_lease_columns()
+
+    def create(self, artwork_id: int, dedup_key: str) -> tuple[Job, bool]:
+        """Insert a queued job unless an active job with the same key exists.
+
+        Returns:
+            The new or existing active job, and whether it was created
+        """
+        now = _now()
+        job_id = uuid.uuid4().hex
+        cursor = self._conn.execute(
+            "INSERT INTO interpretation_jobs "
+            "(id, artwork_id, dedup_key, status, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+            (job_id, artwork_id, dedup_key, JobStatus.QUEUED.value, now, now),
+        )
+        if cursor.rowcount:
+            return self.get(job_id), True
+
+        row = self._conn.execute(
+            "SELECT * FROM interpretation_jobs WHERE dedup_key = ? AND status IN (?, ?)",
+            (dedup_key, *(status.value for status in ACTIVE_STATUSES)),
+        ).fetchone()
+        return _job_from_row(row), False
+
+    def get(self, job_id: str) -> Job | None:
+        row = self._conn.execute(
+            "SELECT * FROM interpretation_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return _job_from_row(row) if row else None
+
+    def claim(self, job_id: str, owner: str, lease: timedelta) -> Job | None:
+        """Mark a queued job running under a lease; None if it is no longer queued.
+
+        The check and update are one statement, so when several worker
+        processes share the store only one of them runs each job.
+
+        Args:
+            job_id: Job to claim
+            owner: Identifies the claiming queue
+            lease: How long the claim holds unless renewed
+        """
+        cursor = self._conn.execute(
+            "UPDATE interpretation_jobs SET status = ?, owner = ?, lease_expires_at = ?, "
+            "updated_at = ? WHERE id = ? AND status = ?",
+            (
+                JobStatus.RUNNING.value,
+                owner,
+                _expiry(lease),
+                _now(),
+                job_id,
+                JobStatus.QUEUED.value,
+            ),
+        )
+        return self.get(job_id) if cursor.rowcount else None
+
+    def renew(self, owner: str, lease: timedelta) -> int:
+        """Extend the lease on every job the owner is running."""
+        cursor = self._conn.execute(
+            "UPDATE interpretation_jobs SET lease_expires_at = ? WHERE owner = ? AND status = ?",
+            (_expiry(lease), owner, JobStatus.RUNNING.value),
+        )
+        return cursor.rowcount
+
+    def mark_succeeded(self, job_id: str, content: str) -> Job:
+        return self._update(job_id, JobStatus.SUCCEEDED, content=content)
+
+    def mark_failed(self, job_id: str, error_code: InterpretationErrorCode) -> Job:
+        return self._update(job_id, JobStatus.FAILED, error_code=error_code.value)
+
+    def requeue_expired(self) -> list[Job]:
+        """Queue again the running jobs whose lease has expired, and return them.
+
+        Their worker stopped or hung without finishing them. Jobs from
+        before leases were recorded have none and count as expired.
+        """
+        rows = self._conn.execute(
+            "UPDATE interpretation_jobs SET status = ?, owner = NULL, lease_expires_at = NULL, "
+            "updated_at = ? WHERE status = ? "
+            "AND (lease_expires_at IS NULL OR lease_expires_at < ?) RETURNING id",
+            (JobStatus.QUEUED.value, _now(), JobStatus.RUNNING.value, _now()),
+        ).fetchall()
+        return [self.get(row["id"]) for row in rows]
+
+    def queued(self) -> list[Job]:
+        """Every queued job, oldest first."""
+        rows = self._conn.execute(
+            "SELECT * FROM interpretation_jobs WHERE status = ? ORDER BY created_at",
+            (JobStatus.QUEUED.value,),
+        ).fetchall()
+        return [_job_from_row(row) for row in rows]
+
+    def purge_finished(self, older_than: timedelta) -> int:
+        """Delete finished jobs last updated before ``older_than`` ago."""
+        cutoff = (datetime.now(timezone.utc) - older_than).isoformat()
+        cursor = self._conn.execute(
+            "DELETE FROM interpretation_jobs WHERE status IN (?, ?) AND updated_at < ?",
+            (JobStatus.SUCCEEDED.value, JobStatus.FAILED.value, cutoff),
+        )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _add_lease_columns(self) -> None:
+        # Job stores created before leases lack these columns
+        columns = {
+            row["name"] for row in self._conn.execute("PRAGMA table_info(interpretation_jobs)")
+        }
+        for column in ("owner", "lease_expires_at"):
+            if column in columns:
+                continue
+            try:
+                self._conn.execute(f"ALTER TABLE interpretation_jobs ADD COLUMN {column} TEXT")
+            except sqlite3.OperationalError as e:
+                # Another worker process added it first
+                if "duplicate column" not in str(e):
+                    raise
+
+    def _update(self, job_id: str, status: JobStatus, **fields) -> Job:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self._conn.execute(
+            f"UPDATE interpretation_jobs SET status = ?, updated_at = ?"
+            f"{', ' + assignments if assignments else ''} WHERE id = ?",
+            (status.value, _now(), *fields.values(), job_id),
+        )
+        return self.get(job_id)
+
+
+class JobQueue:
+    """Run interpretation jobs on a fixed number of asyncio workers.
+
+    The store is the source of truth; the in-memory queue only wakes
+    workers. Jobs enqueued before ``start`` (or by a previous process) are
+    picked up when the queue starts. While running, the queue renews the
+    leases on its jobs and takes over jobs whose lease has expired.
+
+    Attributes:
+        concurrency: Number of worker tasks
+        ai_service: Service used to generate interpretations
+        owner: Identifies this queue's leases in the store
+        lease: How long a claimed job stays this queue's without renewal
+    """
+
+    def __init__(
+        self,
+        store: JobStore | None = None,
+        ai_service: AIService | None = None,
+        concurrency: int | None = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        lease_seconds: float | None = None,
+    ):
+        self._store = store
+        self.ai_service = ai_service or AIService()
+        self.concurrency = concurrency or DEFAULT_WORKERS
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.lease = timedelta(seconds=lease_seconds or JOB_LEASE_SECONDS)
+        self._session_factory = session_factory
+        self._pending: asyncio.Queue[str] | None = None
+        self._workers: list[asyncio.Task] = []
+        # One event per active watcher, by job ID
+        self._watchers: dict[str, set[asyncio.Event]] = {}
+
+    @property
+    def store(self) -> JobStore:
+        """The job store, opened on first access."""
+        if self._store is None:
+            self._store = JobStore()
+        return self._store
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        """Start the workers and queue every job waiting in the store."""
+        if self.running:
+            return
+        self.store.purge_finished(FINISHED_JOB_RETENTION)
+        self._pending = asyncio.Queue()
+        self.store.requeue_expired()
+        for job in self.store.queued():
+            self._pending.put_nowait(job.id)
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"interpretation-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+        self._workers.append(asyncio.create_task(self._keep_leases(), name="interpretation-leases"))
+
+    async def stop(self) -> None:
+        """Cancel the workers; unfinished jobs resume on the next start."""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._pending = None
+
+    def enqueue(self, artwork_id: int) -> Job:
+        """Queue an interpretation of an artwork with the active prompt.
+
+        Returns:
+            The new job, or the artwork's already queued or running job
+        """
+        dedup_key = f"{artwork_id}:{self.ai_service.prompt.hash}"
+        job, created = self.store.create(artwork_id, dedup_key)
+        if created and self._pending is not None:
+            self._pending.put_nowait(job.id)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self.store.get(job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[Job]:
+        """Yield the job now and after every status change until it finishes."""
+        last_status = None
+        changed = asyncio.Event()
+        watchers = self._watchers.setdefault(job_id, set())
+        watchers.add(changed)
+        try:
+            while True:
+                # Clear before reading so a change in between is not missed
+                changed.clear()
+                job = self.store.get(job_id)
+                if job is None:
+                    return
+                if job.status != last_status:
+                    last_status = job.status
+                    yield job
+                if job.finished:
+                    return
+                try:
+                    await asyncio.wait_for(changed.wait(), WATCH_POLL_SECONDS)
+                except TimeoutError:
+                    # Only this process's workers set the event; re-read the
+                    # store in case another worker process is running the job
+                    pass
+        finally:
+            # Also runs when the subscriber disconnects mid-stream
+            watchers.discard(changed)
+            if not watchers and self._watchers.get(job_id) is watchers:
+                del self._watchers[job_id]
+
+    async def wait(self, job_id: str, timeout: float | None = None) -> Job | None:
+        """Wait until a job finishes and return it."""
+
+        async def last_update() -> Job | None:
+            job = None
+            async for job in self.watch(job_id):
+                pass
+            return job
+
+        return await asyncio.wait_for(last_update(), timeout)
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._pending.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                # Keep the worker alive; the job is reported as failed
+                logger.exception("Interpretation job %s crashed", job_id, extra={"job_id": job_id})
+                self._notify(
+                    self.store.mark_failed(job_id, InterpretationErrorCode.GENERATION_FAILED)
+                )
+
+    async def _keep_leases(self) -> None:
+        """Renew the leases on running jobs and take over expired ones."""
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 3)
+            try:
+                self.store.renew(self.owner, self.lease)
+                for job in self.store.requeue_expired():
+                    logger.warning(
+                        "Requeued interpretation job %s after its lease expired",
+                        job.id,
+                        extra={"job_id": job.id},
+                    )
+                    self._notify(job)
+                    self._pending.put_nowait(job.id)
+            except sqlite3.Error:
+                # Try again on the next round, well before the leases expire
+                logger.exception("Could not renew interpretation job leases")
+
+    async def _run(self, job_id: str) -> None:
+        job = self.store.claim(job_id, self.owner, self.lease)
+        if job is None:
+            return
+        self._notify(job)
+
+        # Load the artwork and release the session before the long AI await
+        db = self._session_factory()
+        try:
+            artwork = ArtworkRepository(db).get_by_id(job.artwork_id)
+        finally:
+            db.close()
+        if artwork is None:
+            self._notify(self.store.mark_failed(job_id, InterpretationErrorCode.ARTWORK_NOT_FOUND))
+            return
+
+        try:
+            content = await self.ai_service.interpret_artwork(artwork)
+        except InterpretationError as e:
+            logger.warning(
+                "Interpretation job %s failed: %s",
+                job_id,
+                e,
+                extra={"job_id": job_id, "error_code": e.code.value},
+            )
+            self._notify(self.store.mark_failed(job_id, e.code))
+            return
+
+        done = self.store.mark_succeeded(job_id, content)
+        await interpretation_cache.aput(
+            CachedInterpretation(f"job-{job_id}", job.artwork_id, content, done.updated_at)
+        )
+        self._notify(done)
+
+    def _notify(self, job: Job) -> None:
+        """Wake everything watching the job."""
+        for changed in self._watchers.get(job.id, ()):
+            changed.set()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _expiry(lease: timedelta) -> str:
+    return (datetime.now(timezone.utc) + lease).isoformat()
+
+
+def _job_from_row(row: sqlite3.Row) -> Job:
+    return Job(
+        id=row["id"],
+        artwork_id=row["artwork_id"],
+        status=JobStatus(row["status"]),
+        created_at=datetime.fromisoformat(row["created_at"]),
+        updated_at=datetime.fromisoformat(row["updated_at"]),
+        content=row["content"],
+        error_code=InterpretationErrorCode(row["error_code"]) if row["error_code"] else None,
+    )
+
+
+# Created on first use (normally by the FastAPI lifespan), not at import, so a
+# configuration error such as an unknown PROMPT_VERSION fails startup rather
+# than every import of the app
+_job_queue: JobQueue | None = None
+
+
+def get_job_queue() -> JobQueue:
+    """The process's job queue, created on first call."""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
@@ -0,0 +1,26 @@
+"""Deferred imports for heavy optional SDKs.
+
+``google.genai`` alone takes several hundred milliseconds to import, and
+most requests (and every cold start) never touch it. ``LazyModule`` stands
+in for a module and imports it on first attribute access, so call sites
+and ``unittest.mock.patch`` targets keep their usual ``module.attr`` form.
+"""
+
+import importlib
+from types import ModuleType
+
+
+class LazyModule:
+    """Proxy for a module that is imported the first time it is used."""
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def _load(self) -> ModuleType:
+        return importlib.import_module(self._name)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name!r}>"
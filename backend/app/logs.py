@@ -0,0 +1,239 @@
+"""Structured, non-blocking logging.
+
+Records are written as one JSON object per line (``LOG_FORMAT=text`` gives
+plain lines, the default for the command-line tools). Nothing is written on
+the calling thread: the root logger has a single ``QueueHandler``, and a
+``QueueListener`` thread formats and writes records, so a slow terminal or
+log shipper never adds request latency.
+
+Every record carries the ID of the request that produced it.
+``RequestIdMiddleware`` takes it from the ``X-Request-ID`` header (or
+generates one) and echoes it on the response; ``get_context`` passes it to
+resolvers.
+
+Debug records are sampled at ``LOG_DEBUG_SAMPLE_RATE``, per request, so a
+sampled request keeps all of its debug records. Every SQL statement is a
+debug record on ``app.sql``; statements slower than ``SLOW_QUERY_MS`` are
+always logged as warnings on ``app.sql.slow``.
+"""
+
+import atexit
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+import uuid
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import TextIO
+
+from sqlalchemy import Engine, event
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.01"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+# Libraries that log every request at INFO ("HTTP Request: GET ..."); only
+# their warnings are kept
+QUIET_LOGGERS = ("httpx", "httpcore")
+# Longest SQL statement text included in a log record
+MAX_STATEMENT_LENGTH = 2000
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Accepted client-supplied request IDs; anything else is replaced
+_REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._:-]{1,64}")
+
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+sql_logger = logging.getLogger("app.sql")
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+# Attributes every LogRecord has; anything else came from ``extra=``
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "request_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as a single-line JSON object, including ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        entry.update(
+            (key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """Keep a fraction of debug records; other levels always pass.
+
+    Within a request the decision is derived from the request ID, so a
+    request's debug records are kept or dropped together.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        current = request_id.get()
+        if current is None:
+            return random.random() < self.rate
+        return zlib.crc32(current.encode()) < self.rate * 2**32
+
+
+class ContextQueueHandler(QueueHandler):
+    """Queue records with the request ID and message captured on the caller's side."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render args and tracebacks now: they may not be safe to read later
+        # from the listener thread
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.request_id = request_id.get()
+        return record
+
+
+_listener: QueueListener | None = None
+
+
+def configure_logging(
+    default_format: str = "json", level: str | None = None, stream: TextIO | None = None
+) -> QueueListener:
+    """Route all logging through a queue to one stream.
+
+    Safe to call again; the previous configuration is replaced.
+
+    Args:
+        default_format: "json" or "text", used unless LOG_FORMAT is set
+        level: Root log level; defaults to LOG_LEVEL
+        stream: Output stream; defaults to stderr
+
+    Returns:
+        The running queue listener
+    """
+    global _listener
+    shutdown_logging()
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    if os.getenv("LOG_FORMAT", default_format) == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    queue = SimpleQueue()
+    handler = ContextQueueHandler(queue)
+    handler.addFilter(DebugSampler(LOG_DEBUG_SAMPLE_RATE))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(level or LOG_LEVEL)
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+    # Let uvicorn's own records flow through the same handler
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers.clear()
+        logging.getLogger(name).propagate = True
+
+    _listener = QueueListener(queue, output)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and remove the handler installed by ``configure_logging``."""
+    global _listener
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, ContextQueueHandler):
+            root.removeHandler(handler)
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Log the engine's statements: all at debug level, slow ones as warnings."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    duration_ms = (time.perf_counter() - conn.info.pop("query_started")) * 1000
+    if duration_ms >= SLOW_QUERY_MS:
+        logger = slow_query_logger
+        level = logging.WARNING
+    elif sql_logger.isEnabledFor(logging.DEBUG):
+        logger = sql_logger
+        level = logging.DEBUG
+    else:
+        return
+    # Parameters are left out: they can hold user input
+    logger.log(
+        level,
+        "Slow query" if level == logging.WARNING else "Query",
+        extra={
+            "duration_ms": round(duration_ms, 2),
+            "statement": statement[:MAX_STATEMENT_LENGTH],
+            "executemany": executemany,
+        },
+    )
+
+
+class RequestIdMiddleware:
+    """Bind a request ID to each HTTP or WebSocket request and echo it back."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        supplied = dict(scope["headers"]).get(REQUEST_ID_HEADER.lower().encode(), b"")
+        supplied = supplied.decode("latin-1")
+        current = supplied if _REQUEST_ID_PATTERN.fullmatch(supplied) else uuid.uuid4().hex
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER.lower().encode(), current.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = request_id.set(current)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id.reset(token)
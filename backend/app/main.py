@@ -1,15 +1,57 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
 from typing import AsyncIterator
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from strawberry.fastapi import GraphQLRouter
+from fastapi.responses import JSONResponse
 
 from app.ai_service import AIService
-from app.database import SessionLocal
+from app.context import RequestContext
+from app.database import ReadSessionLocal, get_engine
+from app.fair_use import RATE_LIMIT_ENABLED, fair_use
+from app.graphql_router import GalleryGraphQLRouter
+from app.images import IMAGE_PROXY_ENABLED, image_proxy
+from app.images import router as images_router
+from app.jobs import get_job_queue
+from app.logs import REQUEST_ID_HEADER, RequestIdMiddleware, configure_logging, request_id
+from app.read_model import READ_MODEL_ENABLED, read_model
 from app.schema import schema
+from app.similarity import similarity_index
+from app.usage import usage_log
+from app.variants import get_variant_pool
+from app.warmup import readiness, warm_up
 
-app = FastAPI()
+configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Create the database engine, warm up and run the background workers.
+
+    Warmup runs in the background so ``/health`` answers immediately;
+    ``/ready`` turns ready once it has finished. AI usage records are
+    written in the background and, if still buffered, at shutdown (see
+    app/usage.py).
+    """
+    get_engine()
+    job_queue = get_job_queue()
+    variant_pool = get_variant_pool()
+    warmup = asyncio.create_task(warm_up(readiness))
+    await job_queue.start()
+    await usage_log.start()
+    try:
+        yield
+    finally:
+        warmup.cancel()
+        await job_queue.stop()
+        await variant_pool.stop()
+        image_proxy.stop()
+        await usage_log.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS for frontend
 allowed_origins = os.getenv('ALLOWED_ORIGINS', "http://localhost:5173").split(',')
@@ -20,7 +62,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Retry-After tells rate-limited clients when to come back (app/fair_use.py)
+    expose_headers=[REQUEST_ID_HEADER, "Retry-After"],
 )
+# Outermost, so every response (including CORS preflights) carries the ID
+app.add_middleware(RequestIdMiddleware)
 
 
 @app.get("/health")
@@ -28,16 +74,45 @@ def health_check():
     return {"status": "ok"}
 
 
-async def get_context() -> AsyncIterator[dict]:
-    """Provide database session and AI service in GraphQL context."""
-    db = SessionLocal()
-    ai_service = AIService()
+@app.get("/ready")
+def readiness_check():
+    """Report whether startup warmup has finished (503 until it has)."""
+    return JSONResponse(readiness.as_dict(), status_code=200 if readiness.ready else 503)
+
+
+async def get_context() -> AsyncIterator[RequestContext]:
+    """Provide the GraphQL context, whose entries are created when a resolver first uses them.
+
+    The database session only reads, so it goes to a fresh replica when there is one.
+    """
+    context = RequestContext(
+        values={
+            "request_id": request_id.get(),
+            "read_model": read_model if READ_MODEL_ENABLED else None,
+            "similarity_index": similarity_index,
+        },
+        factories={
+            "db": ReadSessionLocal,
+            "ai_service": lambda: AIService(),
+            "job_queue": get_job_queue,
+            "variant_pool": get_variant_pool,
+        },
+    )
     try:
-        yield {"db": db, "ai_service": ai_service}
+        yield context
     finally:
-        db.close()
+        context.close()
+
 
+if IMAGE_PROXY_ENABLED:
+    app.include_router(images_router)
 
-graphql_app = GraphQLRouter(schema, context_getter=get_context)
+# Admits requests under per-client limits (RATE_LIMIT=1) and answers the
+# frontend's static queries from cached fragments when it can
+graphql_app = GalleryGraphQLRouter(
+    schema,
+    context_getter=get_context,
+    fair_use=fair_use if RATE_LIMIT_ENABLED else None,
+)
 
 app.include_router(graphql_app, prefix="/graphql")
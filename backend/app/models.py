@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -17,21 +17,32 @@ class Artist(Base):
 
     # Relationships
     artworks: Mapped[list["Artwork"]] = relationship(back_populates="artist")
+    collections: Mapped[list["Collection"]] = relationship(back_populates="artist")
 
 
 class Collection(Base):
     __tablename__ = "collections"
+    # Every lookup is scoped to one artist; see docs/decision_log/0028
+    __table_args__ = (Index("ix_collections_artist_id_id", "artist_id", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Gallery the collection belongs to; unset on single-gallery databases
+    artist_id: Mapped[int | None] = mapped_column(ForeignKey("artists.id"), nullable=True)
 
     # Relationships
+    artist: Mapped["Artist | None"] = relationship(back_populates="collections")
     artworks: Mapped[list["Artwork"]] = relationship(back_populates="collection")
 
 
 class Artwork(Base):
     __tablename__ = "artworks"
+    # (scope, id) so scoped lists are read in ID order straight from the index
+    __table_args__ = (
+        Index("ix_artworks_collection_id_id", "collection_id", "id"),
+        Index("ix_artworks_artist_id_id", "artist_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -46,10 +57,60 @@ class Artwork(Base):
 
 class AIInterpretation(Base):
     __tablename__ = "ai_interpretations"
+    # Cover the per-artwork lookups: latest interpretation, and variants or
+    # counts for one prompt in generation order
+    __table_args__ = (
+        Index("ix_ai_interpretations_artwork_id_generated_at", "artwork_id", "generated_at"),
+        Index(
+            "ix_ai_interpretations_prompt_hash_artwork_id_generated_at",
+            "prompt_hash",
+            "artwork_id",
+            "generated_at",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     context: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Set for pre-generated interpretations, which serve as fallbacks when
+    # live generation is unavailable
+    artwork_id: Mapped[int | None] = mapped_column(ForeignKey("artworks.id"), nullable=True)
+    # Prompt template that produced the content (see app/prompts.py); used to
+    # find interpretations that are stale after a prompt change
+    prompt_version: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    prompt_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
     generated_at: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, default=datetime.utcnow
     )
+
+
+# One row per AI provider call, stored or not; see app/usage.py
+class AICall(Base):
+    __tablename__ = "ai_calls"
+    __table_args__ = (Index("ix_ai_calls_artwork_id_called_at", "artwork_id", "called_at"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # No foreign key: the ledger outlives reseeds, which delete artworks
+    artwork_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    provider: Mapped[str] = mapped_column(String(32), nullable=False)
+    model: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    prompt_version: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    prompt_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Token counts as reported by the provider; null when the call failed
+    input_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    output_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    total_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    image_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    latency_ms: Mapped[float] = mapped_column(Float, nullable=False)
+    # InterpretationErrorCode value; null for successful calls
+    error_code: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    called_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+# Single-row counter bumped on every write to the gallery tables; see
+# app/generation.py
+class GalleryGeneration(Base):
+    __tablename__ = "gallery_generation"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    generation: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -0,0 +1,52 @@
+"""GraphQL operations the frontend sends (mirrors frontend/src/queries).
+
+Server-side tooling that needs to replay real traffic, such as the static
+snapshot export and the startup warmup, uses these instead of ad hoc
+queries so it exercises exactly what visitors request.
+"""
+
+GET_ARTIST = """
+query GetArtist {
+  artist {
+    id
+    name
+    bio
+  }
+}
+"""
+
+GET_COLLECTIONS = """
+query GetCollections {
+  collections {
+    id
+    title
+    description
+    artworks {
+      id
+      title
+      imageUrl
+      artist {
+        id
+        name
+      }
+    }
+  }
+}
+"""
+
+GENERATE_INTERPRETATION = """
+query GenerateArtworkInterpretation($artworkId: String!) {
+  generateArtworkInterpretation(artworkId: $artworkId) {
+    id
+    content
+    generatedAt
+    context
+  }
+}
+"""
+
+# Operations without variables, whose response depends only on the data
+STATIC_OPERATIONS = {
+    "GetArtist": GET_ARTIST,
+    "GetCollections": GET_COLLECTIONS,
+}
@@ -0,0 +1,123 @@
+"""Pre-generate AI interpretations and store them in the database.
+
+Stored interpretations are never shown while live generation works; they are
+the fallback served when the AI provider or image host is unavailable.
+
+Usage:
+    python -m app.pregenerate                 # every artwork
+    python -m app.pregenerate --artwork-id 3  # selected artworks
+    python -m app.pregenerate --stale         # only artworks without an
+                                              # interpretation from the active prompt
+    python -m app.pregenerate --variants 3    # top up each artwork to 3 variants
+                                              # from the active prompt (app/variants.py)
+
+Each stored interpretation records the prompt version and hash it was
+generated with (see app/prompts.py), so after a prompt change ``--stale``
+regenerates only what the old prompt produced. Token usage of every call is
+recorded as well; see it with ``python -m app.usage``.
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.ai_service import AIService
+from app.database import SessionLocal, init_db
+from app.logs import configure_logging
+from app.models import Artwork
+from app.repository import InterpretationRepository
+from app.usage import usage_log
+
+logger = logging.getLogger(__name__)
+
+
+async def pregenerate(
+    artwork_ids: list[int] | None = None, stale_only: bool = False, variants: int | None = None
+) -> int:
+    """Generate and store interpretations for the selected artworks.
+
+    Artworks are processed one at a time to stay inside free-tier rate
+    limits. Failures are reported and skipped.
+
+    Args:
+        artwork_ids: Artworks to interpret; defaults to all artworks
+        stale_only: Skip artworks that already have an interpretation
+            generated with the active prompt
+        variants: Generate as many as each artwork needs to have this many
+            interpretations from the active prompt, instead of one each
+
+    Returns:
+        Number of interpretations stored
+    """
+    init_db()
+    ai_service = AIService()
+    db = SessionLocal()
+    stored = 0
+    try:
+        query = db.query(Artwork).order_by(Artwork.id)
+        if artwork_ids:
+            query = query.filter(Artwork.id.in_(artwork_ids))
+        artworks = query.all()
+
+        repo = InterpretationRepository(db)
+        prompt = ai_service.prompt
+        if variants:
+            counts = repo.count_by_artwork_with_prompt(prompt.hash)
+            artworks = [
+                artwork for artwork in artworks for _ in range(variants - counts.get(artwork.id, 0))
+            ]
+            logger.info(
+                "%d variants needed for prompt %s (%s)", len(artworks), prompt.version, prompt.hash
+            )
+        elif stale_only:
+            current = repo.get_artwork_ids_with_prompt(prompt.hash)
+            artworks = [artwork for artwork in artworks if artwork.id not in current]
+            logger.info(
+                "%d artworks need prompt %s (%s)", len(artworks), prompt.version, prompt.hash
+            )
+
+        for artwork in artworks:
+            try:
+                content = await ai_service.interpret_artwork(artwork)
+            except Exception as e:
+                logger.warning("Skipping artwork %s: %s", artwork.id, e)
+                continue
+            repo.add(artwork.id, content, prompt_version=prompt.version, prompt_hash=prompt.hash)
+            db.commit()
+            stored += 1
+            logger.info("Stored interpretation for artwork %s", artwork.id)
+    finally:
+        db.close()
+        usage_log.flush()
+
+    logger.info("Pre-generated %d of %d interpretations.", stored, len(artworks))
+    return stored
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-generate fallback AI interpretations")
+    parser.add_argument(
+        "--artwork-id",
+        type=int,
+        action="append",
+        dest="artwork_ids",
+        help="Artwork to interpret (repeatable; default: all artworks)",
+    )
+    parser.add_argument(
+        "--stale",
+        action="store_true",
+        help="Only regenerate artworks without an interpretation from the active prompt",
+    )
+    parser.add_argument(
+        "--variants",
+        type=int,
+        metavar="K",
+        help="Top up each artwork to K interpretations from the active prompt",
+    )
+    args = parser.parse_args()
+    configure_logging(default_format="text")
+    asyncio.run(pregenerate(args.artwork_ids, stale_only=args.stale, variants=args.variants))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Versioned prompt templates for AI interpretations.
+
+Every template is registered under a version name and identified by a hash
+of its text. Interpretations store both, so when the prompt changes only the
+interpretations produced by an older prompt need regenerating.
+
+Templates use ``str.format`` placeholders and are parsed once at import;
+rendering joins the precompiled literal parts with the artwork's fields.
+Never edit a registered template in place; add a new version instead.
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+from string import Formatter
+
+from app.models import Artwork
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A prompt template with a stable identity.
+
+    Attributes:
+        version: Human-readable version name, e.g. "v1"
+        template: Prompt text with ``{title}`` placeholders
+        hash: First 16 hex characters of the SHA-256 of ``template``
+    """
+
+    version: str
+    template: str
+    hash: str = field(init=False)
+    _parts: tuple[tuple[str, str | None], ...] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        parts = tuple(
+            (literal, field_name) for literal, field_name, _, _ in Formatter().parse(self.template)
+        )
+        unknown = {name for _, name in parts if name is not None} - {"title"}
+        if unknown:
+            raise ValueError(f"Unknown prompt placeholders: {', '.join(sorted(unknown))}")
+
+        object.__setattr__(self, "_parts", parts)
+        object.__setattr__(self, "hash", hashlib.sha256(self.template.encode()).hexdigest()[:16])
+
+    def render(self, artwork: Artwork) -> str:
+        """Fill the template with the artwork's metadata."""
+        values = {"title": artwork.title}
+        return "".join(
+            literal + (values[name] if name is not None else "") for literal, name in self._parts
+        )
+
+
+# Prompt engineering considerations (v1):
+# - Third person is enforced to avoid conversational tone
+# - "Based on what you see" emphasizes visual grounding
+# - "Observed, not factual" guides AI away from claiming material knowledge
+# - "Poetic language sparingly" prevents overwrought prose
+# - Explicit length constraint (1-2 paragraphs)
+CURATOR_NOTE_V1 = PromptTemplate(
+    version="v1",
+    template="""You are writing a curator's note for an art gallery visitor.
+Write a brief, observational interpretation of this artwork based on what you see in the image.
+
+Artwork: "{title}"
+
+Focus on what you observe in the image:
+- Colors and palette
+- Composition and structure
+- Mood and emotional tone
+- Texture and technique (visual observation only)
+
+Constraints:
+- Write in third person
+- Always refer to the creator as "the artist" (never by name)
+- Do not mention the title of the artwork.
+- 1-2 paragraphs maximum
+- Base your interpretation only on what you can see in the image
+- Do not invent facts (dates, materials, provenance, artist intent)
+- Offer interpretation only, not assertions
+- Use poetic language sparingly - avoid overwrought or gushy prose
+- Avoid art world jargon unless essential
+
+Write the curator's note:""",
+)
+
+PROMPTS: dict[str, PromptTemplate] = {prompt.version: prompt for prompt in (CURATOR_NOTE_V1,)}
+
+DEFAULT_PROMPT_VERSION = CURATOR_NOTE_V1.version
+
+
+def get_prompt(version: str | None = None) -> PromptTemplate:
+    """Return the prompt template for a version.
+
+    Args:
+        version: Registered version name; defaults to the PROMPT_VERSION
+            environment variable, then to the latest registered version
+
+    Raises:
+        ValueError: If the version is not registered
+    """
+    version = version or os.getenv("PROMPT_VERSION", DEFAULT_PROMPT_VERSION)
+    try:
+        return PROMPTS[version]
+    except KeyError:
+        raise ValueError(
+            f"Unknown prompt version {version!r}. Choose one of: {', '.join(PROMPTS)}"
+        ) from None
@@ -0,0 +1,168 @@
+"""Immutable in-memory read model of the gallery.
+
+The whole gallery (its artists, their collections and artworks) fits
+comfortably in memory, yet every gallery query used to load and hydrate ORM
+objects. With ``READ_MODEL=1`` the gallery resolvers read from a
+``GallerySnapshot`` instead: frozen, slotted dataclasses with the same
+attribute names as the ORM models, so the schema's ``from_model`` helpers
+accept either.
+
+A snapshot records the gallery generation (see ``app/generation.py``) it
+was built at. At most every ``READ_MODEL_CHECK_SECONDS`` a request reads
+the current generation (one single-row query); if it moved, a new snapshot
+is built and swapped in with one reference assignment, so readers always
+see a complete, consistent gallery. Between checks, gallery queries do not
+touch the database at all.
+"""
+
+import os
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.generation import get_generation
+
+READ_MODEL_ENABLED = os.getenv("READ_MODEL", "0") == "1"
+# How stale the read model may be after a write, in seconds
+READ_MODEL_CHECK_SECONDS = float(os.getenv("READ_MODEL_CHECK_SECONDS", "1"))
+
+
+@dataclass(frozen=True, slots=True)
+class ArtistView:
+    id: int
+    name: str
+    bio: str
+
+
+@dataclass(frozen=True, slots=True)
+class ArtworkView:
+    id: int
+    title: str
+    image_url: str
+    artist: ArtistView
+    collection_id: int | None
+
+
+@dataclass(frozen=True, slots=True)
+class CollectionView:
+    id: int
+    title: str
+    description: str | None
+    artworks: tuple[ArtworkView, ...]
+    artist_id: int | None
+
+
+@dataclass(frozen=True, slots=True)
+class GallerySnapshot:
+    generation: int
+    artist: ArtistView | None
+    collections: tuple[CollectionView, ...]
+    collections_by_id: Mapping[int, CollectionView]
+    artworks_by_id: Mapping[int, ArtworkView]
+    artists_by_id: Mapping[int, ArtistView]
+    collections_by_artist: Mapping[int, tuple[CollectionView, ...]]
+
+
+def build_snapshot(db: Session, generation: int) -> GallerySnapshot:
+    """Load the gallery with three flat queries and freeze it."""
+    artists = {
+        row.id: ArtistView(row.id, row.name, row.bio)
+        for row in db.execute(
+            select(models.Artist.id, models.Artist.name, models.Artist.bio).order_by(
+                models.Artist.id
+            )
+        )
+    }
+    artwork_rows = db.execute(
+        select(
+            models.Artwork.id,
+            models.Artwork.title,
+            models.Artwork.image_url,
+            models.Artwork.artist_id,
+            models.Artwork.collection_id,
+        ).order_by(models.Artwork.id)
+    )
+    artworks_by_id = {}
+    artworks_by_collection: dict[int, list[ArtworkView]] = {}
+    for row in artwork_rows:
+        artwork = ArtworkView(
+            row.id, row.title, row.image_url, artists[row.artist_id], row.collection_id
+        )
+        artworks_by_id[row.id] = artwork
+        artworks_by_collection.setdefault(row.collection_id, []).append(artwork)
+
+    collections = tuple(
+        CollectionView(
+            row.id,
+            row.title,
+            row.description,
+            tuple(artworks_by_collection.get(row.id, ())),
+            row.artist_id,
+        )
+        for row in db.execute(
+            select(
+                models.Collection.id,
+                models.Collection.title,
+                models.Collection.description,
+                models.Collection.artist_id,
+            ).order_by(models.Collection.id)
+        )
+    )
+    collections_by_artist: dict[int, list[CollectionView]] = {}
+    for collection in collections:
+        if collection.artist_id is not None:
+            collections_by_artist.setdefault(collection.artist_id, []).append(collection)
+    return GallerySnapshot(
+        generation=generation,
+        artist=next(iter(artists.values()), None),
+        collections=collections,
+        collections_by_id=MappingProxyType({c.id: c for c in collections}),
+        artworks_by_id=MappingProxyType(artworks_by_id),
+        artists_by_id=MappingProxyType(artists),
+        collections_by_artist=MappingProxyType(
+            {artist_id: tuple(items) for artist_id, items in collections_by_artist.items()}
+        ),
+    )
+
+
+class ReadModel:
+    """Holds the current gallery snapshot and rebuilds it when the data changes.
+
+    Attributes:
+        check_seconds: Minimum time between generation checks
+    """
+
+    def __init__(self, check_seconds: float | None = None):
+        self.check_seconds = READ_MODEL_CHECK_SECONDS if check_seconds is None else check_seconds
+        self._snapshot: GallerySnapshot | None = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def snapshot(self, db: Session) -> GallerySnapshot:
+        """Return the current snapshot, rebuilding it first if the gallery changed."""
+        current = self._snapshot
+        if current is not None and time.monotonic() - self._checked_at < self.check_seconds:
+            return current
+
+        with self._lock:
+            # Another request may have refreshed while this one waited
+            if self._snapshot is not current and self._snapshot is not None:
+                return self._snapshot
+            generation = get_generation(db)
+            if self._snapshot is None or self._snapshot.generation != generation:
+                self._snapshot = build_snapshot(db, generation)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def invalidate(self) -> None:
+        """Force a generation check on the next read."""
+        self._checked_at = float("-inf")
+
+
+read_model = ReadModel()
@@ -0,0 +1,164 @@
+"""Route request reads to read replicas that have caught up with the primary.
+
+Nearly every request only reads, so the GraphQL resolvers, the image proxy
+and warmup use ``ReadSession`` (see ``app/database.py``), which this router
+binds to a replica. Seeding, interpretation storage, usage records and the
+CLIs keep using ``SessionLocal`` and the primary.
+
+Replicas are listed in ``DATABASE_REPLICA_URLS`` (comma-separated). A
+replica serves reads while it is fresh: at most once per
+``DATABASE_REPLICA_CHECK_SECONDS`` the router reads the gallery generation
+(see ``app/generation.py``) from the primary and from each replica, and
+only replicas that answer and have applied the primary's generation stay
+in rotation. Fresh replicas take reads round-robin. A replica whose
+connection drops leaves the rotation at once and is checked again with the
+others. With no fresh replica, reads fall back to the primary, so a lagging
+or failed replica never serves a gallery older than the primary's.
+
+The generation only moves with gallery writes (artists, collections,
+artworks). Stored interpretations and variants may reach a replica later
+than the check suggests; they are fallbacks and rotate slowly, so a
+moment's lag there is harmless.
+
+Without replicas, ``read_engine`` is simply the primary engine.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+from sqlalchemy import Engine, event, make_url
+from sqlalchemy.orm import Session
+
+from app.generation import get_generation
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaRouter:
+    """Choose the engine each read session uses.
+
+    Attributes:
+        urls: Replica database URLs
+        check_seconds: Minimum time between freshness checks
+        lag: Generations each replica was behind the primary at the last
+            check; None for replicas that could not be reached
+        fallbacks: Read sessions sent to the primary for want of a fresh replica
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        primary: Callable[[], Engine],
+        engine_factory: Callable[[str], Engine],
+        check_seconds: float,
+    ):
+        """Create the router; replica engines are created on first use.
+
+        Args:
+            urls: Replica database URLs
+            primary: Returns the primary engine
+            engine_factory: Creates an engine for a replica URL
+            check_seconds: Minimum time between freshness checks
+        """
+        self.urls = urls
+        self.check_seconds = check_seconds
+        self.lag: dict[str, int | None] = {}
+        self.fallbacks = 0
+        self._primary = primary
+        self._engine_factory = engine_factory
+        self._engines: dict[str, Engine] = {}
+        self._fresh: list[str] = []
+        self._checked_at: float | None = None
+        self._turn = 0
+        self._lock = threading.Lock()
+
+    def engines(self) -> list[Engine]:
+        """Every replica engine, created if needed."""
+        return [self._engine(url) for url in self.urls]
+
+    def read_engine(self) -> Engine:
+        """A fresh replica's engine, or the primary's if none is fresh."""
+        if not self.urls:
+            return self._primary()
+        if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_seconds:
+            self.check()
+        with self._lock:
+            if not self._fresh:
+                self.fallbacks += 1
+                return self._primary()
+            url = self._fresh[self._turn % len(self._fresh)]
+            self._turn += 1
+        return self._engine(url)
+
+    def check(self) -> None:
+        """Compare each replica's gallery generation with the primary's."""
+        with self._lock:
+            # Another thread may have checked while this one waited
+            if (
+                self._checked_at is not None
+                and time.monotonic() - self._checked_at < self.check_seconds
+            ):
+                return
+            # Let other sessions use the current rotation meanwhile
+            self._checked_at = time.monotonic()
+
+        try:
+            with Session(self._primary()) as db:
+                primary = get_generation(db)
+        except Exception as e:
+            # Without the primary there is nothing to compare with; keep the
+            # current rotation until the next check
+            logger.warning("Could not check read replicas against the primary: %s", e)
+            return
+        lag: dict[str, int | None] = {}
+        for url in self.urls:
+            try:
+                with Session(self._engine(url)) as db:
+                    lag[url] = max(primary - get_generation(db), 0)
+            except Exception as e:
+                logger.warning("Read replica %s is unavailable: %s", _redact(url), e)
+                lag[url] = None
+
+        with self._lock:
+            self.lag = lag
+            self._fresh = [url for url in self.urls if lag[url] == 0]
+            self._checked_at = time.monotonic()
+        behind = [_redact(url) for url in self.urls if lag[url]]
+        if behind:
+            logger.info("Read replicas behind the primary: %s", ", ".join(behind))
+
+    def reset(self) -> None:
+        """Forget the last check; the next read checks again."""
+        with self._lock:
+            self._checked_at = None
+            self._fresh = []
+            self.lag = {}
+
+    def _engine(self, url: str) -> Engine:
+        engine = self._engines.get(url)
+        if engine is None:
+            with self._lock:
+                engine = self._engines.get(url)
+                if engine is None:
+                    engine = self._engine_factory(url)
+                    event.listen(engine, "handle_error", self._on_error(url))
+                    self._engines[url] = engine
+        return engine
+
+    def _on_error(self, url: str) -> Callable:
+        def handle_error(context) -> None:
+            # Stop routing to a replica whose connection dropped
+            if context.is_disconnect:
+                with self._lock:
+                    if url in self._fresh:
+                        self._fresh.remove(url)
+                logger.warning("Read replica %s disconnected", _redact(url))
+
+        return handle_error
+
+
+def _redact(url: str) -> str:
+    """The URL without its password, for logs."""
+    return make_url(url).render_as_string(hide_password=True)
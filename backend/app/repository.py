@@ -1,6 +1,10 @@
-from sqlalchemy.orm import Session
+from collections.abc import Iterator
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload
 
 from app import models
+from app.search import SearchPage, search_documents
 
 
 class ArtistRepository:
@@ -8,8 +12,22 @@ class ArtistRepository:
         self.db = db
 
     def get_artist(self) -> models.Artist | None:
-        """Get the single artist. Returns first artist found."""
-        return self.db.query(models.Artist).first()
+        """Get the default artist: the first one created.
+
+        Single-gallery deployments and clients that do not pass an artist ID
+        rely on this.
+        """
+        return self.db.query(models.Artist).order_by(models.Artist.id).first()
+
+    def get_by_id(self, artist_id: int) -> models.Artist | None:
+        """Get an artist by ID."""
+        return self.db.query(models.Artist).filter_by(id=artist_id).first()
+
+    def get_page(self, limit: int, offset: int = 0) -> list[models.Artist]:
+        """Get artists in ID order, one page at a time."""
+        return list(
+            self.db.query(models.Artist).order_by(models.Artist.id).limit(limit).offset(offset)
+        )
 
 
 class CollectionRepository:
@@ -17,8 +35,16 @@ class CollectionRepository:
         self.db = db
 
     def get_all(self) -> list[models.Collection]:
-        """Get all collections."""
-        return list(self.db.query(models.Collection).all())
+        """Get all collections, of every artist."""
+        return list(self.db.query(models.Collection).order_by(models.Collection.id))
+
+    def get_by_artist(self, artist_id: int) -> list[models.Collection]:
+        """Get one artist's collections in ID order (served from their index)."""
+        return list(
+            self.db.query(models.Collection)
+            .filter_by(artist_id=artist_id)
+            .order_by(models.Collection.id)
+        )
 
     def get_by_id(self, collection_id: int) -> models.Collection | None:
         """Get a collection by ID."""
@@ -32,3 +58,121 @@ class ArtworkRepository:
     def get_by_id(self, artwork_id: int) -> models.Artwork | None:
         """Get an artwork by ID."""
         return self.db.query(models.Artwork).filter_by(id=artwork_id).first()
+
+    def get_by_ids(self, artwork_ids: list[int]) -> list[models.Artwork]:
+        """Get the artworks with the given IDs, ordered by ID. Missing IDs are skipped."""
+        return list(
+            self.db.query(models.Artwork)
+            .filter(models.Artwork.id.in_(artwork_ids))
+            .order_by(models.Artwork.id)
+        )
+
+    def iter_by_collection(
+        self, collection_id: int, batch_size: int
+    ) -> Iterator[list[models.Artwork]]:
+        """Yield a collection's artworks in ID order, ``batch_size`` at a time.
+
+        Rows are fetched from a server-side cursor (``yield_per``) where the
+        driver supports one, so the collection is never loaded as one list.
+        The cursor is closed when the iterator finishes or is closed.
+        """
+        result = self.db.execute(
+            select(models.Artwork)
+            .where(models.Artwork.collection_id == collection_id)
+            .options(joinedload(models.Artwork.artist))
+            .order_by(models.Artwork.id)
+            .execution_options(yield_per=batch_size)
+        )
+        try:
+            for partition in result.scalars().partitions():
+                yield list(partition)
+        finally:
+            result.close()
+
+
+class InterpretationRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_latest_for_artwork(self, artwork_id: int) -> models.AIInterpretation | None:
+        """Get the most recently stored interpretation for an artwork."""
+        return (
+            self.db.query(models.AIInterpretation)
+            .filter_by(artwork_id=artwork_id)
+            .order_by(models.AIInterpretation.generated_at.desc())
+            .first()
+        )
+
+    def get_latest_by_artwork(self) -> dict[int, models.AIInterpretation]:
+        """Get the most recently stored interpretation of every artwork that has one."""
+        rows = (
+            self.db.query(models.AIInterpretation)
+            .filter(models.AIInterpretation.artwork_id.is_not(None))
+            .order_by(models.AIInterpretation.generated_at, models.AIInterpretation.id)
+        )
+        return {row.artwork_id: row for row in rows}
+
+    def get_artwork_ids_with_prompt(self, prompt_hash: str) -> set[int]:
+        """Get IDs of artworks that have an interpretation from the given prompt."""
+        rows = (
+            self.db.query(models.AIInterpretation.artwork_id)
+            .filter(
+                models.AIInterpretation.prompt_hash == prompt_hash,
+                models.AIInterpretation.artwork_id.is_not(None),
+            )
+            .distinct()
+        )
+        return {artwork_id for (artwork_id,) in rows}
+
+    def get_variants(self, artwork_id: int, prompt_hash: str) -> list[models.AIInterpretation]:
+        """Get an artwork's stored interpretations from one prompt, oldest first."""
+        return list(
+            self.db.query(models.AIInterpretation)
+            .filter_by(artwork_id=artwork_id, prompt_hash=prompt_hash)
+            .order_by(models.AIInterpretation.generated_at, models.AIInterpretation.id)
+        )
+
+    def count_by_artwork_with_prompt(self, prompt_hash: str) -> dict[int, int]:
+        """Count each artwork's stored interpretations from one prompt."""
+        rows = (
+            self.db.query(models.AIInterpretation.artwork_id, func.count())
+            .filter(
+                models.AIInterpretation.prompt_hash == prompt_hash,
+                models.AIInterpretation.artwork_id.is_not(None),
+            )
+            .group_by(models.AIInterpretation.artwork_id)
+        )
+        return {artwork_id: count for artwork_id, count in rows}
+
+    def delete(self, interpretation_id: int) -> None:
+        """Delete a stored interpretation if it exists. Caller commits."""
+        interpretation = self.db.get(models.AIInterpretation, interpretation_id)
+        if interpretation is not None:
+            self.db.delete(interpretation)
+
+    def add(
+        self,
+        artwork_id: int,
+        content: str,
+        prompt_version: str | None = None,
+        prompt_hash: str | None = None,
+    ) -> models.AIInterpretation:
+        """Store an interpretation for an artwork. Caller commits."""
+        interpretation = models.AIInterpretation(
+            artwork_id=artwork_id,
+            content=content,
+            context=f"artwork:{artwork_id}",
+            prompt_version=prompt_version,
+            prompt_hash=prompt_hash,
+        )
+        self.db.add(interpretation)
+        return interpretation
+
+
+class SearchRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search(self, query: str, limit: int, offset: int = 0) -> SearchPage:
+        """Full-text search over artworks, collections, the artist and interpretations."""
+        return search_documents(self.db, query, limit, offset)
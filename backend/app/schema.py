@@ -1,10 +1,38 @@
+import asyncio
+import logging
+from collections.abc import AsyncGenerator, Mapping
 from datetime import datetime, timezone
+from itertools import islice
 from typing import List
 
 import strawberry
+from graphql import GraphQLError
+from sqlalchemy.orm import Session
+from strawberry.schema.config import StrawberryConfig
 
 from app import models
-from app.repository import ArtistRepository, ArtworkRepository, CollectionRepository
+from app.ai_service import InterpretationError, InterpretationErrorCode
+from app.context import ReleaseRequestResources
+from app.interpretation_cache import CachedInterpretation, interpretation_cache
+from app.jobs import Job, JobStatus
+from app.read_model import ArtistView, ArtworkView, CollectionView, GallerySnapshot
+from app.repository import (
+    ArtistRepository,
+    ArtworkRepository,
+    CollectionRepository,
+    InterpretationRepository,
+    SearchRepository,
+)
+from app.search import SearchKind
+from app.similarity import MAX_RELATED
+
+logger = logging.getLogger(__name__)
+
+strawberry.enum(
+    InterpretationErrorCode, description="Why a live interpretation could not be generated"
+)
+strawberry.enum(JobStatus, description="Lifecycle of a background interpretation job")
+strawberry.enum(SearchKind, description="What a search hit matched")
 
 
 @strawberry.type
@@ -13,8 +41,13 @@ class Artist:
     name: str
     bio: str
 
+    @strawberry.field
+    def collections(self, info: strawberry.Info) -> List["Collection"]:
+        """The artist's collections."""
+        return _artist_collections(info, int(self.id))
+
     @classmethod
-    def from_model(cls, model: models.Artist) -> "Artist":
+    def from_model(cls, model: models.Artist | ArtistView) -> "Artist":
         return cls(id=str(model.id), name=model.name, bio=model.bio)
 
 
@@ -26,7 +59,7 @@ class Artwork:
     artist: Artist
 
     @classmethod
-    def from_model(cls, model: models.Artwork) -> "Artwork":
+    def from_model(cls, model: models.Artwork | ArtworkView) -> "Artwork":
         return cls(
             id=str(model.id),
             title=model.title,
@@ -35,20 +68,36 @@ class Artwork:
         )
 
 
+# Artworks per @stream batch of Collection.artworks (one cursor fetch each)
+ARTWORK_STREAM_BATCH_SIZE = 50
+
+
 @strawberry.type
 class Collection:
     id: str
     title: str
     description: str | None
-    artworks: List[Artwork]
+    source: strawberry.Private[models.Collection | CollectionView]
+
+    @strawberry.field
+    def artworks(self, info: strawberry.Info) -> List[Artwork]:
+        """Artworks in the collection.
+
+        With ``@stream`` the first ``initialCount`` artworks arrive in the
+        initial response and the rest follow in batches read from a
+        server-side cursor.
+        """
+        if _is_streamed(info):
+            return _stream_artworks(info.context["db"], self.source)
+        return [Artwork.from_model(a) for a in self.source.artworks]
 
     @classmethod
-    def from_model(cls, model: models.Collection) -> "Collection":
+    def from_model(cls, model: models.Collection | CollectionView) -> "Collection":
         return cls(
             id=str(model.id),
             title=model.title,
             description=model.description,
-            artworks=[Artwork.from_model(a) for a in model.artworks],
+            source=model,
         )
 
 
@@ -58,49 +107,241 @@ class AIInterpretation:
     content: str
     generated_at: datetime
     context: str
+    # Set when live generation failed and this is a cached or pre-generated
+    # fallback; null for fresh interpretations
+    error_code: InterpretationErrorCode | None = None
+
+
+@strawberry.type
+class ArtworkInterpretationResult:
+    artwork_id: str
+    # Fresh interpretation, or a fallback when error_code is set; null if
+    # generation failed and no fallback exists
+    interpretation: AIInterpretation | None
+    error_code: InterpretationErrorCode | None = None
+
+
+@strawberry.type
+class InterpretationJob:
+    id: str
+    artwork_id: str
+    status: JobStatus
+    created_at: datetime
+    updated_at: datetime
+    # Set once the job has finished: the fresh interpretation, or the
+    # artwork's fallback (with error_code set) if generation failed
+    interpretation: AIInterpretation | None = None
+    error_code: InterpretationErrorCode | None = None
+
+    @classmethod
+    async def from_job(cls, job: Job, db: Session) -> "InterpretationJob":
+        interpretation = None
+        if job.status == JobStatus.SUCCEEDED:
+            interpretation = AIInterpretation(
+                id=f"job-{job.id}",
+                content=job.content,
+                generated_at=job.updated_at,
+                context=f"artwork:{job.artwork_id}",
+            )
+        elif job.status == JobStatus.FAILED:
+            interpretation = await _degraded_interpretation(db, job.artwork_id, job.error_code)
+        return cls(
+            id=job.id,
+            artwork_id=str(job.artwork_id),
+            status=job.status,
+            created_at=job.created_at,
+            updated_at=job.updated_at,
+            interpretation=interpretation,
+            error_code=job.error_code,
+        )
+
+
+@strawberry.type
+class SearchHit:
+    kind: SearchKind
+    # ID of the matched artwork, collection, artist or interpretation
+    id: str
+    title: str
+    # Excerpt around the match with matched terms wrapped in <mark></mark>;
+    # everything else is plain text and must be escaped by the client
+    snippet: str
+    score: float
+    # The matched artwork, or the artwork an interpretation is about
+    artwork: Artwork | None = None
+
+
+@strawberry.type
+class SearchResults:
+    # Number of matches across all pages
+    total: int
+    hits: List[SearchHit]
+
+
+# Upper bound on distinct artworks per batch request (one provider call each)
+MAX_BATCH_SIZE = 50
+# Upper bound on search hits per page
+MAX_SEARCH_RESULTS = 50
+# Upper bound on artists per page
+MAX_ARTISTS = 100
 
 
 @strawberry.type
 class Query:
     @strawberry.field
-    def artist(self, info: strawberry.Info) -> Artist | None:
-        """Returns the gallery artist."""
-        db = info.context["db"]
-        repo = ArtistRepository(db)
-        artist_model = repo.get_artist()
+    def artist(self, info: strawberry.Info, id: str | None = None) -> Artist | None:
+        """Get an artist by ID, or the default (first) artist without one."""
+        if id is None:
+            gallery = _gallery_snapshot(info)
+            if gallery is not None:
+                artist_model = gallery.artist
+            else:
+                artist_model = ArtistRepository(info.context["db"]).get_artist()
+            return Artist.from_model(artist_model) if artist_model else None
+        try:
+            artist_id = int(id)
+        except ValueError:
+            return None
+        gallery = _gallery_snapshot(info)
+        if gallery is not None:
+            artist_model = gallery.artists_by_id.get(artist_id)
+        else:
+            artist_model = ArtistRepository(info.context["db"]).get_by_id(artist_id)
         return Artist.from_model(artist_model) if artist_model else None
 
     @strawberry.field
-    def collections(self, info: strawberry.Info) -> List[Collection]:
-        db = info.context["db"]
-        repo = CollectionRepository(db)
-        collection_models = repo.get_all()
+    def artists(self, info: strawberry.Info, first: int = 20, offset: int = 0) -> List[Artist]:
+        """Artists in ID order, one page at a time.
+
+        Args:
+            info: GraphQL context containing database session
+            first: Page size (at most 100)
+            offset: Number of artists to skip
+        """
+        limit, offset = max(0, min(first, MAX_ARTISTS)), max(0, offset)
+        gallery = _gallery_snapshot(info)
+        if gallery is not None:
+            artist_models = islice(gallery.artists_by_id.values(), offset, offset + limit)
+        else:
+            artist_models = ArtistRepository(info.context["db"]).get_page(limit, offset)
+        return [Artist.from_model(a) for a in artist_models]
+
+    @strawberry.field
+    def collections(self, info: strawberry.Info, artist_id: str | None = None) -> List[Collection]:
+        """Collections of one artist, or of every artist without ``artistId``.
+
+        Deployments serving many artists should always pass ``artistId``;
+        the unscoped list is kept for single-gallery clients.
+        """
+        if artist_id is not None:
+            try:
+                scoped_id = int(artist_id)
+            except ValueError:
+                return []
+            return _artist_collections(info, scoped_id)
+        gallery = _gallery_snapshot(info)
+        if gallery is not None:
+            collection_models = gallery.collections
+        else:
+            repo = CollectionRepository(info.context["db"])
+            collection_models = repo.get_all()
         return [Collection.from_model(c) for c in collection_models]
 
     @strawberry.field
     def collection(self, id: str, info: strawberry.Info) -> Collection | None:
         """Get single collection by ID."""
-        db = info.context["db"]
-        repo = CollectionRepository(db)
         try:
             collection_id = int(id)
         except ValueError:
             return None
-        collection_model = repo.get_by_id(collection_id)
+        gallery = _gallery_snapshot(info)
+        if gallery is not None:
+            collection_model = gallery.collections_by_id.get(collection_id)
+        else:
+            repo = CollectionRepository(info.context["db"])
+            collection_model = repo.get_by_id(collection_id)
         return Collection.from_model(collection_model) if collection_model else None
 
     @strawberry.field
     def artwork(self, id: str, info: strawberry.Info) -> Artwork | None:
         """Get single artwork by ID."""
-        db = info.context["db"]
-        repo = ArtworkRepository(db)
         try:
             artwork_id = int(id)
         except ValueError:
             return None
-        artwork_model = repo.get_by_id(artwork_id)
+        gallery = _gallery_snapshot(info)
+        if gallery is not None:
+            artwork_model = gallery.artworks_by_id.get(artwork_id)
+        else:
+            repo = ArtworkRepository(info.context["db"])
+            artwork_model = repo.get_by_id(artwork_id)
         return Artwork.from_model(artwork_model) if artwork_model else None
 
+    @strawberry.field
+    def related_artworks(self, id: str, info: strawberry.Info, k: int = 6) -> List[Artwork]:
+        """Artworks closest in color to the given one, most similar first.
+
+        Answered from the similarity index (see app/similarity.py). Empty if
+        the artwork is unknown or has not been indexed yet.
+
+        Args:
+            id: The ID of the artwork to find neighbours for
+            info: GraphQL context containing database session and similarity index
+            k: Number of related artworks (at most 50)
+        """
+        try:
+            artwork_id = int(id)
+        except ValueError:
+            return []
+        index = info.context["similarity_index"].get()
+        if index is None:
+            return []
+        related_ids = [
+            related_id for related_id, _ in index.related(artwork_id, min(k, MAX_RELATED))
+        ]
+        artworks_by_id = _artworks_by_id(info, related_ids)
+        # The index can trail the database: skip artworks deleted since it was built
+        return [
+            Artwork.from_model(artworks_by_id[related_id])
+            for related_id in related_ids
+            if related_id in artworks_by_id
+        ]
+
+    @strawberry.field
+    def search(
+        self, query: str, info: strawberry.Info, first: int = 20, offset: int = 0
+    ) -> SearchResults:
+        """Full-text search over artworks, collections, the artist and stored interpretations.
+
+        Words must all match (the last one also as a prefix on SQLite).
+        Hits are ranked by relevance, titles weighing more than text.
+
+        Args:
+            query: Free text to search for
+            info: GraphQL context containing database session
+            first: Page size (at most 50)
+            offset: Number of hits to skip
+        """
+        page = SearchRepository(info.context["db"]).search(
+            query, limit=max(0, min(first, MAX_SEARCH_RESULTS)), offset=max(0, offset)
+        )
+        artworks_by_id = _artworks_by_id(
+            info, [hit.artwork_id for hit in page.hits if hit.artwork_id is not None]
+        )
+        hits = []
+        for hit in page.hits:
+            artwork_model = artworks_by_id.get(hit.artwork_id)
+            hits.append(
+                SearchHit(
+                    kind=hit.kind,
+                    id=str(hit.ref_id),
+                    title=hit.title,
+                    snippet=hit.snippet,
+                    score=hit.score,
+                    artwork=Artwork.from_model(artwork_model) if artwork_model else None,
+                )
+            )
+        return SearchResults(total=page.total, hits=hits)
+
     @strawberry.field
     async def generate_artwork_interpretation(
         self, artwork_id: str, info: strawberry.Info
@@ -111,6 +352,12 @@ class Query:
         focusing on colors, composition, mood, and texture. The interpretation
         is generated fresh on each request.
 
+        If generation fails (including fast failures while a circuit breaker
+        is open), the most recent cached or pre-generated interpretation is
+        returned with ``errorCode`` set. Without a fallback, the field
+        resolves to null with a GraphQL error whose ``extensions.code``
+        carries the same error code.
+
         Args:
             artwork_id: The ID of the artwork to interpret
             info: GraphQL context containing database session and AI service
@@ -135,22 +382,316 @@ class Query:
         # Generate AI interpretation
         try:
             interpretation_text = await ai_service.interpret_artwork(artwork_model)
+        except Exception as e:
+            _log_interpretation_failure(artwork_id_int, e)
+            code = _error_code(e)
+            interpretation = await _degraded_interpretation(db, artwork_id_int, code)
+            if interpretation is None:
+                raise GraphQLError(
+                    "Interpretation is temporarily unavailable",
+                    extensions={"code": code.value},
+                ) from None
+            return interpretation
+
+        return await _fresh_interpretation(artwork_id_int, interpretation_text)
+
+    @strawberry.field
+    async def artwork_interpretation(
+        self, artwork_id: str, info: strawberry.Info
+    ) -> AIInterpretation | None:
+        """Serve one of the artwork's stored interpretation variants.
+
+        Variants rotate round-robin, so repeat views see different notes
+        without a provider call each time (see app/variants.py). An artwork
+        without variants gets one generated on the spot. If that fails, the
+        fallback interpretation is returned with ``errorCode`` set, as for
+        ``generateArtworkInterpretation``.
 
-            # Create ephemeral AIInterpretation object (not persisted to DB)
-            now = datetime.now(timezone.utc)
-            return AIInterpretation(
-                id=f"ephemeral-{artwork_id}-{int(now.timestamp())}",
-                content=interpretation_text,
-                generated_at=now,
-                context=f"artwork:{artwork_id}",
+        Args:
+            artwork_id: The ID of the artwork to interpret
+            info: GraphQL context containing database session and variant pool
+
+        Returns:
+            AIInterpretation object, or None if artwork not found
+        """
+        db = info.context["db"]
+        pool = info.context["variant_pool"]
+        try:
+            artwork_id_int = int(artwork_id)
+        except ValueError:
+            return None
+
+        variant = pool.next(db, artwork_id_int)
+        if variant is None:
+            artwork_model = ArtworkRepository(db).get_by_id(artwork_id_int)
+            if not artwork_model:
+                return None
+            try:
+                variant = await pool.generate(artwork_model)
+            except Exception as e:
+                _log_interpretation_failure(artwork_id_int, e)
+                code = _error_code(e)
+                interpretation = await _degraded_interpretation(db, artwork_id_int, code)
+                if interpretation is None:
+                    raise GraphQLError(
+                        "Interpretation is temporarily unavailable",
+                        extensions={"code": code.value},
+                    ) from None
+                return interpretation
+
+        return AIInterpretation(
+            id=str(variant.id),
+            content=variant.content,
+            generated_at=variant.generated_at,
+            context=f"artwork:{artwork_id_int}",
+        )
+
+    @strawberry.field
+    async def generate_artwork_interpretations(
+        self, artwork_ids: List[str], info: strawberry.Info
+    ) -> List[ArtworkInterpretationResult]:
+        """Generate fresh AI interpretations for several artworks in one request.
+
+        Images are fetched concurrently and provider calls run with bounded
+        parallelism (see ``AIService.interpret_artworks``). Failures are
+        reported per artwork: a failed artwork gets an ``errorCode`` and, when
+        one exists, the same cached or pre-generated fallback the single
+        query would serve. Duplicate IDs are generated once.
+
+        Args:
+            artwork_ids: IDs of the artworks to interpret (at most 50 distinct)
+            info: GraphQL context containing database session and AI service
+
+        Returns:
+            One result per requested ID, in request order
+        """
+        requested = list(dict.fromkeys(artwork_ids))
+        if len(requested) > MAX_BATCH_SIZE:
+            raise GraphQLError(
+                f"At most {MAX_BATCH_SIZE} artworks can be interpreted per request",
+                extensions={"code": "BATCH_TOO_LARGE"},
+            )
+
+        db = info.context["db"]
+        ai_service = info.context["ai_service"]
+
+        parsed: dict[str, int | None] = {}
+        for raw in requested:
+            try:
+                parsed[raw] = int(raw)
+            except ValueError:
+                parsed[raw] = None
+        numeric_ids = list(dict.fromkeys(value for value in parsed.values() if value is not None))
+        artworks = ArtworkRepository(db).get_by_ids(numeric_ids) if numeric_ids else []
+        outcomes = await ai_service.interpret_artworks(artworks) if artworks else []
+
+        # Keyed by the parsed ID, so "007" finds artwork 7
+        results: dict[int, tuple[AIInterpretation | None, InterpretationErrorCode | None]] = {}
+        for artwork_model, outcome in zip(artworks, outcomes):
+            if isinstance(outcome, Exception):
+                _log_interpretation_failure(artwork_model.id, outcome)
+                code = _error_code(outcome)
+                results[artwork_model.id] = (
+                    await _degraded_interpretation(db, artwork_model.id, code),
+                    code,
+                )
+            else:
+                results[artwork_model.id] = (
+                    await _fresh_interpretation(artwork_model.id, outcome),
+                    None,
+                )
+
+        not_found = (None, InterpretationErrorCode.ARTWORK_NOT_FOUND)
+        response = []
+        for raw in artwork_ids:
+            interpretation, code = results.get(parsed[raw], not_found)
+            response.append(
+                ArtworkInterpretationResult(
+                    artwork_id=raw, interpretation=interpretation, error_code=code
+                )
             )
-        except Exception:
-            # Log error with full traceback for debugging
-            import traceback
+        return response
+
+    @strawberry.field
+    async def interpretation_job(self, id: str, info: strawberry.Info) -> InterpretationJob | None:
+        """Get a background interpretation job by ID (for polling)."""
+        job = info.context["job_queue"].get(id)
+        return await InterpretationJob.from_job(job, info.context["db"]) if job else None
+
+
+@strawberry.type
+class Mutation:
+    @strawberry.mutation
+    async def enqueue_artwork_interpretation(
+        self, artwork_id: str, info: strawberry.Info
+    ) -> InterpretationJob | None:
+        """Queue an AI interpretation of an artwork and return immediately.
+
+        The interpretation is generated by a background worker. Poll
+        ``interpretationJob`` or subscribe to ``interpretationJob`` with the
+        returned ID for the result. While a job for the artwork is queued or
+        running, enqueueing it again returns that same job.
 
-            print(f"Error generating AI interpretation for artwork {artwork_id}:")
-            print(traceback.format_exc())
+        Args:
+            artwork_id: The ID of the artwork to interpret
+            info: GraphQL context containing database session and job queue
+
+        Returns:
+            The queued (or already active) job, or None if artwork not found
+        """
+        db = info.context["db"]
+        try:
+            artwork_id_int = int(artwork_id)
+        except ValueError:
             return None
+        if ArtworkRepository(db).get_by_id(artwork_id_int) is None:
+            return None
+
+        job = info.context["job_queue"].enqueue(artwork_id_int)
+        return await InterpretationJob.from_job(job, db)
+
+
+@strawberry.type
+class Subscription:
+    @strawberry.subscription
+    async def interpretation_job(
+        self, id: str, info: strawberry.Info
+    ) -> AsyncGenerator[InterpretationJob, None]:
+        """Emit the job's state now and on every change until it finishes."""
+        async for job in info.context["job_queue"].watch(id):
+            yield await InterpretationJob.from_job(job, info.context["db"])
+
+
+def _gallery_snapshot(info: strawberry.Info) -> GallerySnapshot | None:
+    """The in-memory gallery when the read model is enabled (see app/read_model.py)."""
+    read_model = info.context.get("read_model")
+    return read_model.snapshot(info.context["db"]) if read_model else None
+
+
+def _is_streamed(info: strawberry.Info) -> bool:
+    """Whether the field was requested with an enabled ``@stream``."""
+    stream = info.selected_fields[0].directives.get("stream")
+    return stream is not None and stream.get("if", True) is not False
+
+
+async def _stream_artworks(
+    db: Session, source: models.Collection | CollectionView
+) -> AsyncGenerator[Artwork, None]:
+    if isinstance(source, CollectionView):
+        artworks = source.artworks
+        batches = (
+            artworks[start : start + ARTWORK_STREAM_BATCH_SIZE]
+            for start in range(0, len(artworks), ARTWORK_STREAM_BATCH_SIZE)
+        )
+    else:
+        batches = ArtworkRepository(db).iter_by_collection(source.id, ARTWORK_STREAM_BATCH_SIZE)
+    try:
+        for batch in batches:
+            for artwork in batch:
+                yield Artwork.from_model(artwork)
+            # Let the executor send what is ready before the next fetch
+            await asyncio.sleep(0)
+    finally:
+        # Releases the cursor if the client disconnects mid-stream
+        batches.close()
+
+
+def _artist_collections(info: strawberry.Info, artist_id: int) -> List[Collection]:
+    """One artist's collections from the read model when enabled, else by index lookup."""
+    gallery = _gallery_snapshot(info)
+    if gallery is not None:
+        collection_models = gallery.collections_by_artist.get(artist_id, ())
+    else:
+        collection_models = CollectionRepository(info.context["db"]).get_by_artist(artist_id)
+    return [Collection.from_model(c) for c in collection_models]
+
+
+def _artworks_by_id(
+    info: strawberry.Info, artwork_ids: list[int]
+) -> Mapping[int, models.Artwork | ArtworkView]:
+    """Look up artworks in the read model when enabled, else with one query."""
+    if not artwork_ids:
+        return {}
+    gallery = _gallery_snapshot(info)
+    if gallery is not None:
+        return gallery.artworks_by_id
+    repo = ArtworkRepository(info.context["db"])
+    return {artwork.id: artwork for artwork in repo.get_by_ids(artwork_ids)}
+
+
+def _error_code(error: Exception) -> InterpretationErrorCode:
+    if isinstance(error, InterpretationError):
+        return error.code
+    return InterpretationErrorCode.GENERATION_FAILED
+
+
+def _log_interpretation_failure(artwork_id: int, error: Exception) -> None:
+    # Classified failures are expected (timeouts, open circuit); only
+    # unexpected ones need a traceback
+    logger.warning(
+        "Interpretation failed for artwork %s: %s",
+        artwork_id,
+        error,
+        exc_info=not isinstance(error, InterpretationError),
+        extra={"artwork_id": artwork_id, "error_code": _error_code(error).value},
+    )
+
+
+async def _fresh_interpretation(artwork_id: int, content: str) -> AIInterpretation:
+    """Wrap newly generated text and remember it as the artwork's fallback."""
+    # Create ephemeral AIInterpretation object (not persisted to DB)
+    now = datetime.now(timezone.utc)
+    interpretation_id = f"ephemeral-{artwork_id}-{int(now.timestamp())}"
+    await interpretation_cache.aput(
+        CachedInterpretation(interpretation_id, artwork_id, content, now)
+    )
+    return AIInterpretation(
+        id=interpretation_id,
+        content=content,
+        generated_at=now,
+        context=f"artwork:{artwork_id}",
+    )
+
+
+async def _degraded_interpretation(
+    db: Session, artwork_id: int, code: InterpretationErrorCode
+) -> AIInterpretation | None:
+    """The artwork's fallback interpretation flagged with ``code``, if one exists."""
+    fallback = await _fallback_interpretation(db, artwork_id)
+    if fallback is None:
+        return None
+    return AIInterpretation(
+        id=fallback.id,
+        content=fallback.content,
+        generated_at=fallback.generated_at,
+        context=f"artwork:{artwork_id}",
+        error_code=code,
+    )
+
+
+async def _fallback_interpretation(db: Session, artwork_id: int) -> CachedInterpretation | None:
+    """Most recent interpretation for an artwork: cached, else pre-generated."""
+    cached = await interpretation_cache.aget(artwork_id)
+    if cached is not None:
+        return cached
+
+    stored = InterpretationRepository(db).get_latest_for_artwork(artwork_id)
+    if stored is None:
+        return None
+    return CachedInterpretation(
+        id=str(stored.id),
+        artwork_id=artwork_id,
+        content=stored.content,
+        generated_at=stored.generated_at.replace(tzinfo=timezone.utc),
+    )
 
 
-schema = strawberry.Schema(query=Query)
+# Incremental delivery: clients may @defer fragments and @stream list fields
+# (multipart/mixed responses). Operations without them execute as before.
+schema = strawberry.Schema(
+    query=Query,
+    mutation=Mutation,
+    subscription=Subscription,
+    extensions=[ReleaseRequestResources],
+    config=StrawberryConfig(enable_experimental_incremental_execution=True),
+)
@@ -0,0 +1,320 @@
+"""Full-text search over the gallery and stored interpretations.
+
+Artwork titles, collection titles and descriptions, the artist's name and
+bio, and stored interpretations are documents in one inverted index,
+``search_index``:
+
+- SQLite: an FTS5 virtual table (porter stemming), ranked by BM25 with
+  titles weighted above bodies
+- Postgres: a table with a stored, weighted ``tsvector`` column and a GIN
+  index, ranked by ``ts_rank_cd``
+
+The index is maintained incrementally by session events, like the gallery
+generation (see ``app/generation.py``): flushed ORM objects replace their
+own document, and a bulk statement on an indexed table rebuilds that
+table's documents before commit. Both happen in the writing transaction,
+so the index always matches committed data.
+"""
+
+import re
+from dataclasses import dataclass
+from enum import Enum
+
+from sqlalchemy import Connection, bindparam, event, inspect, select, text
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.models import AIInterpretation, Artist, Artwork, Collection
+
+TABLE = "search_index"
+
+
+class SearchKind(Enum):
+    ARTWORK = "artwork"
+    COLLECTION = "collection"
+    ARTIST = "artist"
+    INTERPRETATION = "interpretation"
+
+
+KIND_BY_MODEL = {
+    Artwork: SearchKind.ARTWORK,
+    Collection: SearchKind.COLLECTION,
+    Artist: SearchKind.ARTIST,
+    AIInterpretation: SearchKind.INTERPRETATION,
+}
+MODEL_BY_KIND = {kind: model for model, kind in KIND_BY_MODEL.items()}
+_KINDS = list(SearchKind)
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """One matching document.
+
+    Attributes:
+        kind: What was matched
+        ref_id: ID of the matched artwork, collection, artist or interpretation
+        artwork_id: The artwork for artwork and interpretation hits
+        title: Document title (empty for interpretations)
+        snippet: Matching excerpt with terms wrapped in <mark></mark>
+        score: Relevance; higher is better
+    """
+
+    kind: SearchKind
+    ref_id: int
+    artwork_id: int | None
+    title: str
+    snippet: str
+    score: float
+
+
+@dataclass(frozen=True)
+class SearchPage:
+    hits: list[SearchHit]
+    total: int
+
+
+def _doc_id(kind: SearchKind, ref_id: int) -> int:
+    # Deterministic key, so replacing a document is a primary-key lookup
+    return ref_id * len(_KINDS) + _KINDS.index(kind)
+
+
+def _document(instance) -> dict | None:
+    """The search document for an indexed model instance, or None to skip it."""
+    if isinstance(instance, Artwork):
+        artwork_id, title, body = instance.id, instance.title, ""
+    elif isinstance(instance, Collection):
+        artwork_id, title, body = None, instance.title, instance.description or ""
+    elif isinstance(instance, Artist):
+        artwork_id, title, body = None, instance.name, instance.bio or ""
+    elif isinstance(instance, AIInterpretation):
+        # Only interpretations stored for an artwork are searchable
+        if instance.artwork_id is None:
+            return None
+        artwork_id, title, body = instance.artwork_id, "", instance.content
+    else:
+        return None
+    kind = KIND_BY_MODEL[type(instance)]
+    return {
+        "doc_id": _doc_id(kind, instance.id),
+        "kind": kind.value,
+        "ref_id": instance.id,
+        "artwork_id": artwork_id,
+        "title": title,
+        "body": body,
+    }
+
+
+class _SQLiteIndex:
+    id_column = "rowid"
+    ddl = [
+        f"CREATE VIRTUAL TABLE {TABLE} USING fts5("
+        "kind UNINDEXED, ref_id UNINDEXED, artwork_id UNINDEXED, title, body, "
+        "tokenize = 'porter unicode61 remove_diacritics 2')"
+    ]
+    # bm25() is lower-is-better; weights are per column (unindexed ones unused)
+    search_sql = f"""
+        SELECT kind, ref_id, artwork_id, title,
+            CASE WHEN body = ''
+                THEN snippet({TABLE}, 3, '<mark>', '</mark>', '…', 16)
+                ELSE snippet({TABLE}, 4, '<mark>', '</mark>', '…', 16)
+            END AS snippet,
+            -bm25({TABLE}, 0.0, 0.0, 0.0, 10.0, 1.0) AS score
+        FROM {TABLE}
+        WHERE {TABLE} MATCH :query
+        ORDER BY score DESC, rowid
+        LIMIT :limit OFFSET :offset
+    """
+    count_sql = f"SELECT count(*) FROM {TABLE} WHERE {TABLE} MATCH :query"
+
+    @staticmethod
+    def match_query(query: str) -> str | None:
+        """Quote each word (FTS5 syntax is not exposed); the last one matches as a prefix."""
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return None
+        return " ".join(f'"{term}"' for term in terms) + "*"
+
+
+class _PostgresIndex:
+    id_column = "doc_id"
+    ddl = [
+        f"""CREATE TABLE {TABLE} (
+            doc_id BIGINT PRIMARY KEY,
+            kind VARCHAR(16) NOT NULL,
+            ref_id INTEGER NOT NULL,
+            artwork_id INTEGER,
+            title TEXT NOT NULL,
+            body TEXT NOT NULL,
+            document tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', title), 'A')
+                || setweight(to_tsvector('english', body), 'B')
+            ) STORED
+        )""",
+        f"CREATE INDEX ix_{TABLE}_document ON {TABLE} USING GIN (document)",
+        f"CREATE INDEX ix_{TABLE}_kind ON {TABLE} (kind)",
+    ]
+    search_sql = f"""
+        SELECT kind, ref_id, artwork_id, title,
+            ts_headline(
+                'english',
+                CASE WHEN body = '' THEN title ELSE body END,
+                query,
+                'StartSel=<mark>, StopSel=</mark>, MinWords=8, MaxWords=24'
+            ) AS snippet,
+            ts_rank_cd(document, query) AS score
+        FROM {TABLE}, websearch_to_tsquery('english', :query) AS query
+        WHERE document @@ query
+        ORDER BY score DESC, doc_id
+        LIMIT :limit OFFSET :offset
+    """
+    count_sql = (
+        f"SELECT count(*) FROM {TABLE} WHERE document @@ websearch_to_tsquery('english', :query)"
+    )
+
+    @staticmethod
+    def match_query(query: str) -> str | None:
+        # websearch_to_tsquery accepts free text as typed
+        return query if query.strip() else None
+
+
+def _index_for(connection: Connection) -> type[_SQLiteIndex] | type[_PostgresIndex]:
+    if connection.dialect.name == "postgresql":
+        return _PostgresIndex
+    return _SQLiteIndex
+
+
+def create_search_index(connection: Connection) -> bool:
+    """Create the search index if it does not exist.
+
+    Returns:
+        True if it was created (and needs ``rebuild_search_index``)
+    """
+    if inspect(connection).has_table(TABLE):
+        return False
+    for statement in _index_for(connection).ddl:
+        connection.execute(text(statement))
+    return True
+
+
+def _delete_documents(connection: Connection, doc_ids: list[int]) -> None:
+    if not doc_ids:
+        return
+    index = _index_for(connection)
+    connection.execute(
+        text(f"DELETE FROM {TABLE} WHERE {index.id_column} IN :doc_ids").bindparams(
+            bindparam("doc_ids", expanding=True)
+        ),
+        {"doc_ids": doc_ids},
+    )
+
+
+def _write_documents(connection: Connection, documents: list[dict]) -> None:
+    """Insert documents, replacing any with the same key."""
+    if not documents:
+        return
+    _delete_documents(connection, [document["doc_id"] for document in documents])
+    index = _index_for(connection)
+    connection.execute(
+        text(
+            f"INSERT INTO {TABLE} ({index.id_column}, kind, ref_id, artwork_id, title, body) "
+            "VALUES (:doc_id, :kind, :ref_id, :artwork_id, :title, :body)"
+        ),
+        documents,
+    )
+
+
+def reindex_kind(session: Session, kind: SearchKind) -> None:
+    """Replace every document of one kind with the table's current rows."""
+    connection = session.connection()
+    connection.execute(text(f"DELETE FROM {TABLE} WHERE kind = :kind"), {"kind": kind.value})
+    instances = session.execute(select(MODEL_BY_KIND[kind])).scalars()
+    documents = [document for instance in instances if (document := _document(instance))]
+    _write_documents(connection, documents)
+
+
+def rebuild_search_index(session: Session) -> None:
+    """Index every artwork, collection, artist and stored interpretation. Caller commits."""
+    for kind in SearchKind:
+        reindex_kind(session, kind)
+
+
+def search_documents(db: Session, query: str, limit: int, offset: int = 0) -> SearchPage:
+    """Ranked full-text search, one page at a time.
+
+    Args:
+        db: Database session
+        query: Free text; words must all match, the last one as a prefix
+            on SQLite
+        limit: Page size
+        offset: Number of hits to skip
+
+    Returns:
+        The page of hits, best first, and the total number of matches
+    """
+    connection = db.connection()
+    index = _index_for(connection)
+    match = index.match_query(query)
+    if match is None:
+        return SearchPage(hits=[], total=0)
+
+    rows = connection.execute(
+        text(index.search_sql), {"query": match, "limit": limit, "offset": offset}
+    )
+    hits = [
+        SearchHit(
+            kind=SearchKind(row.kind),
+            ref_id=int(row.ref_id),
+            artwork_id=int(row.artwork_id) if row.artwork_id is not None else None,
+            title=row.title,
+            snippet=row.snippet,
+            score=float(row.score),
+        )
+        for row in rows
+    ]
+    total = connection.execute(text(index.count_sql), {"query": match}).scalar()
+    return SearchPage(hits=hits, total=total)
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    documents = []
+    deleted = []
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        kind = KIND_BY_MODEL.get(type(instance))
+        if kind is None:
+            continue
+        document = None if instance in session.deleted else _document(instance)
+        if document is None:
+            deleted.append(_doc_id(kind, instance.id))
+        else:
+            documents.append(document)
+    _delete_documents(session.connection(), deleted)
+    _write_documents(session.connection(), documents)
+
+
+def _on_orm_execute(state: ORMExecuteState) -> None:
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    # Bulk statements do not say which rows they touched; rebuild the
+    # affected kinds once, just before commit
+    kinds = state.session.info.setdefault("search_reindex", set())
+    kinds.update(
+        KIND_BY_MODEL[mapper.class_]
+        for mapper in state.all_mappers
+        if mapper.class_ in KIND_BY_MODEL
+    )
+
+
+def _before_commit(session: Session) -> None:
+    for kind in session.info.pop("search_reindex", ()):
+        reindex_kind(session, kind)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop("search_reindex", None)
+
+
+def track_search_index(session_class: type[Session]) -> None:
+    """Keep the search index in step with writes made through this session class."""
+    event.listen(session_class, "after_flush", _after_flush)
+    event.listen(session_class, "do_orm_execute", _on_orm_execute)
+    event.listen(session_class, "before_commit", _before_commit)
+    event.listen(session_class, "after_rollback", _after_rollback)
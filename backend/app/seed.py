@@ -1,13 +1,20 @@
 """Seed the database with artwork from Cloudinary."""
 
+import asyncio
+import logging
 import os
 
 import cloudinary
 import cloudinary.api
 from dotenv import load_dotenv
 
+from app.cassettes import cassette
 from app.database import SessionLocal, init_db
-from app.models import Artist, Artwork, Collection
+from app.logs import configure_logging
+from app.models import AIInterpretation, Artist, Artwork, Collection
+from app.similarity import update_index
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -24,17 +31,16 @@ CLOUDINARY_BASE_URL = f"https://res.cloudinary.com/{os.getenv('CLOUDINARY_CLOUD_
 
 
 def fetch_cloudinary_images(max_results: int = 20) -> list[dict]:
-    """Fetch image public_ids from Cloudinary."""
+    """Fetch image public_ids from Cloudinary (recorded or replayed with CASSETTE_MODE)."""
+    params = {"type": "upload", "resource_type": "image", "max_results": max_results}
     try:
         # Fetch resources from Cloudinary
-        result = cloudinary.api.resources(
-            type="upload",
-            resource_type="image",
-            max_results=max_results,
+        result = cassette.call(
+            "cloudinary.resources", params, lambda: dict(cloudinary.api.resources(**params))
         )
         return result.get("resources", [])
     except Exception as e:
-        print(f"Error fetching from Cloudinary: {e}")
+        logger.error("Error fetching from Cloudinary: %s", e)
         return []
 
 
@@ -44,18 +50,19 @@ def seed_database(max_artworks: int = 20):
     init_db()
 
     # Fetch images from Cloudinary
-    print("Fetching images from Cloudinary...")
+    logger.info("Fetching images from Cloudinary...")
     images = fetch_cloudinary_images(max_results=max_artworks)
 
     if not images:
-        print("No images found in Cloudinary. Please upload some images first.")
+        logger.warning("No images found in Cloudinary. Please upload some images first.")
         return
 
-    print(f"Found {len(images)} images in Cloudinary")
+    logger.info("Found %d images in Cloudinary", len(images))
 
     db = SessionLocal()
     try:
         # Clear existing data
+        db.query(AIInterpretation).delete()
         db.query(Artwork).delete()
         db.query(Collection).delete()
         db.query(Artist).delete()
@@ -67,7 +74,7 @@ I started studying with Tzahi Gil who taught me the basics. Eli Shamir gave me s
         db.flush()
 
         # Create collection
-        collection = Collection(title="Watercolours", description=None)
+        collection = Collection(title="Watercolours", description=None, artist_id=artist.id)
         db.add(collection)
         db.flush()
 
@@ -91,15 +98,20 @@ I started studying with Tzahi Gil who taught me the basics. Eli Shamir gave me s
             db.add(artwork)
 
         db.commit()
-        print(f"Database seeded successfully with {len(images)} artworks!")
+        logger.info("Database seeded successfully with %d artworks!", len(images))
 
-    except Exception as e:
+        # Artwork IDs were reassigned, so recompute every feature vector
+        logger.info("Building similarity index...")
+        asyncio.run(update_index(db, rebuild=True, transport=cassette.transport()))
+
+    except Exception:
         db.rollback()
-        print(f"Error seeding database: {e}")
+        logger.exception("Error seeding database")
         raise
     finally:
         db.close()
 
 
 if __name__ == "__main__":
+    configure_logging(default_format="text")
     seed_database()
@@ -0,0 +1,122 @@
+"""Key-value cache shared by every worker process on a host.
+
+With several uvicorn workers, in-process caches each miss independently:
+a note cached by one worker is invisible to the others. ``SQLiteCache``
+keeps entries in a local SQLite file in WAL mode, which lets all workers
+read concurrently while one writes, so a hit in any worker is a hit in all.
+
+Entries are grouped by namespace (one per cache) and can expire. Each
+namespace is bounded; the oldest writes are evicted first.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+
+class SQLiteCache:
+    """Namespaced bytes cache in a local SQLite database.
+
+    Attributes:
+        path: SQLite file shared by the processes using the cache
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value BLOB NOT NULL,
+            stored_at REAL NOT NULL,
+            expires_at REAL,
+            PRIMARY KEY (namespace, key)
+        );
+        CREATE INDEX IF NOT EXISTS ix_cache_entries_age ON cache_entries (namespace, stored_at);
+    """
+
+    def __init__(self, path: str | None = None):
+        """Open (and create if needed) the cache database.
+
+        Args:
+            path: SQLite file path; defaults to CACHE_PATH, falling back to
+                ./cache.db
+        """
+        self.path = path or os.getenv("CACHE_PATH", "./cache.db")
+        # One connection per thread: sqlite3 connections must not be shared
+        # across threads while in use
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            # WAL keeps readers and the writer out of each other's way;
+            # NORMAL sync is safe in WAL mode and avoids an fsync per write
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: str) -> bytes | None:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(namespace, key)
+            return None
+        return value
+
+    def set(
+        self,
+        namespace: str,
+        key: str,
+        value: bytes,
+        ttl: float | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        """Store a value, replacing any previous one.
+
+        Args:
+            ttl: Seconds until the entry expires; None keeps it until evicted
+            max_entries: Evict the oldest entries beyond this many in the namespace
+        """
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, stored_at, expires_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, value, now, now + ttl if ttl is not None else None),
+        )
+        if max_entries is not None:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key NOT IN ("
+                "SELECT key FROM cache_entries WHERE namespace = ? "
+                "ORDER BY stored_at DESC LIMIT ?)",
+                (namespace, namespace, max_entries),
+            )
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._connection().execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+        )
+
+    def clear(self, namespace: str) -> None:
+        self._connection().execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+
+    def count(self, namespace: str) -> int:
+        (count,) = (
+            self._connection()
+            .execute("SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (namespace,))
+            .fetchone()
+        )
+        return count
@@ -0,0 +1,151 @@
+"""Export the public gallery API as static JSON snapshots.
+
+The gallery's read data only changes when the database is reseeded, so the
+responses to the frontend's queries can be generated once and served by a
+static host or CDN, with ``/graphql`` as the fallback.
+
+Each operation is executed against ``schema`` and written as the exact
+GraphQL response body under a content-hashed file name, so files can be
+cached forever. ``manifest.json`` is the only mutable file: it maps each
+operation (and, optionally, each artwork's pre-generated interpretation)
+to its current file.
+
+Usage:
+    python -m app.snapshot --out snapshot
+    python -m app.snapshot --out snapshot --include-interpretations
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, init_db
+from app.logs import configure_logging
+from app.operations import STATIC_OPERATIONS
+from app.repository import InterpretationRepository
+from app.schema import schema
+
+logger = logging.getLogger(__name__)
+
+# Bump when the manifest layout changes
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Only operations without variables can be snapshotted
+OPERATIONS = STATIC_OPERATIONS
+
+
+def encode(body: dict) -> bytes:
+    """Serialize a response body deterministically so equal data hashes equally."""
+    return json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def execute_operation(db: Session, name: str) -> dict:
+    """Run a known operation and return its GraphQL response body.
+
+    Raises:
+        RuntimeError: If the operation returns errors
+    """
+    result = schema.execute_sync(OPERATIONS[name], context_value={"db": db})
+    if result.errors:
+        raise RuntimeError(f"{name} failed: {'; '.join(str(error) for error in result.errors)}")
+    return {"data": result.data}
+
+
+def interpretation_bodies(db: Session) -> dict[int, dict]:
+    """Latest pre-generated interpretation per artwork, as GenerateArtworkInterpretation bodies."""
+    latest = InterpretationRepository(db).get_latest_by_artwork()
+    return {
+        artwork_id: {
+            "data": {
+                "generateArtworkInterpretation": {
+                    "id": str(interpretation.id),
+                    "content": interpretation.content,
+                    "generatedAt": interpretation.generated_at.replace(
+                        tzinfo=timezone.utc
+                    ).isoformat(),
+                    "context": f"artwork:{artwork_id}",
+                }
+            }
+        }
+        for artwork_id, interpretation in latest.items()
+    }
+
+
+def write_snapshot(db: Session, out_dir: Path, include_interpretations: bool = False) -> dict:
+    """Write every snapshot file and the manifest into ``out_dir``.
+
+    Previously written files are left in place so clients holding an older
+    manifest can still fetch what it points to.
+
+    Returns:
+        The manifest
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    def write(relative_stem: str, body: dict) -> str:
+        data = encode(body)
+        path = Path(f"{relative_stem}.{content_hash(data)}.json")
+        (out_dir / path).parent.mkdir(parents=True, exist_ok=True)
+        (out_dir / path).write_bytes(data)
+        return path.as_posix()
+
+    operations = {name: write(name, execute_operation(db, name)) for name in OPERATIONS}
+    interpretations = {}
+    if include_interpretations:
+        interpretations = {
+            str(artwork_id): write(f"interpretations/{artwork_id}", body)
+            for artwork_id, body in sorted(interpretation_bodies(db).items())
+        }
+
+    manifest = {
+        "version": SNAPSHOT_FORMAT_VERSION,
+        # Identifies the snapshot's content; unchanged data gives the same ID
+        "snapshotId": content_hash(encode({"o": operations, "i": interpretations})),
+        "generatedAt": datetime.now(timezone.utc).isoformat(),
+        "operations": operations,
+        "interpretations": interpretations,
+    }
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export static snapshots of the gallery API")
+    parser.add_argument(
+        "--out", type=Path, default=Path("snapshot"), help="Output directory (default: snapshot)"
+    )
+    parser.add_argument(
+        "--include-interpretations",
+        action="store_true",
+        help="Also export each artwork's latest pre-generated interpretation",
+    )
+    args = parser.parse_args()
+
+    configure_logging(default_format="text")
+    init_db()
+    db = SessionLocal()
+    try:
+        manifest = write_snapshot(db, args.out, args.include_interpretations)
+    finally:
+        db.close()
+
+    logger.info(
+        "Wrote snapshot %s to %s: %d operations, %d interpretations",
+        manifest["snapshotId"],
+        args.out,
+        len(manifest["operations"]),
+        len(manifest["interpretations"]),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""Token usage, latency and cost drivers of every AI provider call.
+
+Providers report the tokens each call consumed (Gemini's
+``usage_metadata``). ``AIService`` records one row per provider call in
+``ai_calls``, whether the note is then stored (pre-generation, variants) or
+only served (live generation, jobs): artwork, provider and model, prompt
+version and hash, input/output/total tokens, image size, latency and, for
+failed calls, the error code. Calls rejected by an open circuit breaker
+never reach the provider and are not recorded.
+
+Rows are buffered in memory, so the AI path does not pay for a commit per
+call. In the API a background task writes them in one statement every
+``AI_USAGE_FLUSH_SECONDS``, as soon as ``AI_USAGE_FLUSH_SIZE`` calls are
+waiting, and on shutdown, in a worker thread so the event loop never waits
+on the database. Without the task (CLIs, tests) a full buffer is written
+by the call that fills it. A failed write is logged and its rows dropped:
+accounting never fails an interpretation. ``AI_USAGE_LOG=0`` turns
+recording off; read-only edge instances (``EDGE_DATABASE``) never record.
+
+Usage:
+    python -m app.usage                      # totals by model and prompt
+    python -m app.usage --by artwork         # most expensive artworks first
+    python -m app.usage --by artwork --by model --days 7 --limit 20
+
+Tokens are summed and averaged over successful calls; latency covers every
+call, failed ones included.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.database import READ_ONLY, SessionLocal, init_db
+from app.logs import configure_logging
+from app.models import AICall, Artwork
+
+logger = logging.getLogger(__name__)
+
+USAGE_LOG = os.getenv("AI_USAGE_LOG", "1") == "1" and not READ_ONLY
+USAGE_FLUSH_SIZE = int(os.getenv("AI_USAGE_FLUSH_SIZE", "20"))
+USAGE_FLUSH_SECONDS = float(os.getenv("AI_USAGE_FLUSH_SECONDS", "30"))
+
+# Report groupings and the ai_calls columns each one groups by
+DIMENSIONS = {
+    "artwork": (AICall.artwork_id,),
+    "model": (AICall.provider, AICall.model),
+    "prompt": (AICall.prompt_version, AICall.prompt_hash),
+}
+LABELS = {"artwork": ("artwork",), "model": ("provider", "model"), "prompt": ("prompt", "hash")}
+
+
+@dataclass(frozen=True)
+class Usage:
+    """Tokens one provider call consumed, as the provider reported them."""
+
+    input_tokens: int
+    output_tokens: int
+    total_tokens: int
+
+
+@dataclass(frozen=True)
+class Generation:
+    """Text a provider generated, with the model and tokens it took.
+
+    Attributes:
+        text: The generated interpretation
+        model: Model that generated it, if known
+        usage: Tokens consumed, if the provider reports them
+    """
+
+    text: str
+    model: str | None = None
+    usage: Usage | None = None
+
+
+class UsageLog:
+    """Buffer provider calls and write them to ``ai_calls`` in batches.
+
+    Attributes:
+        enabled: Whether calls are recorded at all
+        flush_size: Buffered calls that trigger a write
+        flush_seconds: Interval between the background task's writes
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        enabled: bool | None = None,
+        flush_size: int | None = None,
+        flush_seconds: float | None = None,
+    ):
+        self.enabled = USAGE_LOG if enabled is None else enabled
+        self.flush_size = flush_size or USAGE_FLUSH_SIZE
+        self.flush_seconds = USAGE_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._rows: list[dict] = []
+        self._task: asyncio.Task | None = None
+        self._due: asyncio.Event | None = None
+
+    @property
+    def pending(self) -> int:
+        """Calls recorded but not written yet."""
+        return len(self._rows)
+
+    def record(
+        self,
+        *,
+        artwork_id: int | None,
+        provider: str,
+        model: str | None,
+        prompt_version: str | None,
+        prompt_hash: str | None,
+        usage: Usage | None,
+        image_bytes: int,
+        latency_ms: float,
+        error_code: str | None = None,
+    ) -> None:
+        """Buffer one provider call, writing the buffer if it is due."""
+        if not self.enabled:
+            return
+        row = {
+            "artwork_id": artwork_id,
+            "provider": provider,
+            "model": model,
+            "prompt_version": prompt_version,
+            "prompt_hash": prompt_hash,
+            "input_tokens": usage.input_tokens if usage else None,
+            "output_tokens": usage.output_tokens if usage else None,
+            "total_tokens": usage.total_tokens if usage else None,
+            "image_bytes": image_bytes,
+            "latency_ms": round(latency_ms, 1),
+            "error_code": error_code,
+            "called_at": datetime.utcnow(),
+        }
+        with self._lock:
+            self._rows.append(row)
+            due = len(self._rows) >= self.flush_size
+        if not due:
+            return
+        if self._due is not None:
+            self._due.set()
+        else:
+            self.flush()
+
+    async def start(self) -> None:
+        """Write buffered calls from a background task until ``stop``."""
+        if not self.enabled or self._task is not None:
+            return
+        self._due = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        """Stop the background task and write what is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+            self._due = None
+        await asyncio.to_thread(self.flush)
+
+    def flush(self) -> int:
+        """Write every buffered call.
+
+        Returns:
+            Number of calls written; 0 if there were none or the write failed
+        """
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+        try:
+            db = self._session_factory()
+            try:
+                db.execute(insert(AICall), rows)
+                db.commit()
+            finally:
+                db.close()
+        except Exception:
+            logger.exception("Could not record %d AI provider calls", len(rows))
+            return 0
+        return len(rows)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._due.wait(), self.flush_seconds)
+            self._due.clear()
+            await asyncio.to_thread(self.flush)
+
+
+@dataclass
+class UsageRow:
+    """Aggregated provider calls for one group."""
+
+    key: tuple[str, ...]
+    calls: int
+    failures: int
+    input_tokens: int
+    output_tokens: int
+    total_tokens: int
+    avg_input_tokens: float
+    avg_output_tokens: float
+    avg_image_kb: float
+    avg_latency_ms: float
+    max_latency_ms: float
+
+
+def usage_report(
+    db: Session,
+    by: list[str],
+    since: datetime | None = None,
+    limit: int | None = None,
+) -> list[UsageRow]:
+    """Aggregate recorded calls, most total tokens first.
+
+    Args:
+        db: Session to read ``ai_calls`` with
+        by: Dimensions to group by ("artwork", "model", "prompt")
+        since: Only count calls made at or after this time (UTC)
+        limit: Return at most this many groups
+
+    Raises:
+        ValueError: If a dimension is unknown
+    """
+    unknown = [dimension for dimension in by if dimension not in DIMENSIONS]
+    if unknown:
+        raise ValueError(
+            f"Unknown usage dimension {unknown[0]!r}. Choose from: {', '.join(DIMENSIONS)}"
+        )
+    columns = [column for dimension in by for column in DIMENSIONS[dimension]]
+    total_tokens = func.coalesce(func.sum(AICall.total_tokens), 0)
+    query = (
+        select(
+            *columns,
+            func.count(),
+            func.count(AICall.error_code),
+            func.coalesce(func.sum(AICall.input_tokens), 0),
+            func.coalesce(func.sum(AICall.output_tokens), 0),
+            total_tokens,
+            func.coalesce(func.avg(AICall.input_tokens), 0),
+            func.coalesce(func.avg(AICall.output_tokens), 0),
+            func.avg(AICall.image_bytes),
+            func.avg(AICall.latency_ms),
+            func.max(AICall.latency_ms),
+        )
+        .group_by(*columns)
+        .order_by(total_tokens.desc(), *columns)
+    )
+    if since is not None:
+        query = query.where(AICall.called_at >= since)
+    if limit:
+        query = query.limit(limit)
+    rows = db.execute(query).all()
+
+    titles = {}
+    if "artwork" in by:
+        position = next(i for i, column in enumerate(columns) if column is AICall.artwork_id)
+        artwork_ids = {row[position] for row in rows if row[position] is not None}
+        titles = dict(
+            db.execute(select(Artwork.id, Artwork.title).where(Artwork.id.in_(artwork_ids))).all()
+        )
+
+    report = []
+    for row in rows:
+        values, stats = row[: len(columns)], row[len(columns) :]
+        key = []
+        for column, value in zip(columns, values):
+            if column is AICall.artwork_id and value in titles:
+                key.append(f"{value} {titles[value]}")
+            else:
+                key.append("-" if value is None else str(value))
+        report.append(
+            UsageRow(
+                key=tuple(key),
+                calls=stats[0],
+                failures=stats[1],
+                input_tokens=int(stats[2]),
+                output_tokens=int(stats[3]),
+                total_tokens=int(stats[4]),
+                avg_input_tokens=round(float(stats[5]), 1),
+                avg_output_tokens=round(float(stats[6]), 1),
+                avg_image_kb=round(float(stats[7]) / 1024, 1),
+                avg_latency_ms=round(float(stats[8]), 1),
+                max_latency_ms=round(float(stats[9]), 1),
+            )
+        )
+    return report
+
+
+def format_report(rows: list[UsageRow], by: list[str]) -> str:
+    """Render a usage report as a plain-text table."""
+    labels = [label for dimension in by for label in LABELS[dimension]]
+    header = [*labels, "calls", "fails", "in tok", "out tok", "total", "avg in", "avg out"]
+    header += ["img KB", "avg ms", "max ms"]
+    lines = [
+        [
+            *row.key,
+            row.calls,
+            row.failures,
+            row.input_tokens,
+            row.output_tokens,
+            row.total_tokens,
+            row.avg_input_tokens,
+            row.avg_output_tokens,
+            row.avg_image_kb,
+            row.avg_latency_ms,
+            row.max_latency_ms,
+        ]
+        for row in rows
+    ]
+    cells = [[str(value) for value in line] for line in [header, *lines]]
+    widths = [max(len(line[i]) for line in cells) for i in range(len(header))]
+    text_columns = len(labels)
+    rendered = []
+    for line in cells:
+        rendered.append(
+            "  ".join(
+                value.ljust(width) if i < text_columns else value.rjust(width)
+                for i, (value, width) in enumerate(zip(line, widths))
+            ).rstrip()
+        )
+    return "\n".join(rendered)
+
+
+usage_log = UsageLog()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report AI token usage and latency")
+    parser.add_argument(
+        "--by",
+        action="append",
+        choices=list(DIMENSIONS),
+        help="Group by this dimension (repeatable; default: model and prompt)",
+    )
+    parser.add_argument("--days", type=float, help="Only count calls from the last N days")
+    parser.add_argument("--limit", type=int, help="Show at most N groups")
+    args = parser.parse_args()
+    by = args.by or ["model", "prompt"]
+
+    configure_logging(default_format="text")
+    init_db()
+    since = datetime.utcnow() - timedelta(days=args.days) if args.days else None
+    db = SessionLocal()
+    try:
+        rows = usage_report(db, by, since=since, limit=args.limit)
+    finally:
+        db.close()
+
+    if not rows:
+        print("No AI provider calls recorded.")
+        return
+    print(format_report(rows, by))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""Pools of stored interpretation variants, served in rotation.
+
+Interpretations should feel dynamic (Decision 0008), but a fresh provider
+call per view is slow and unbounded in cost. Instead each artwork keeps up
+to ``VARIANT_POOL_SIZE`` stored interpretations ("variants") from the
+active prompt in ``ai_interpretations``, and ``artworkInterpretation``
+serves them round-robin from memory: an index increment per request, no
+provider call and no database query once the pool is loaded.
+
+Each variant counts how often it has been served. Once one reaches
+``VARIANT_MAX_SERVES``, a background task generates a replacement, stores
+it and deletes the most-served variant, so content keeps changing while
+provider calls stay bounded to one per ``VARIANT_MAX_SERVES`` views. Pools
+are filled lazily (the first view of an artwork generates its first
+variant) or offline with ``python -m app.pregenerate --variants K``.
+
+Pools and serve counts are per process. On read-only edge instances
+(``EDGE_DATABASE``, see app/database.py) new variants are kept in memory
+only, with negative IDs, and pools start from the variants in the snapshot.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from app.ai_service import AIService, InterpretationError
+from app.database import READ_ONLY, SessionLocal
+from app.models import AIInterpretation, Artwork
+from app.repository import ArtworkRepository, InterpretationRepository
+
+logger = logging.getLogger(__name__)
+
+VARIANT_POOL_SIZE = int(os.getenv("VARIANT_POOL_SIZE", "3"))
+# Serves after which a variant is replaced in the background
+VARIANT_MAX_SERVES = int(os.getenv("VARIANT_MAX_SERVES", "50"))
+# Concurrent background generations (provider calls) across all artworks
+VARIANT_REPLENISH_CONCURRENCY = int(os.getenv("VARIANT_REPLENISH_CONCURRENCY", "1"))
+# Artworks whose pools are kept in memory (least recently served are dropped)
+VARIANT_POOL_ARTWORKS = 1000
+# After a failed replenishment, wait this long before trying the artwork again
+REPLENISH_RETRY_SECONDS = 60.0
+
+
+@dataclass
+class Variant:
+    id: int
+    content: str
+    generated_at: datetime
+    serves: int = 0
+
+    @classmethod
+    def from_model(cls, model: AIInterpretation) -> "Variant":
+        return cls(
+            id=model.id,
+            content=model.content,
+            generated_at=model.generated_at.replace(tzinfo=timezone.utc),
+        )
+
+
+@dataclass
+class ArtworkPool:
+    variants: list[Variant] = field(default_factory=list)
+    cursor: int = 0
+
+
+class VariantPool:
+    """Serve stored interpretation variants and keep each artwork's pool fresh.
+
+    Attributes:
+        ai_service: Service used to generate new variants
+        pool_size: Variants kept per artwork
+        max_serves: Serves after which a variant is replaced
+        read_only: Keep new variants in memory instead of storing them
+    """
+
+    def __init__(
+        self,
+        ai_service: AIService | None = None,
+        pool_size: int | None = None,
+        max_serves: int | None = None,
+        concurrency: int | None = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        read_only: bool | None = None,
+    ):
+        self.ai_service = ai_service or AIService()
+        self.pool_size = pool_size or VARIANT_POOL_SIZE
+        self.max_serves = max_serves or VARIANT_MAX_SERVES
+        self._concurrency = concurrency or VARIANT_REPLENISH_CONCURRENCY
+        self._session_factory = session_factory
+        self.read_only = READ_ONLY if read_only is None else read_only
+        self._unsaved = 0
+        self._pools: OrderedDict[int, ArtworkPool] = OrderedDict()
+        self._replenishing: dict[int, asyncio.Task] = {}
+        self._retry_at: dict[int, float] = {}
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def next(self, db: Session, artwork_id: int) -> Variant | None:
+        """Serve the artwork's next variant in rotation.
+
+        Loads the pool from the database on first use. Schedules a
+        background replacement when the pool is short or the served
+        variant is worn out. Must be called from a running event loop.
+
+        Returns:
+            The variant, or None if the artwork has no stored variants yet
+        """
+        pool = self._pool(db, artwork_id)
+        if not pool.variants:
+            return None
+        variant = pool.variants[pool.cursor % len(pool.variants)]
+        pool.cursor += 1
+        variant.serves += 1
+        if len(pool.variants) < self.pool_size or variant.serves >= self.max_serves:
+            self._schedule_replenish(artwork_id)
+        return variant
+
+    async def generate(self, artwork: Artwork) -> Variant:
+        """Generate, store and serve a variant now (for an empty pool).
+
+        Raises:
+            InterpretationError: If generation fails
+        """
+        content = await self.ai_service.interpret_artwork(artwork)
+        variant = self._store(artwork.id, content)
+        variant.serves += 1
+        self._schedule_replenish(artwork.id)
+        return variant
+
+    async def drain(self) -> None:
+        """Wait for every scheduled replenishment to finish."""
+        while self._replenishing:
+            await asyncio.gather(*self._replenishing.values(), return_exceptions=True)
+
+    async def stop(self) -> None:
+        """Cancel background replenishment."""
+        tasks = list(self._replenishing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._replenishing.clear()
+
+    def clear(self) -> None:
+        """Forget loaded pools; they are reloaded from the database on next use."""
+        self._pools.clear()
+
+    def _pool(self, db: Session, artwork_id: int) -> ArtworkPool:
+        pool = self._pools.get(artwork_id)
+        if pool is None:
+            stored = InterpretationRepository(db).get_variants(
+                artwork_id, self.ai_service.prompt.hash
+            )
+            # Newest variants, in case more than pool_size are stored
+            pool = ArtworkPool([Variant.from_model(model) for model in stored[-self.pool_size :]])
+            self._pools[artwork_id] = pool
+            if len(self._pools) > VARIANT_POOL_ARTWORKS:
+                self._pools.popitem(last=False)
+        else:
+            self._pools.move_to_end(artwork_id)
+        return pool
+
+    def _schedule_replenish(self, artwork_id: int) -> None:
+        if artwork_id in self._replenishing:
+            return
+        if time.monotonic() < self._retry_at.get(artwork_id, 0.0):
+            return
+        task = asyncio.get_running_loop().create_task(self._replenish(artwork_id))
+        self._replenishing[artwork_id] = task
+        task.add_done_callback(lambda _: self._replenishing.pop(artwork_id, None))
+
+    async def _replenish(self, artwork_id: int) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        async with self._semaphore:
+            # Load the artwork and release the session before the long AI await
+            db = self._session_factory()
+            try:
+                artwork = ArtworkRepository(db).get_by_id(artwork_id)
+            finally:
+                db.close()
+            if artwork is None:
+                return
+            try:
+                content = await self.ai_service.interpret_artwork(artwork)
+            except InterpretationError as e:
+                logger.warning(
+                    "Could not replenish variants for artwork %s: %s",
+                    artwork_id,
+                    e,
+                    extra={"artwork_id": artwork_id, "error_code": e.code.value},
+                )
+                self._retry_at[artwork_id] = time.monotonic() + REPLENISH_RETRY_SECONDS
+                return
+            self._retry_at.pop(artwork_id, None)
+            self._store(artwork_id, content)
+
+    def _store(self, artwork_id: int, content: str) -> Variant:
+        """Store a new variant, retiring the most-served one if the pool is full."""
+        # The pool may have been dropped from memory meanwhile; it reloads
+        # the newest variants from the database on next use
+        pool = self._pools.get(artwork_id)
+        retired = None
+        if pool is not None and len(pool.variants) >= self.pool_size:
+            retired = max(pool.variants, key=lambda variant: variant.serves)
+
+        if self.read_only:
+            self._unsaved -= 1
+            variant = Variant(self._unsaved, content, datetime.now(timezone.utc))
+        else:
+            variant = self._save(artwork_id, content, retired)
+
+        if retired is not None:
+            pool.variants[pool.variants.index(retired)] = variant
+        elif pool is not None:
+            pool.variants.append(variant)
+        return variant
+
+    def _save(self, artwork_id: int, content: str, retired: Variant | None) -> Variant:
+        """Store a variant in the database, deleting the retired one."""
+        prompt = self.ai_service.prompt
+        db = self._session_factory()
+        try:
+            repo = InterpretationRepository(db)
+            model = repo.add(
+                artwork_id, content, prompt_version=prompt.version, prompt_hash=prompt.hash
+            )
+            if retired is not None:
+                repo.delete(retired.id)
+            db.commit()
+            return Variant.from_model(model)
+        finally:
+            db.close()
+
+
+# Created on first use (normally by the FastAPI lifespan), like the job queue,
+# so a configuration error such as an unknown PROMPT_VERSION fails startup
+# rather than every import of the app
+_variant_pool: VariantPool | None = None
+
+
+def get_variant_pool() -> VariantPool:
+    """The process's variant pool, created on first call."""
+    global _variant_pool
+    if _variant_pool is None:
+        _variant_pool = VariantPool()
+    return _variant_pool
@@ -0,0 +1,190 @@
+"""Startup warmup and readiness.
+
+Right after a deploy the first visitors would otherwise pay for opening
+database connections, configuring ORM mappers, Strawberry's first parse and
+validation of the gallery query and an empty interpretation cache. The
+FastAPI lifespan runs ``warm_up`` in the background instead; ``/ready``
+reports ready only once it has finished, while ``/health`` answers as soon
+as the process is up. A failed step is retried with exponential backoff,
+so a database that is briefly unreachable at boot only delays readiness.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import timezone
+
+from sqlalchemy import select
+from sqlalchemy.orm import configure_mappers
+
+from app.database import ReadSessionLocal, get_engine, replica_router
+from app.images import IMAGE_PROXY_ENABLED, image_proxy
+from app.interpretation_cache import CachedInterpretation, interpretation_cache
+from app.models import Artwork
+from app.operations import GET_COLLECTIONS
+from app.read_model import READ_MODEL_ENABLED, read_model
+from app.repository import InterpretationRepository
+from app.schema import schema
+
+logger = logging.getLogger(__name__)
+
+# Pool connections opened during warmup (capped at the pool size)
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "5"))
+# Attempts per step; the waits between them double from WARMUP_RETRY_SECONDS
+WARMUP_ATTEMPTS = int(os.getenv("WARMUP_ATTEMPTS", "5"))
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "1"))
+
+PENDING = "pending"
+WARMING_UP = "warming_up"
+READY = "ready"
+FAILED = "failed"
+
+
+@dataclass
+class Readiness:
+    """Progress of the warmup, as reported by ``/ready``.
+
+    Attributes:
+        status: "pending", "warming_up", "ready" or "failed"
+        steps: Duration of each finished warmup step in milliseconds
+        error: Why warmup failed, if it did
+    """
+
+    status: str = PENDING
+    steps: dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == READY
+
+    def reset(self) -> None:
+        self.status = PENDING
+        self.steps = {}
+        self.error = None
+
+    def as_dict(self) -> dict:
+        body = {"status": self.status, "steps_ms": self.steps}
+        if self.error:
+            body["error"] = self.error
+        return body
+
+
+def open_pool_connections() -> None:
+    """Establish pooled connections so early requests skip the connect handshake.
+
+    Warms the primary's pool and every read replica's.
+    """
+    for engine in [get_engine(), *replica_router.engines()]:
+        size = getattr(engine.pool, "size", lambda: WARMUP_CONNECTIONS)()
+        connections = [engine.connect() for _ in range(min(WARMUP_CONNECTIONS, size))]
+        for connection in connections:
+            connection.close()
+
+
+def run_gallery_query() -> None:
+    """Run GetCollections once to prime mappers and the schema's query path.
+
+    Its read session also runs the first read replica check.
+    """
+    configure_mappers()
+    db = ReadSessionLocal()
+    try:
+        result = schema.execute_sync(GET_COLLECTIONS, context_value={"db": db})
+    finally:
+        db.close()
+    if result.errors:
+        raise RuntimeError(f"GetCollections failed: {result.errors[0]}")
+
+
+def preload_interpretations() -> None:
+    """Fill the fallback cache with each artwork's latest stored interpretation."""
+    db = ReadSessionLocal()
+    try:
+        latest = InterpretationRepository(db).get_latest_by_artwork()
+    finally:
+        db.close()
+
+    for artwork_id, stored in latest.items():
+        # Never replace a live interpretation cached since startup
+        if interpretation_cache.get(artwork_id) is None:
+            interpretation_cache.put(
+                CachedInterpretation(
+                    id=str(stored.id),
+                    artwork_id=artwork_id,
+                    content=stored.content,
+                    generated_at=stored.generated_at.replace(tzinfo=timezone.utc),
+                )
+            )
+
+
+def preload_image_metadata() -> None:
+    """Load the image proxy's record of each artwork's original from disk."""
+    db = ReadSessionLocal()
+    try:
+        image_urls = db.scalars(select(Artwork.image_url)).all()
+    finally:
+        db.close()
+    image_proxy.load_sources(image_urls)
+
+
+def build_read_model() -> None:
+    """Build the in-memory gallery so the first query does not have to."""
+    db = ReadSessionLocal()
+    try:
+        read_model.snapshot(db)
+    finally:
+        db.close()
+
+
+STEPS = {
+    "pool_connections": open_pool_connections,
+    "gallery_query": run_gallery_query,
+    "interpretations": preload_interpretations,
+}
+if READ_MODEL_ENABLED:
+    STEPS["read_model"] = build_read_model
+if IMAGE_PROXY_ENABLED:
+    # Spawning the resize workers takes seconds; keep it off the first image request
+    STEPS["image_workers"] = image_proxy.start
+    STEPS["image_metadata"] = preload_image_metadata
+
+
+async def warm_up(state: Readiness) -> None:
+    """Run every warmup step in a worker thread and record the outcome in ``state``.
+
+    A failing step is tried up to ``WARMUP_ATTEMPTS`` times; only then is
+    warmup marked failed.
+    """
+    state.reset()
+    state.status = WARMING_UP
+    for name, step in STEPS.items():
+        for attempt in range(1, WARMUP_ATTEMPTS + 1):
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(step)
+                break
+            except Exception as e:
+                state.error = f"{name}: {e}"
+                if attempt == WARMUP_ATTEMPTS:
+                    state.status = FAILED
+                    logger.exception("Warmup step %s failed", name, extra={"step": name})
+                    return
+                delay = WARMUP_RETRY_SECONDS * 2 ** (attempt - 1)
+                logger.warning(
+                    "Warmup step %s failed (attempt %d), retrying in %.1fs: %s",
+                    name,
+                    attempt,
+                    delay,
+                    e,
+                    extra={"step": name},
+                )
+                await asyncio.sleep(delay)
+        state.steps[name] = round((time.perf_counter() - started) * 1000, 1)
+    state.error = None
+    state.status = READY
+
+
+readiness = Readiness()
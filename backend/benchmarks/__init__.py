@@ -0,0 +1,7 @@
+"""Load-testing and benchmark harness for the gallery backend.
+
+Run with ``make bench`` (or ``poetry run python -m benchmarks.run --help``).
+The harness seeds synthetic galleries into a dedicated SQLite database,
+drives the ``/graphql`` endpoint concurrently and reports latency
+percentiles, throughput and SQL statement counts per operation.
+"""
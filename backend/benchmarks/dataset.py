@@ -0,0 +1,58 @@
+"""Synthetic gallery data for benchmarks."""
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import AIInterpretation, Artist, Artwork, Collection
+
+# Artworks per synthetic collection. Keeps the collection count growing with
+# the gallery size so GetCollections exercises more than one parent row.
+ARTWORKS_PER_COLLECTION = 500
+
+# Rows per bulk INSERT; large enough to seed 100k artworks in seconds.
+INSERT_CHUNK_SIZE = 5_000
+
+
+def seed_synthetic_gallery(db: Session, artwork_count: int, image_base_url: str) -> list[int]:
+    """Replace the gallery with ``artwork_count`` synthetic artworks.
+
+    Args:
+        db: Database session to seed through
+        artwork_count: Number of artworks to create
+        image_base_url: Base URL of the (fake) image server; each artwork
+            points at ``{image_base_url}/{index}.jpg``
+
+    Returns:
+        The IDs of the created artworks
+    """
+    db.query(AIInterpretation).delete()
+    db.query(Artwork).delete()
+    db.query(Collection).delete()
+    db.query(Artist).delete()
+
+    artist = Artist(name="Benchmark Artist", bio="Synthetic artist used for load testing.")
+    db.add(artist)
+    db.flush()
+
+    collection_count = max(1, -(-artwork_count // ARTWORKS_PER_COLLECTION))
+    collections = [
+        Collection(title=f"Collection {index}", description=None, artist_id=artist.id)
+        for index in range(1, collection_count + 1)
+    ]
+    db.add_all(collections)
+    db.flush()
+
+    rows = [
+        {
+            "title": f"Artwork {index}",
+            "image_url": f"{image_base_url}/{index}.jpg",
+            "artist_id": artist.id,
+            "collection_id": collections[(index - 1) // ARTWORKS_PER_COLLECTION].id,
+        }
+        for index in range(1, artwork_count + 1)
+    ]
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.execute(insert(Artwork), rows[start : start + INSERT_CHUNK_SIZE])
+
+    db.commit()
+    return [artwork_id for (artwork_id,) in db.query(Artwork.id).order_by(Artwork.id)]
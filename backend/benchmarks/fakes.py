@@ -0,0 +1,107 @@
+"""Fake upstreams for benchmarking the AI interpretation path offline.
+
+``FakeImageServer`` is a real HTTP server on localhost, so the image fetch in
+``AIService`` goes through the same httpx code path as in production.
+``FakeGeminiClient`` mimics the slice of ``genai.Client`` that ``AIService``
+uses. Both sleep for a configurable latency before answering.
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import uvicorn
+
+# JPEG start-of-image marker so the payload looks like an image to anything
+# that sniffs magic bytes.
+JPEG_MAGIC = b"\xff\xd8\xff\xe0"
+
+
+class FakeImageServer:
+    """Serve fixed-size fake JPEGs on a background thread.
+
+    Use as a context manager; ``base_url`` is available once entered.
+
+    Attributes:
+        latency: Seconds to wait before sending each response
+        payload: Bytes returned for every image request
+    """
+
+    def __init__(self, latency: float = 0.0, image_size: int = 200_000):
+        self.latency = latency
+        self.payload = JPEG_MAGIC + bytes(max(0, image_size - len(JPEG_MAGIC)))
+        self.base_url = ""
+        self._server: uvicorn.Server | None = None
+        self._thread: threading.Thread | None = None
+
+    async def _app(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"image/jpeg"),
+                    (b"content-length", str(len(self.payload)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": self.payload})
+
+    def __enter__(self) -> "FakeImageServer":
+        config = uvicorn.Config(
+            self._app,
+            host="127.0.0.1",
+            port=0,
+            interface="asgi3",
+            lifespan="off",
+            log_level="warning",
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake image server failed to start")
+            time.sleep(0.01)
+
+        port = self._server.servers[0].sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/images"
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._server:
+            self._server.should_exit = True
+        if self._thread:
+            self._thread.join(timeout=10)
+
+
+class FakeGeminiClient:
+    """Stand-in for ``genai.Client`` with configurable generation latency.
+
+    Only ``client.aio.models.generate_content`` is implemented, which is all
+    ``AIService`` calls.
+    """
+
+    def __init__(self, latency: float = 0.0, **_client_kwargs):
+        self.latency = latency
+        self.calls = 0
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self._generate_content))
+
+    async def _generate_content(self, model: str, contents: list, config=None):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        text = f"Benchmark interpretation #{self.calls} from {model}."
+        # About what Gemini reports for a 1200px image (four 258-token tiles)
+        # plus the prompt
+        usage = SimpleNamespace(
+            prompt_token_count=1290, candidates_token_count=120, total_token_count=1410
+        )
+        return SimpleNamespace(text=text, usage_metadata=usage)
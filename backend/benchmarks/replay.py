@@ -0,0 +1,161 @@
+"""Benchmark the seed and AI paths against a recorded cassette, offline.
+
+Replays the Cloudinary listing, image downloads and provider calls recorded
+by ``make record`` (see ``app/cassettes.py``) with their original timing,
+scaled by ``--time-scale``. The seed path runs once; the AI path is driven
+through /graphql like ``benchmarks.run``.
+
+Examples:
+    python -m benchmarks.replay --cassette cassettes/default
+    python -m benchmarks.replay --time-scale 0 --save-baseline benchmarks/replay_baseline.json
+    python -m benchmarks.replay --baseline benchmarks/replay_baseline.json
+
+Requests missing from the cassette fail like upstream errors and are
+counted under ``errs``. The run exits non-zero when ``--baseline`` is given
+and any operation regresses beyond the tolerance.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Same isolation as benchmarks.run: never touch development data. Seeding
+# also rebuilds the similarity index, so it gets its own directory too.
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench_gallery.db")
+os.environ.setdefault("SIMILARITY_INDEX_PATH", "./bench_similarity_index")
+os.environ["RATE_LIMIT"] = "0"
+
+import httpx  # noqa: E402
+
+from app.ai_service import image_budget  # noqa: E402
+from app.cassettes import CASSETTE_DIR, cassette  # noqa: E402
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Artwork  # noqa: E402
+from app.seed import seed_database  # noqa: E402
+from benchmarks.run import SQLCounter, drive_operation, peak_rss_mb  # noqa: E402
+from benchmarks.stats import (  # noqa: E402
+    OperationResult,
+    compare_to_baseline,
+    format_table,
+    load_baseline,
+    save_baseline,
+    summarize,
+)
+
+
+def replay_seed(args: argparse.Namespace, counter: SQLCounter) -> OperationResult:
+    """Seed the benchmark database from the cassette and time it."""
+    counter.count = 0
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    seed_database(max_artworks=args.artworks)
+    duration = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+
+    db = SessionLocal()
+    try:
+        seeded = db.query(Artwork).count()
+    finally:
+        db.close()
+    errors = 0 if seeded else 1
+    return summarize("seed", seeded, [duration], errors, duration, counter.count, cpu)
+
+
+async def replay_interpretations(args: argparse.Namespace, counter: SQLCounter) -> OperationResult:
+    """Drive generateArtworkInterpretation over the seeded artworks."""
+    db = SessionLocal()
+    try:
+        artwork_ids = [artwork_id for (artwork_id,) in db.query(Artwork.id).order_by(Artwork.id)]
+    finally:
+        db.close()
+
+    operation = "generateArtworkInterpretation"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark", timeout=None
+    ) as client:
+        counter.count = 0
+        image_budget.reset_peak()
+        latencies, errors, duration, cpu = await drive_operation(
+            client, operation, artwork_ids, args.requests, args.concurrency, args.seed
+        )
+    return summarize(
+        operation,
+        len(artwork_ids),
+        latencies,
+        errors,
+        duration,
+        counter.count,
+        cpu,
+        image_budget.peak,
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--cassette", type=Path, default=Path(CASSETTE_DIR), help="Cassette directory"
+    )
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=1.0,
+        help="Multiplier for recorded latencies (1: as recorded, 0: none)",
+    )
+    parser.add_argument(
+        "--artworks", type=int, default=20, help="Artworks to seed, as when recording"
+    )
+    parser.add_argument(
+        "--ai-provider", default="gemini", help="Provider the cassette was recorded with"
+    )
+    parser.add_argument("--requests", type=int, default=50, help="Interpretation requests")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for artwork choice")
+    parser.add_argument("--baseline", type=Path, help="Fail if results regress from this file")
+    parser.add_argument("--save-baseline", type=Path, help="Write results as the new baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed latency/throughput regression as a fraction (default: 0.2)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    if not (args.cassette / "index.json").exists():
+        print(f"No cassette at {args.cassette}; record one with make record", file=sys.stderr)
+        return 1
+    cassette.open(args.cassette, "replay", args.time_scale)
+    # AIService reads AI_PROVIDER whenever it creates its provider
+    os.environ["AI_PROVIDER"] = args.ai_provider
+
+    init_db()
+    counter = SQLCounter()
+    results = [replay_seed(args, counter)]
+    results.append(asyncio.run(replay_interpretations(args, counter)))
+    print(format_table(results))
+    print(f"\nPeak RSS of the benchmark process: {peak_rss_mb():.1f} MB")
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, load_baseline(args.baseline), args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
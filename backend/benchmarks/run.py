@@ -0,0 +1,263 @@
+"""Benchmark the /graphql endpoint against synthetic galleries.
+
+Examples:
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 10,1000,100000 --requests 50
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --tolerance 0.25
+
+The run exits non-zero when ``--baseline`` is given and any operation
+regresses beyond the tolerance.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import patch
+
+# Benchmarks always run against their own database so they can never wipe
+# development or production data (same approach as the test suite).
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench_gallery.db")
+# genai.Client is replaced by FakeGeminiClient below; the key is never used.
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+# All load comes from one client; per-client limits would cap it
+os.environ["RATE_LIMIT"] = "0"
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.ai_service import image_budget  # noqa: E402
+from app.database import SessionLocal, engine, init_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.operations import GENERATE_INTERPRETATION, GET_COLLECTIONS  # noqa: E402
+from benchmarks.dataset import seed_synthetic_gallery  # noqa: E402
+from benchmarks.fakes import FakeGeminiClient, FakeImageServer  # noqa: E402
+from benchmarks.stats import (  # noqa: E402
+    OperationResult,
+    compare_to_baseline,
+    format_table,
+    load_baseline,
+    save_baseline,
+    summarize,
+)
+
+# Not a frontend operation; single-artwork lookups are benchmarked on their own.
+GET_ARTWORK = """
+query GetArtwork($id: String!) {
+  artwork(id: $id) {
+    id
+    title
+    imageUrl
+    artist {
+      id
+      name
+    }
+  }
+}
+"""
+
+# name -> (query, builds variables from the seeded artwork IDs, result field)
+OPERATIONS: dict[str, tuple[str, Callable[[list[int], random.Random], dict], str]] = {
+    "GetCollections": (GET_COLLECTIONS, lambda ids, rng: {}, "collections"),
+    "artwork": (GET_ARTWORK, lambda ids, rng: {"id": str(rng.choice(ids))}, "artwork"),
+    "generateArtworkInterpretation": (
+        GENERATE_INTERPRETATION,
+        lambda ids, rng: {"artworkId": str(rng.choice(ids))},
+        "generateArtworkInterpretation",
+    ),
+}
+
+
+class SQLCounter:
+    """Count SQL statements executed on the application engine."""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "after_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *_args) -> None:
+        self.count += 1
+
+
+async def drive_operation(
+    client: httpx.AsyncClient,
+    operation: str,
+    artwork_ids: list[int],
+    requests: int,
+    concurrency: int,
+    seed: int,
+) -> tuple[list[float], int, float, float]:
+    """Send ``requests`` copies of an operation using ``concurrency`` workers.
+
+    Returns:
+        Per-request latencies in seconds, the number of failed requests, the
+        wall-clock duration of the whole batch and the process CPU time it used
+    """
+    query, build_variables, field = OPERATIONS[operation]
+    rng = random.Random(seed)
+    payloads = [
+        {"query": query, "variables": build_variables(artwork_ids, rng)} for _ in range(requests)
+    ]
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while payloads:
+            payload = payloads.pop()
+            started = time.perf_counter()
+            response = await client.post("/graphql", json=payload)
+            latencies.append(time.perf_counter() - started)
+            body = response.json() if response.status_code == 200 else {}
+            if body.get("errors") or (body.get("data") or {}).get(field) is None:
+                errors += 1
+
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return (
+        latencies,
+        errors,
+        time.perf_counter() - started,
+        time.process_time() - cpu_started,
+    )
+
+
+def peak_rss_mb() -> float:
+    """Largest resident set size this process has had, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1_000_000 if sys.platform == "darwin" else 1000)
+
+
+async def run_benchmarks(args: argparse.Namespace) -> list[OperationResult]:
+    """Seed each gallery size and drive every selected operation against it."""
+    results = []
+    counter = SQLCounter()
+    transport = httpx.ASGITransport(app=app)
+    fake_gemini = FakeGeminiClient(latency=args.gemini_latency)
+    # AIService reads AI_PROVIDER whenever it creates its provider
+    os.environ["AI_PROVIDER"] = args.ai_provider
+    os.environ["AI_STUB_LATENCY"] = str(args.gemini_latency)
+
+    with (
+        FakeImageServer(latency=args.image_latency, image_size=args.image_size) as images,
+        patch("app.ai_service.genai.Client", return_value=fake_gemini),
+    ):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark", timeout=None
+        ) as client:
+            for size in args.sizes:
+                db = SessionLocal()
+                try:
+                    artwork_ids = seed_synthetic_gallery(db, size, images.base_url)
+                finally:
+                    db.close()
+
+                for operation in args.operations:
+                    # Warm up connections, mappers and the schema outside the measurement
+                    await drive_operation(client, operation, artwork_ids, 1, 1, args.seed)
+
+                    counter.count = 0
+                    image_budget.reset_peak()
+                    latencies, errors, duration, cpu = await drive_operation(
+                        client, operation, artwork_ids, args.requests, args.concurrency, args.seed
+                    )
+                    result = summarize(
+                        operation,
+                        size,
+                        latencies,
+                        errors,
+                        duration,
+                        counter.count,
+                        cpu,
+                        image_budget.peak,
+                    )
+                    results.append(result)
+                    print(
+                        f"  {result.key}: p95={result.p95_ms}ms rps={result.rps}",
+                        file=sys.stderr,
+                    )
+    return results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=[10, 1000],
+        help="Comma-separated gallery sizes in artworks (default: 10,1000)",
+    )
+    parser.add_argument(
+        "--operations",
+        type=lambda value: value.split(","),
+        default=list(OPERATIONS),
+        help=f"Comma-separated operations (default: {','.join(OPERATIONS)})",
+    )
+    parser.add_argument("--requests", type=int, default=200, help="Requests per operation")
+    # Sessions stay checked out for the whole request, including the AI await.
+    # Concurrency above the pool capacity (5 + 10 overflow) stalls on checkout.
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument(
+        "--image-latency", type=float, default=0.05, help="Fake image server latency (s)"
+    )
+    parser.add_argument("--image-size", type=int, default=200_000, help="Fake image bytes")
+    parser.add_argument(
+        "--ai-provider",
+        choices=["gemini", "stub"],
+        default="gemini",
+        help="gemini: real provider code against a fake client; stub: StubProvider",
+    )
+    parser.add_argument(
+        "--gemini-latency", type=float, default=0.5, help="Fake Gemini / stub latency (s)"
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for artwork choice")
+    parser.add_argument("--baseline", type=Path, help="Fail if results regress from this file")
+    parser.add_argument("--save-baseline", type=Path, help="Write results as the new baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed latency/throughput regression as a fraction (default: 0.2)",
+    )
+    args = parser.parse_args(argv)
+
+    unknown = set(args.operations) - set(OPERATIONS)
+    if unknown:
+        parser.error(f"Unknown operations: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+
+    init_db()
+
+    results = asyncio.run(run_benchmarks(args))
+    print(format_table(results))
+    print(f"\nPeak RSS of the benchmark process: {peak_rss_mb():.1f} MB")
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, load_baseline(args.baseline), args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
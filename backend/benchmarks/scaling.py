@@ -0,0 +1,228 @@
+"""Measure /graphql throughput as uvicorn workers are added.
+
+Starts the real server (``uvicorn --workers N``) for each worker count,
+drives it over HTTP from separate load-generator processes, and reports
+requests per second and the speedup over a single worker.
+
+Examples:
+    python -m benchmarks.scaling
+    python -m benchmarks.scaling --workers 1,2,4,8 --duration 20 --size 1000
+
+Scaling is bounded by the machine: with fewer free cores than workers plus
+load generators, extra workers only add contention.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Same isolation as benchmarks.run: never touch development data
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench_gallery.db")
+os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+
+import httpx  # noqa: E402
+
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.operations import STATIC_OPERATIONS  # noqa: E402
+from benchmarks.dataset import seed_synthetic_gallery  # noqa: E402
+from benchmarks.stats import percentile  # noqa: E402
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, extra_env: dict[str, str]) -> subprocess.Popen:
+    """Start uvicorn with ``workers`` processes and wait until it is ready."""
+    env = {
+        **os.environ,
+        "DATABASE_URL": BENCH_DATABASE_URL,
+        "CACHE_BACKEND": "sqlite",
+        "CACHE_PATH": "./bench_cache.db",
+        "JOB_STORE_PATH": "./bench_jobs.db",
+        # All load comes from one address; per-client limits would cap it
+        "RATE_LIMIT": "0",
+        **extra_env,
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 60
+    ready_responses = 0
+    while ready_responses < workers * 2:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        if time.monotonic() > deadline:
+            stop_server(server)
+            raise RuntimeError("Server did not become ready within 60s")
+        try:
+            response = httpx.get(f"http://127.0.0.1:{port}/ready", timeout=1)
+            ready_responses += response.status_code == 200
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    return server
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    try:
+        server.wait(timeout=20)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+def generate_load(
+    url: str, query: str, duration: float, concurrency: int
+) -> tuple[list[float], int]:
+    """Send requests for ``duration`` seconds; runs in a load-generator process."""
+
+    async def run() -> tuple[list[float], int]:
+        latencies: list[float] = []
+        errors = 0
+        deadline = time.perf_counter() + duration
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+
+            async def worker() -> None:
+                nonlocal errors
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.post(url, json={"query": query})
+                        failed = response.status_code != 200 or "errors" in response.json()
+                    except httpx.HTTPError:
+                        failed = True
+                    latencies.append(time.perf_counter() - started)
+                    errors += failed
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies, errors
+
+    return asyncio.run(run())
+
+
+def measure(args: argparse.Namespace, workers: int) -> dict:
+    port = free_port()
+    server = start_server(workers, port, {"READ_MODEL": "1" if args.read_model else "0"})
+    try:
+        url = f"http://127.0.0.1:{port}/graphql"
+        query = STATIC_OPERATIONS[args.operation]
+        # Warm every worker's caches before measuring
+        generate_load(url, query, 1.0, args.concurrency)
+
+        with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+            started = time.perf_counter()
+            results = pool.starmap(
+                generate_load,
+                [(url, query, args.duration, args.concurrency)] * args.clients,
+            )
+            elapsed = time.perf_counter() - started
+    finally:
+        stop_server(server)
+
+    latencies = [latency for client_latencies, _ in results for latency in client_latencies]
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+    }
+
+
+def format_scaling(rows: list[dict]) -> str:
+    baseline = rows[0]["rps"] or 1
+    lines = [
+        f"{'workers':>7} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'speedup':>8}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['workers']:>7} {row['requests']:>9} {row['errors']:>7} {row['rps']:>9.1f} "
+            f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['rps'] / baseline:>7.2f}x"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, *(n for n in (2, 4, 8) if n <= cores), cores})
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--workers",
+        type=lambda value: [int(count) for count in value.split(",")],
+        default=default_workers,
+        help=f"Comma-separated worker counts (default: {','.join(map(str, default_workers))})",
+    )
+    parser.add_argument("--size", type=int, default=1000, help="Gallery size in artworks")
+    parser.add_argument(
+        "--operation",
+        choices=list(STATIC_OPERATIONS),
+        default="GetCollections",
+        help="Operation to drive (default: GetCollections)",
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per worker count")
+    parser.add_argument(
+        "--clients", type=int, default=2, help="Load-generator processes (default: 2)"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="Connections per load generator"
+    )
+    parser.add_argument(
+        "--read-model", action="store_true", help="Serve gallery queries from the read model"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+
+    init_db()
+    db = SessionLocal()
+    try:
+        seed_synthetic_gallery(db, args.size, "http://127.0.0.1/images")
+    finally:
+        db.close()
+
+    rows = []
+    for workers in args.workers:
+        row = measure(args, workers)
+        rows.append(row)
+        print(f"  {workers} workers: {row['rps']:.1f} rps", file=sys.stderr)
+
+    print(format_scaling(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""Result aggregation and baseline comparison for benchmark runs."""
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+@dataclass
+class OperationResult:
+    """Aggregated measurements for one operation at one gallery size."""
+
+    operation: str
+    artworks: int
+    requests: int
+    errors: int
+    duration_s: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    rps: float
+    sql_per_request: float
+    # Process CPU time per request; the in-process client's share is included
+    cpu_ms_per_request: float = 0.0
+    # Most artwork image bytes held at once (the AI image budget's peak)
+    peak_image_mb: float = 0.0
+
+    @property
+    def key(self) -> str:
+        """Identifier used to match results against a baseline."""
+        return f"{self.operation}@{self.artworks}"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the ``pct`` percentile of ``samples`` using linear interpolation."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(
+    operation: str,
+    artworks: int,
+    latencies_s: list[float],
+    errors: int,
+    duration_s: float,
+    sql_statements: int,
+    cpu_s: float = 0.0,
+    peak_image_bytes: int = 0,
+) -> OperationResult:
+    """Build an ``OperationResult`` from raw per-request latencies (seconds)."""
+    requests = len(latencies_s)
+    latencies_ms = [latency * 1000 for latency in latencies_s]
+    return OperationResult(
+        operation=operation,
+        artworks=artworks,
+        requests=requests,
+        errors=errors,
+        duration_s=round(duration_s, 3),
+        p50_ms=round(percentile(latencies_ms, 50), 2),
+        p95_ms=round(percentile(latencies_ms, 95), 2),
+        p99_ms=round(percentile(latencies_ms, 99), 2),
+        rps=round(requests / duration_s, 1) if duration_s else 0.0,
+        sql_per_request=round(sql_statements / requests, 2) if requests else 0.0,
+        cpu_ms_per_request=round(cpu_s * 1000 / requests, 3) if requests else 0.0,
+        peak_image_mb=round(peak_image_bytes / 1_000_000, 2),
+    )
+
+
+def compare_to_baseline(
+    results: list[OperationResult], baseline: dict[str, dict], tolerance: float
+) -> list[str]:
+    """Check results against a stored baseline.
+
+    Latency, throughput, CPU per request and peak image memory may drift by
+    ``tolerance`` (a fraction, e.g. 0.2 for 20%) before counting as a
+    regression. SQL counts are deterministic, so any increase is a regression.
+    Operations missing from the baseline are skipped.
+
+    Returns:
+        Human-readable regression messages; empty when the run passes
+    """
+    regressions = []
+    for result in results:
+        expected = baseline.get(result.key)
+        if expected is None:
+            continue
+        if result.errors:
+            regressions.append(f"{result.key}: {result.errors} failed requests")
+        if result.p95_ms > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{result.key}: p95 {result.p95_ms}ms exceeds baseline {expected['p95_ms']}ms"
+            )
+        if result.rps < expected["rps"] * (1 - tolerance):
+            regressions.append(
+                f"{result.key}: {result.rps} req/s below baseline {expected['rps']} req/s"
+            )
+        # Baselines saved before CPU was measured have no CPU figure
+        expected_cpu = expected.get("cpu_ms_per_request")
+        if expected_cpu and result.cpu_ms_per_request > expected_cpu * (1 + tolerance):
+            regressions.append(
+                f"{result.key}: {result.cpu_ms_per_request} CPU ms/request exceeds baseline "
+                f"{expected_cpu} CPU ms/request"
+            )
+        expected_image_mb = expected.get("peak_image_mb")
+        if expected_image_mb and result.peak_image_mb > expected_image_mb * (1 + tolerance):
+            regressions.append(
+                f"{result.key}: {result.peak_image_mb} MB of images held at once exceeds "
+                f"baseline {expected_image_mb} MB"
+            )
+        if result.sql_per_request > expected["sql_per_request"]:
+            regressions.append(
+                f"{result.key}: {result.sql_per_request} SQL statements/request, "
+                f"baseline {expected['sql_per_request']}"
+            )
+    return regressions
+
+
+def load_baseline(path: Path) -> dict[str, dict]:
+    """Load a baseline file written by ``save_baseline``."""
+    return json.loads(path.read_text())
+
+
+def save_baseline(path: Path, results: list[OperationResult]) -> None:
+    """Persist results as the baseline for future runs."""
+    path.write_text(json.dumps({r.key: asdict(r) for r in results}, indent=2) + "\n")
+
+
+def format_table(results: list[OperationResult]) -> str:
+    """Render results as a fixed-width text table."""
+    header = (
+        f"{'operation':<32} {'artworks':>8} {'reqs':>6} {'errs':>5} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8} {'sql/req':>8} "
+        f"{'cpu ms':>7} {'img MB':>7}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.operation:<32} {r.artworks:>8} {r.requests:>6} {r.errors:>5} "
+            f"{r.p50_ms:>9.2f} {r.p95_ms:>9.2f} {r.p99_ms:>9.2f} {r.rps:>8.1f} "
+            f"{r.sql_per_request:>8.2f} {r.cpu_ms_per_request:>7.2f} {r.peak_image_mb:>7.2f}"
+        )
+    return "\n".join(lines)
@@ -2,7 +2,7 @@
 
 import os
 from datetime import datetime, timezone
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
@@ -10,25 +10,32 @@ from fastapi.testclient import TestClient
 # Set test database URL before importing app modules
 os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
 
+from app.ai_service import InterpretationError, InterpretationErrorCode
 from app.database import SessionLocal, init_db
+from app.interpretation_cache import interpretation_cache
 from app.main import app
-from app.models import Artist, Artwork, Collection
+from app.models import AIInterpretation, Artist, Artwork, Collection
+from app.pregenerate import pregenerate
+from app.prompts import PromptTemplate
+from app.repository import InterpretationRepository
 
 
 @pytest.fixture(autouse=True)
 def setup_database():
     """Setup test database before each test."""
     init_db()
+    interpretation_cache.clear()
 
     db = SessionLocal()
     try:
         # Clear existing data
+        db.query(AIInterpretation).delete()
         db.query(Artwork).delete()
         db.query(Collection).delete()
         db.query(Artist).delete()
 
         # Create test artist
-        artist = Artist(name="Test Artist")
+        artist = Artist(name="Test Artist", bio="Paints outdoors.")
         db.add(artist)
         db.flush()
 
@@ -233,3 +240,224 @@ class TestAIInterpretationQuery:
             # Timestamp should be very recent (within 5 seconds of request)
             time_diff = (generated_at - before).total_seconds()
             assert 0 <= time_diff <= 5
+
+
+class TestInterpretationFallback:
+    """Test degraded responses when live generation fails."""
+
+    QUERY = """
+        query {
+            generateArtworkInterpretation(artworkId: "1") {
+                id
+                content
+                errorCode
+            }
+        }
+    """
+
+    def post_with_ai_service(self, mock_ai_service):
+        with patch("app.main.AIService", return_value=mock_ai_service):
+            return TestClient(app).post("/graphql", json={"query": self.QUERY})
+
+    def test_serves_last_interpretation_when_circuit_is_open(self):
+        """The most recent live interpretation is served with an error code."""
+        healthy = AsyncMock()
+        healthy.interpret_artwork.return_value = "A calm study in blue."
+        first = self.post_with_ai_service(healthy).json()
+
+        degraded = AsyncMock()
+        degraded.interpret_artwork.side_effect = InterpretationError(
+            "open", InterpretationErrorCode.CIRCUIT_OPEN
+        )
+        data = self.post_with_ai_service(degraded).json()
+
+        interpretation = data["data"]["generateArtworkInterpretation"]
+        assert interpretation["content"] == "A calm study in blue."
+        assert interpretation["errorCode"] == "CIRCUIT_OPEN"
+        assert interpretation["id"] == first["data"]["generateArtworkInterpretation"]["id"]
+
+    def test_serves_pregenerated_interpretation(self):
+        """A stored interpretation is the fallback when nothing is cached."""
+        db = SessionLocal()
+        try:
+            db.add(
+                AIInterpretation(artwork_id=1, content="Pre-generated note.", context="artwork:1")
+            )
+            db.commit()
+        finally:
+            db.close()
+
+        degraded = AsyncMock()
+        degraded.interpret_artwork.side_effect = InterpretationError(
+            "timeout", InterpretationErrorCode.TIMEOUT
+        )
+        data = self.post_with_ai_service(degraded).json()
+
+        interpretation = data["data"]["generateArtworkInterpretation"]
+        assert interpretation["content"] == "Pre-generated note."
+        assert interpretation["errorCode"] == "TIMEOUT"
+
+    def test_reports_error_code_without_fallback(self):
+        """Without a fallback the field is null and the error carries the code."""
+        degraded = AsyncMock()
+        degraded.interpret_artwork.side_effect = InterpretationError(
+            "open", InterpretationErrorCode.CIRCUIT_OPEN
+        )
+        data = self.post_with_ai_service(degraded).json()
+
+        assert data["data"]["generateArtworkInterpretation"] is None
+        assert data["errors"][0]["extensions"]["code"] == "CIRCUIT_OPEN"
+
+    def test_fresh_interpretation_has_no_error_code(self):
+        healthy = AsyncMock()
+        healthy.interpret_artwork.return_value = "Fresh note."
+        data = self.post_with_ai_service(healthy).json()
+
+        assert data["data"]["generateArtworkInterpretation"]["errorCode"] is None
+
+
+class TestBatchInterpretationQuery:
+    """Test GraphQL generateArtworkInterpretations query."""
+
+    QUERY = """
+        query GenerateMany($ids: [String!]!) {
+            generateArtworkInterpretations(artworkIds: $ids) {
+                artworkId
+                errorCode
+                interpretation {
+                    content
+                    context
+                    errorCode
+                }
+            }
+        }
+    """
+
+    def post(self, mock_ai_service, ids):
+        with patch("app.main.AIService", return_value=mock_ai_service):
+            return TestClient(app).post(
+                "/graphql", json={"query": self.QUERY, "variables": {"ids": ids}}
+            )
+
+    def test_returns_one_result_per_artwork(self):
+        mock_ai_service = AsyncMock()
+        mock_ai_service.interpret_artworks.return_value = ["First note.", "Second note."]
+
+        response = self.post(mock_ai_service, ["1", "2"])
+
+        assert response.status_code == 200
+        results = response.json()["data"]["generateArtworkInterpretations"]
+        assert [r["artworkId"] for r in results] == ["1", "2"]
+        assert results[0]["interpretation"]["content"] == "First note."
+        assert results[1]["interpretation"]["context"] == "artwork:2"
+        assert all(r["errorCode"] is None for r in results)
+        mock_ai_service.interpret_artworks.assert_awaited_once()
+
+    def test_reports_partial_failures(self):
+        mock_ai_service = AsyncMock()
+        mock_ai_service.interpret_artworks.return_value = [
+            "First note.",
+            InterpretationError("timeout", InterpretationErrorCode.TIMEOUT),
+        ]
+
+        response = self.post(mock_ai_service, ["1", "2", "9999", "not-an-id"])
+
+        results = response.json()["data"]["generateArtworkInterpretations"]
+        assert results[0]["interpretation"]["content"] == "First note."
+        assert results[1]["errorCode"] == "TIMEOUT"
+        assert results[1]["interpretation"] is None
+        assert results[2]["errorCode"] == "ARTWORK_NOT_FOUND"
+        assert results[3]["errorCode"] == "ARTWORK_NOT_FOUND"
+
+    def test_failed_artwork_falls_back_to_cached_interpretation(self):
+        healthy = AsyncMock()
+        healthy.interpret_artworks.return_value = ["Earlier note."]
+        self.post(healthy, ["1"])
+
+        degraded = AsyncMock()
+        degraded.interpret_artworks.return_value = [
+            InterpretationError("open", InterpretationErrorCode.CIRCUIT_OPEN)
+        ]
+        results = self.post(degraded, ["1"]).json()["data"]["generateArtworkInterpretations"]
+
+        assert results[0]["errorCode"] == "CIRCUIT_OPEN"
+        assert results[0]["interpretation"]["content"] == "Earlier note."
+        assert results[0]["interpretation"]["errorCode"] == "CIRCUIT_OPEN"
+
+    def test_duplicate_ids_are_generated_once(self):
+        mock_ai_service = AsyncMock()
+        mock_ai_service.interpret_artworks.return_value = ["Only note."]
+
+        results = self.post(mock_ai_service, ["1", "1"]).json()["data"][
+            "generateArtworkInterpretations"
+        ]
+
+        assert [r["interpretation"]["content"] for r in results] == ["Only note."] * 2
+        (artworks,), _ = mock_ai_service.interpret_artworks.call_args
+        assert len(artworks) == 1
+
+    def test_ids_are_parsed_as_integers(self):
+        """Zero-padded IDs find their artwork; digit-like symbols are not found."""
+        mock_ai_service = AsyncMock()
+        mock_ai_service.interpret_artworks.return_value = ["Padded note."]
+
+        response = self.post(mock_ai_service, ["001", "1", "\u00b2"])
+
+        results = response.json()["data"]["generateArtworkInterpretations"]
+        assert [r["artworkId"] for r in results] == ["001", "1", "\u00b2"]
+        assert [r["interpretation"]["content"] for r in results[:2]] == ["Padded note."] * 2
+        assert results[2]["errorCode"] == "ARTWORK_NOT_FOUND"
+        (artworks,), _ = mock_ai_service.interpret_artworks.call_args
+        assert len(artworks) == 1
+
+    def test_rejects_oversized_batches(self):
+        response = self.post(AsyncMock(), [str(i) for i in range(51)])
+
+        data = response.json()
+        assert data["data"] is None
+        assert data["errors"][0]["extensions"]["code"] == "BATCH_TOO_LARGE"
+
+
+class TestStalePregeneration:
+    """Test that only interpretations from an outdated prompt are regenerated."""
+
+    def _ai_service(self, prompt):
+        ai_service = MagicMock()
+        ai_service.prompt = prompt
+        ai_service.interpret_artwork = AsyncMock(return_value="A regenerated note.")
+        return ai_service
+
+    async def test_stale_run_skips_artworks_with_current_prompt(self):
+        """Artworks already interpreted with the active prompt are left alone."""
+        current = PromptTemplate(version="v2", template="New prompt for {title}")
+        db = SessionLocal()
+        try:
+            fresh, stale = db.query(Artwork).order_by(Artwork.id).all()
+            repo = InterpretationRepository(db)
+            repo.add(fresh.id, "Current.", prompt_version="v2", prompt_hash=current.hash)
+            repo.add(stale.id, "Outdated.", prompt_version="v1", prompt_hash="oldhash")
+            db.commit()
+            fresh_id, stale_id = fresh.id, stale.id
+        finally:
+            db.close()
+
+        ai_service = self._ai_service(current)
+        with patch("app.pregenerate.AIService", return_value=ai_service):
+            stored = await pregenerate(stale_only=True)
+
+        assert stored == 1
+        (artwork,) = ai_service.interpret_artwork.call_args.args
+        assert artwork.id == stale_id
+
+        db = SessionLocal()
+        try:
+            latest = InterpretationRepository(db).get_latest_for_artwork(stale_id)
+            assert latest.content == "A regenerated note."
+            assert latest.prompt_version == "v2"
+            assert latest.prompt_hash == current.hash
+            assert InterpretationRepository(db).get_artwork_ids_with_prompt(current.hash) == {
+                fresh_id,
+                stale_id,
+            }
+        finally:
+            db.close()
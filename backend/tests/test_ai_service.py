@@ -1,32 +1,209 @@
 """Unit tests for AI service with mocked Gemini API calls."""
 
+import asyncio
+import inspect
+from contextlib import asynccontextmanager
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
 
-from app.ai_service import AIService
+from app.ai_service import (
+    AIService,
+    GeminiProvider,
+    InterpretationError,
+    InterpretationErrorCode,
+    StubProvider,
+    create_provider,
+    default_generation_breaker,
+    default_image_breaker,
+    reset_default_provider,
+)
+from app.circuit_breaker import CircuitBreaker
 from app.models import Artist, Artwork
+from app.usage import Generation, usage_log
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Keep failures recorded by one test from tripping breakers in the next."""
+    default_image_breaker.reset()
+    default_generation_breaker.reset()
+    yield
+    default_image_breaker.reset()
+    default_generation_breaker.reset()
+
+
+@pytest.fixture(autouse=True)
+def fresh_default_provider():
+    """Create the shared provider from each test's configuration."""
+    reset_default_provider()
+    yield
+    reset_default_provider()
+
+
+@pytest.fixture(autouse=True)
+def discard_usage(monkeypatch):
+    """Keep calls to mocked providers out of the usage ledger."""
+    monkeypatch.setattr(usage_log, "enabled", False)
+
+
+def image_response(content: bytes = b"fake_image", content_type: str = "image/jpeg"):
+    """An image response as ``AsyncClient.stream`` yields it."""
+    response = MagicMock()
+    response.headers = {"content-type": content_type}
+
+    async def aiter_bytes():
+        yield content
+
+    response.aiter_bytes = aiter_bytes
+    return response
+
+
+def streaming_client(respond):
+    """HTTP client mock whose ``stream`` answers with ``respond``.
+
+    ``respond`` is a response, an exception to raise, or a function of the
+    URL returning either.
+    """
+    client = MagicMock()
+
+    @asynccontextmanager
+    async def stream(method, url, timeout):
+        result = respond(url) if inspect.isfunction(respond) else respond
+        if isinstance(result, Exception):
+            raise result
+        yield result
+
+    client.stream = MagicMock(side_effect=stream)
+    return client
 
 
 class TestAIServiceInitialization:
     """Test AI service initialization and configuration."""
 
     def test_initialization_with_valid_api_key(self, monkeypatch):
-        """AIService initializes successfully with valid API key."""
+        """AIService initializes the Gemini client with a valid API key."""
         monkeypatch.setenv("GEMINI_API_KEY", "test_api_key_123")
+        monkeypatch.delenv("AI_PROVIDER", raising=False)
 
         with patch("app.ai_service.genai.Client") as mock_client:
             service = AIService()
+            provider = service.provider
             mock_client.assert_called_once_with(api_key="test_api_key_123")
-            assert service.client is not None
+            assert isinstance(provider, GeminiProvider)
+            assert provider.client is not None
 
     def test_initialization_fails_without_api_key(self, monkeypatch):
-        """AIService raises ValueError when API key is missing."""
+        """AIService raises ValueError when the Gemini provider lacks an API key."""
         monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+        monkeypatch.delenv("AI_PROVIDER", raising=False)
 
+        service = AIService()
         with pytest.raises(ValueError, match="GEMINI_API_KEY environment variable not set"):
+            service.provider
+
+    def test_services_share_the_default_provider(self, monkeypatch):
+        """The Gemini client is created once per process, not once per service."""
+        monkeypatch.setenv("GEMINI_API_KEY", "test_key")
+        monkeypatch.delenv("AI_PROVIDER", raising=False)
+
+        with patch("app.ai_service.genai.Client") as mock_client:
+            providers = {id(AIService().provider) for _ in range(3)}
+
+        assert len(providers) == 1
+        mock_client.assert_called_once()
+
+    def test_injected_provider_is_used_instead(self, monkeypatch):
+        monkeypatch.setenv("AI_PROVIDER", "stub")
+        provider = StubProvider(latency=0)
+
+        assert AIService(provider=provider).provider is provider
+        assert AIService().provider is not provider
+
+    def test_provider_is_created_lazily(self, monkeypatch):
+        """Constructing AIService does not create the provider."""
+        monkeypatch.setenv("GEMINI_API_KEY", "test_key")
+        monkeypatch.delenv("AI_PROVIDER", raising=False)
+
+        with patch("app.ai_service.genai.Client") as mock_client:
             AIService()
+            mock_client.assert_not_called()
+
+    def test_model_can_be_configured(self, monkeypatch):
+        """GEMINI_MODEL overrides the default Gemini model."""
+        monkeypatch.setenv("GEMINI_API_KEY", "test_key")
+        monkeypatch.setenv("GEMINI_MODEL", "gemini-test-model")
+
+        with patch("app.ai_service.genai.Client"):
+            assert GeminiProvider().model == "gemini-test-model"
+
+
+class TestProviderSelection:
+    """Test choosing a provider via AI_PROVIDER."""
+
+    def test_defaults_to_gemini(self, monkeypatch):
+        monkeypatch.setenv("GEMINI_API_KEY", "test_key")
+        monkeypatch.delenv("AI_PROVIDER", raising=False)
+
+        with patch("app.ai_service.genai.Client"):
+            assert isinstance(create_provider(), GeminiProvider)
+
+    def test_stub_provider_needs_no_api_key(self, monkeypatch):
+        monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+        monkeypatch.setenv("AI_PROVIDER", "stub")
+
+        assert isinstance(AIService().provider, StubProvider)
+
+    def test_unknown_provider_raises(self, monkeypatch):
+        monkeypatch.setenv("AI_PROVIDER", "nonexistent")
+
+        with pytest.raises(ValueError, match="Unknown AI provider 'nonexistent'"):
+            create_provider()
+
+
+class TestStubProvider:
+    """Test the deterministic local provider."""
+
+    @pytest.mark.asyncio
+    async def test_output_is_deterministic(self):
+        provider = StubProvider(latency=0)
+
+        first = await provider.generate(b"image", "image/jpeg", "prompt")
+        second = await provider.generate(b"image", "image/jpeg", "prompt")
+
+        assert first == second
+        assert "the artist" in first.text.lower()
+
+    @pytest.mark.asyncio
+    async def test_output_depends_on_inputs(self):
+        provider = StubProvider(latency=0)
+
+        outputs = {
+            (await provider.generate(f"image-{i}".encode(), "image/jpeg", "prompt")).text
+            for i in range(20)
+        }
+
+        assert len(outputs) > 1
+
+    @pytest.mark.asyncio
+    async def test_interpret_artwork_with_stub_provider(self):
+        """AIService works end to end with an injected stub provider."""
+        mock_response = image_response(b"fake_image_data", "image/jpeg")
+        mock_http_client = streaming_client(mock_response)
+
+        with patch("app.ai_service.httpx.AsyncClient") as mock_async_client:
+            mock_async_client.return_value.__aenter__.return_value = mock_http_client
+
+            service = AIService(provider=StubProvider(latency=0))
+            artwork = Artwork(id=1, title="Test", image_url="https://example.com/a.jpg")
+
+            result = await service.interpret_artwork(artwork)
+
+        expected = await StubProvider(latency=0).generate(
+            b"fake_image_data", "image/jpeg", service._build_prompt(artwork)
+        )
+        assert result == expected.text
 
 
 class TestPromptConstruction:
@@ -91,13 +268,10 @@ class TestImageFetching:
 
         # Mock image data
         mock_image_bytes = b"fake_image_data"
-        mock_response = MagicMock()
-        mock_response.content = mock_image_bytes
-        mock_response.headers = {"content-type": "image/jpeg"}
+        mock_response = image_response(mock_image_bytes, "image/jpeg")
 
         # Mock httpx client
-        mock_http_client = AsyncMock()
-        mock_http_client.get.return_value = mock_response
+        mock_http_client = streaming_client(mock_response)
 
         # Mock Gemini client
         mock_genai_response = MagicMock()
@@ -122,8 +296,8 @@ class TestImageFetching:
                 result = await service.interpret_artwork(artwork)
 
                 # Verify image was fetched
-                mock_http_client.get.assert_called_once_with(
-                    "https://example.com/image.jpg", timeout=10.0
+                mock_http_client.stream.assert_called_once_with(
+                    "GET", "https://example.com/image.jpg", timeout=10.0
                 )
                 assert result == "A beautiful interpretation of the artwork."
 
@@ -133,8 +307,7 @@ class TestImageFetching:
         monkeypatch.setenv("GEMINI_API_KEY", "test_key")
 
         # Mock httpx client that raises HTTPError
-        mock_http_client = AsyncMock()
-        mock_http_client.get.side_effect = httpx.HTTPError("Network error")
+        mock_http_client = streaming_client(httpx.HTTPError("Network error"))
 
         with patch("app.ai_service.genai.Client"):
             with patch("app.ai_service.httpx.AsyncClient") as mock_async_client:
@@ -159,12 +332,9 @@ class TestImageFetching:
         monkeypatch.setenv("GEMINI_API_KEY", "test_key")
 
         mock_image_bytes = b"fake_png_data"
-        mock_response = MagicMock()
-        mock_response.content = mock_image_bytes
-        mock_response.headers = {"content-type": "image/png"}
+        mock_response = image_response(mock_image_bytes, "image/png")
 
-        mock_http_client = AsyncMock()
-        mock_http_client.get.return_value = mock_response
+        mock_http_client = streaming_client(mock_response)
 
         mock_genai_response = MagicMock()
         mock_genai_response.text = "Interpretation"
@@ -204,11 +374,8 @@ class TestGeminiAPIIntegration:
         monkeypatch.setenv("GEMINI_API_KEY", "test_key")
 
         # Mock HTTP image fetch
-        mock_image_response = MagicMock()
-        mock_image_response.content = b"fake_image"
-        mock_image_response.headers = {"content-type": "image/jpeg"}
-        mock_http_client = AsyncMock()
-        mock_http_client.get.return_value = mock_image_response
+        mock_image_response = image_response(b"fake_image", "image/jpeg")
+        mock_http_client = streaming_client(mock_image_response)
 
         # Mock Gemini response
         mock_genai_response = MagicMock()
@@ -240,11 +407,8 @@ class TestGeminiAPIIntegration:
         """Raises exception when AI returns empty response."""
         monkeypatch.setenv("GEMINI_API_KEY", "test_key")
 
-        mock_image_response = MagicMock()
-        mock_image_response.content = b"fake_image"
-        mock_image_response.headers = {"content-type": "image/jpeg"}
-        mock_http_client = AsyncMock()
-        mock_http_client.get.return_value = mock_image_response
+        mock_image_response = image_response(b"fake_image", "image/jpeg")
+        mock_http_client = streaming_client(mock_image_response)
 
         # Mock empty Gemini response
         mock_genai_response = MagicMock()
@@ -268,3 +432,137 @@ class TestGeminiAPIIntegration:
 
                 with pytest.raises(Exception, match="AI service returned empty response"):
                     await service.interpret_artwork(artwork)
+
+
+class TestCircuitBreaking:
+    """Test failing fast and error codes around upstream calls."""
+
+    def make_artwork(self):
+        return Artwork(id=1, title="Test", image_url="https://example.com/image.jpg")
+
+    def mock_http(self):
+        mock_response = image_response(b"fake_image", "image/jpeg")
+        mock_http_client = streaming_client(mock_response)
+        return mock_http_client
+
+    @pytest.mark.asyncio
+    async def test_image_fetch_failure_has_error_code(self):
+        mock_http_client = streaming_client(httpx.ConnectError("refused"))
+
+        with patch("app.ai_service.httpx.AsyncClient") as mock_async_client:
+            mock_async_client.return_value.__aenter__.return_value = mock_http_client
+            service = AIService(provider=StubProvider(latency=0))
+
+            with pytest.raises(InterpretationError) as exc_info:
+                await service.interpret_artwork(self.make_artwork())
+
+        assert exc_info.value.code == InterpretationErrorCode.IMAGE_FETCH_FAILED
+
+    @pytest.mark.asyncio
+    async def test_open_image_circuit_fails_fast(self):
+        breaker = CircuitBreaker("images", min_calls=1, window_size=1)
+        mock_http_client = streaming_client(httpx.ConnectError("refused"))
+
+        with patch("app.ai_service.httpx.AsyncClient") as mock_async_client:
+            mock_async_client.return_value.__aenter__.return_value = mock_http_client
+            service = AIService(provider=StubProvider(latency=0), image_breaker=breaker)
+
+            with pytest.raises(InterpretationError):
+                await service.interpret_artwork(self.make_artwork())
+            with pytest.raises(InterpretationError) as exc_info:
+                await service.interpret_artwork(self.make_artwork())
+
+        assert exc_info.value.code == InterpretationErrorCode.CIRCUIT_OPEN
+        assert mock_http_client.stream.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_generation_times_out(self, monkeypatch):
+        monkeypatch.setattr("app.ai_service.GENERATION_TIMEOUT_SECONDS", 0.01)
+
+        with patch("app.ai_service.httpx.AsyncClient") as mock_async_client:
+            mock_async_client.return_value.__aenter__.return_value = self.mock_http()
+            service = AIService(provider=StubProvider(latency=1))
+
+            with pytest.raises(InterpretationError) as exc_info:
+                await service.interpret_artwork(self.make_artwork())
+
+        assert exc_info.value.code == InterpretationErrorCode.TIMEOUT
+
+    @pytest.mark.asyncio
+    async def test_open_generation_circuit_skips_provider(self):
+        breaker = CircuitBreaker("ai_generation", min_calls=1, window_size=1)
+        provider = AsyncMock()
+        provider.generate.side_effect = RuntimeError("quota exceeded")
+
+        with patch("app.ai_service.httpx.AsyncClient") as mock_async_client:
+            mock_async_client.return_value.__aenter__.return_value = self.mock_http()
+            service = AIService(provider=provider, generation_breaker=breaker)
+
+            with pytest.raises(InterpretationError) as first:
+                await service.interpret_artwork(self.make_artwork())
+            with pytest.raises(InterpretationError) as second:
+                await service.interpret_artwork(self.make_artwork())
+
+        assert first.value.code == InterpretationErrorCode.GENERATION_FAILED
+        assert second.value.code == InterpretationErrorCode.CIRCUIT_OPEN
+        assert provider.generate.call_count == 1
+
+
+class TestBatchInterpretation:
+    """Test interpreting several artworks in one call."""
+
+    def make_artworks(self, count):
+        return [
+            Artwork(id=i, title=f"Artwork {i}", image_url=f"https://example.com/{i}.jpg")
+            for i in range(1, count + 1)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_results_keep_order_and_partial_failures(self):
+        def respond(url):
+            if url.endswith("/2.jpg"):
+                return httpx.ConnectError("refused")
+            return image_response(url.encode(), "image/jpeg")
+
+        mock_http_client = streaming_client(respond)
+
+        with patch("app.ai_service.httpx.AsyncClient") as mock_async_client:
+            mock_async_client.return_value.__aenter__.return_value = mock_http_client
+            service = AIService(provider=StubProvider(latency=0))
+
+            results = await service.interpret_artworks(self.make_artworks(3))
+
+        assert isinstance(results[0], str)
+        assert isinstance(results[1], InterpretationError)
+        assert results[1].code == InterpretationErrorCode.IMAGE_FETCH_FAILED
+        assert isinstance(results[2], str)
+        # One shared HTTP client for the whole batch
+        mock_async_client.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_provider_parallelism_is_bounded(self):
+        in_flight = 0
+        peak = 0
+
+        class TrackingProvider:
+            name = "tracking"
+
+            async def generate(self, image_bytes, mime_type, prompt):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                return Generation("note")
+
+        mock_response = image_response(b"image", "image/jpeg")
+        mock_http_client = streaming_client(mock_response)
+
+        with patch("app.ai_service.httpx.AsyncClient") as mock_async_client:
+            mock_async_client.return_value.__aenter__.return_value = mock_http_client
+            service = AIService(provider=TrackingProvider())
+
+            results = await service.interpret_artworks(self.make_artworks(10), max_concurrency=3)
+
+        assert results == ["note"] * 10
+        assert peak == 3
@@ -0,0 +1,155 @@
+"""Tests for serving several artists' galleries from one deployment."""
+
+import os
+
+import pytest
+from sqlalchemy import inspect
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+
+from app.database import SessionLocal, engine, init_db
+from app.models import AIInterpretation, Artist, Artwork, Collection
+from app.read_model import ReadModel
+from app.repository import ArtistRepository, CollectionRepository
+from app.schema import schema
+
+ARTIST_COLLECTIONS = """
+query ($id: String!) {
+  artist(id: $id) {
+    name
+    collections { title artworks { title } }
+  }
+}
+"""
+
+
+@pytest.fixture
+def db():
+    """Two artists with a collection each; the first also has a second one."""
+    init_db()
+    session = SessionLocal()
+    session.query(AIInterpretation).delete()
+    session.query(Artwork).delete()
+    session.query(Collection).delete()
+    session.query(Artist).delete()
+
+    first = Artist(name="First Artist", bio="Paints harbours.")
+    second = Artist(name="Second Artist", bio="Paints hills.")
+    session.add_all([first, second])
+    session.flush()
+    collections = [
+        Collection(title="Harbours", description=None, artist_id=first.id),
+        Collection(title="Hills", description=None, artist_id=second.id),
+        Collection(title="Boats", description=None, artist_id=first.id),
+    ]
+    session.add_all(collections)
+    session.flush()
+    session.add_all(
+        Artwork(
+            title=f"{collection.title} 1",
+            image_url=f"https://example.com/{collection.id}.jpg",
+            artist_id=collection.artist_id,
+            collection_id=collection.id,
+        )
+        for collection in collections
+    )
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def artist_ids(db) -> tuple[int, int]:
+    first, second = db.query(Artist.id).order_by(Artist.id)
+    return first.id, second.id
+
+
+def test_repository_scopes_collections_to_an_artist(db):
+    first_id, second_id = artist_ids(db)
+    repo = CollectionRepository(db)
+
+    assert [c.title for c in repo.get_by_artist(first_id)] == ["Harbours", "Boats"]
+    assert [c.title for c in repo.get_by_artist(second_id)] == ["Hills"]
+    assert len(repo.get_all()) == 3
+
+
+def test_repository_pages_artists(db):
+    repo = ArtistRepository(db)
+
+    assert [a.name for a in repo.get_page(limit=1, offset=1)] == ["Second Artist"]
+    assert repo.get_artist().name == "First Artist"
+    assert repo.get_by_id(artist_ids(db)[1]).name == "Second Artist"
+
+
+def test_scoped_lookups_are_indexed():
+    init_db()
+    indexes = {
+        table: {tuple(index["column_names"]) for index in inspect(engine).get_indexes(table)}
+        for table in ("collections", "artworks", "ai_interpretations")
+    }
+
+    assert ("artist_id", "id") in indexes["collections"]
+    assert ("collection_id", "id") in indexes["artworks"]
+    assert ("artist_id", "id") in indexes["artworks"]
+    assert ("artwork_id", "generated_at") in indexes["ai_interpretations"]
+
+
+@pytest.mark.parametrize("use_read_model", [False, True])
+def test_artist_by_id_with_collections(db, use_read_model):
+    _, second_id = artist_ids(db)
+    context = {"db": db, "read_model": ReadModel() if use_read_model else None}
+
+    result = schema.execute_sync(
+        ARTIST_COLLECTIONS, variable_values={"id": str(second_id)}, context_value=context
+    )
+
+    assert result.errors is None
+    assert result.data["artist"] == {
+        "name": "Second Artist",
+        "collections": [{"title": "Hills", "artworks": [{"title": "Hills 1"}]}],
+    }
+
+
+@pytest.mark.parametrize("use_read_model", [False, True])
+def test_collections_filtered_by_artist(db, use_read_model):
+    first_id, _ = artist_ids(db)
+    context = {"db": db, "read_model": ReadModel() if use_read_model else None}
+
+    result = schema.execute_sync(
+        "query ($id: String) { collections(artistId: $id) { title } }",
+        variable_values={"id": str(first_id)},
+        context_value=context,
+    )
+    unscoped = schema.execute_sync("{ collections { title } }", context_value=context)
+
+    assert [c["title"] for c in result.data["collections"]] == ["Harbours", "Boats"]
+    assert len(unscoped.data["collections"]) == 3
+
+
+@pytest.mark.parametrize("use_read_model", [False, True])
+def test_artists_are_paginated(db, use_read_model):
+    context = {"db": db, "read_model": ReadModel() if use_read_model else None}
+
+    result = schema.execute_sync(
+        "{ artists(first: 1, offset: 1) { name } artist { name } }", context_value=context
+    )
+
+    assert result.errors is None
+    assert result.data == {
+        "artists": [{"name": "Second Artist"}],
+        "artist": {"name": "First Artist"},
+    }
+
+
+def test_unknown_artist_is_null(db):
+    result = schema.execute_sync(
+        ARTIST_COLLECTIONS, variable_values={"id": "999999"}, context_value={"db": db}
+    )
+    invalid = schema.execute_sync(
+        ARTIST_COLLECTIONS, variable_values={"id": "abc"}, context_value={"db": db}
+    )
+
+    assert result.data == {"artist": None}
+    assert invalid.data == {"artist": None}
@@ -0,0 +1,100 @@
+"""Unit tests for benchmark result aggregation and baseline checks."""
+
+import pytest
+
+from benchmarks.stats import compare_to_baseline, percentile, summarize
+
+
+def make_result(latencies_s=None, errors=0, sql_statements=20):
+    latencies_s = latencies_s if latencies_s is not None else [0.01] * 10
+    return summarize("artwork", 10, latencies_s, errors, 0.5, sql_statements)
+
+
+class TestPercentile:
+    """Test percentile interpolation."""
+
+    def test_interpolates_between_samples(self):
+        samples = [1.0, 2.0, 3.0, 4.0, 5.0]
+        assert percentile(samples, 50) == 3.0
+        assert percentile(samples, 95) == pytest.approx(4.8)
+        assert percentile(samples, 100) == 5.0
+
+    def test_empty_samples_return_zero(self):
+        assert percentile([], 99) == 0.0
+
+
+class TestSummarize:
+    """Test building operation results from raw latencies."""
+
+    def test_reports_milliseconds_throughput_and_sql(self):
+        result = make_result(latencies_s=[0.01, 0.02, 0.03, 0.04], sql_statements=8)
+
+        assert result.requests == 4
+        assert result.p50_ms == 25.0
+        assert result.rps == 8.0
+        assert result.sql_per_request == 2.0
+        assert result.key == "artwork@10"
+
+
+class TestCompareToBaseline:
+    """Test regression detection against a stored baseline."""
+
+    def baseline_for(self, result, **overrides):
+        values = {"p95_ms": result.p95_ms, "rps": result.rps}
+        values["sql_per_request"] = result.sql_per_request
+        values.update(overrides)
+        return {result.key: values}
+
+    def test_passes_within_tolerance(self):
+        result = make_result()
+        baseline = self.baseline_for(result, p95_ms=result.p95_ms * 0.9)
+
+        assert compare_to_baseline([result], baseline, tolerance=0.2) == []
+
+    def test_flags_latency_regression(self):
+        result = make_result()
+        baseline = self.baseline_for(result, p95_ms=result.p95_ms / 2)
+
+        regressions = compare_to_baseline([result], baseline, tolerance=0.2)
+        assert len(regressions) == 1
+        assert "p95" in regressions[0]
+
+    def test_flags_throughput_regression(self):
+        result = make_result()
+        baseline = self.baseline_for(result, rps=result.rps * 2)
+
+        regressions = compare_to_baseline([result], baseline, tolerance=0.2)
+        assert len(regressions) == 1
+        assert "req/s" in regressions[0]
+
+    def test_any_sql_increase_is_a_regression(self):
+        result = make_result(sql_statements=30)
+        baseline = self.baseline_for(result, sql_per_request=2.0)
+
+        regressions = compare_to_baseline([result], baseline, tolerance=0.5)
+        assert regressions == ["artwork@10: 3.0 SQL statements/request, baseline 2.0"]
+
+    def test_flags_cpu_regression(self):
+        result = summarize("artwork", 10, [0.01] * 10, 0, 0.5, 20, cpu_s=0.04)
+        baseline = self.baseline_for(result, cpu_ms_per_request=2.0)
+
+        regressions = compare_to_baseline([result], baseline, tolerance=0.5)
+        assert regressions == ["artwork@10: 4.0 CPU ms/request exceeds baseline 2.0 CPU ms/request"]
+
+    def test_flags_image_memory_regression(self):
+        result = summarize("artwork", 10, [0.01] * 10, 0, 0.5, 20, peak_image_bytes=30_000_000)
+        baseline = self.baseline_for(result, peak_image_mb=16.0)
+
+        regressions = compare_to_baseline([result], baseline, tolerance=0.5)
+        assert regressions == [
+            "artwork@10: 30.0 MB of images held at once exceeds baseline 16.0 MB"
+        ]
+
+    def test_failed_requests_are_regressions(self):
+        result = make_result(errors=2)
+
+        regressions = compare_to_baseline([result], self.baseline_for(result), tolerance=0.2)
+        assert regressions == ["artwork@10: 2 failed requests"]
+
+    def test_operations_missing_from_baseline_are_skipped(self):
+        assert compare_to_baseline([make_result()], {}, tolerance=0.2) == []
@@ -0,0 +1,163 @@
+"""Tests for recording and replaying upstream calls."""
+
+import json
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app import seed
+from app.ai_service import AIService, StubProvider, create_provider, reset_default_provider
+from app.cassettes import Cassette, CassetteMissError, CassetteProvider, CassetteTransport, cassette
+from app.models import Artwork
+from app.usage import Generation, Usage
+
+JPEG = b"\xff\xd8\xff\xe0" + bytes(64)
+
+
+def image_host(requests: list[str]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(str(request.url))
+        if request.url.path == "/missing.jpg":
+            return httpx.Response(404)
+        return httpx.Response(200, headers={"content-type": "image/jpeg"}, content=JPEG)
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture
+def use_cassette(tmp_path):
+    """Point the process-wide cassette at a temporary directory."""
+
+    def use(mode: str, time_scale: float = 0.0) -> Cassette:
+        cassette.open(tmp_path, mode, time_scale)
+        # The shared provider wraps itself in the cassette of its mode
+        reset_default_provider()
+        return cassette
+
+    yield use
+    cassette.open(tmp_path, "off")
+    reset_default_provider()
+
+
+class TestTransport:
+    """Test recording and replaying HTTP exchanges."""
+
+    async def test_records_then_replays_without_the_network(self, tmp_path):
+        requests = []
+        recorder = Cassette(tmp_path, "record")
+        transport = CassetteTransport(recorder, inner=image_host(requests))
+        async with httpx.AsyncClient(transport=transport) as client:
+            recorded = await client.get("https://images.example.com/a.jpg")
+            missing = await client.get("https://images.example.com/missing.jpg")
+
+        index = json.loads((tmp_path / "index.json").read_text())
+        assert [entry["request"]["url"] for entry in index["entries"]] == [
+            "https://images.example.com/a.jpg",
+            "https://images.example.com/missing.jpg",
+        ]
+        assert len(list((tmp_path / "bodies").iterdir())) == 1
+        assert missing.status_code == 404
+
+        replayer = Cassette(tmp_path, "replay", time_scale=0)
+        async with httpx.AsyncClient(transport=replayer.transport()) as client:
+            replayed = await client.get("https://images.example.com/a.jpg")
+            with pytest.raises(CassetteMissError):
+                await client.get("https://images.example.com/other.jpg")
+
+        assert len(requests) == 2
+        assert replayed.status_code == recorded.status_code
+        assert replayed.content == recorded.content == JPEG
+        assert replayed.headers["content-type"] == "image/jpeg"
+
+    async def test_replay_sleeps_for_the_scaled_recorded_time(self, tmp_path):
+        recorder = Cassette(tmp_path, "record")
+        url = "https://images.example.com/a.jpg"
+        response = {"status": 200, "headers": [], "body": recorder.store_body(JPEG)}
+        recorder.record("http", f"GET {url}", {}, response, elapsed=0.2)
+
+        replayer = Cassette(tmp_path, "replay", time_scale=0.25)
+        started = time.perf_counter()
+        async with httpx.AsyncClient(transport=replayer.transport()) as client:
+            await client.get(url)
+        elapsed = time.perf_counter() - started
+
+        assert 0.05 <= elapsed < 0.2
+
+
+class TestProvider:
+    """Test recording and replaying provider calls."""
+
+    async def test_repeated_calls_replay_in_recorded_order(self, tmp_path):
+        answers = iter(
+            [
+                Generation("First note.", "gemini-test", Usage(300, 40, 340)),
+                Generation("Second note."),
+            ]
+        )
+
+        class Provider:
+            name = "gemini"
+            model = "gemini-test"
+
+            async def generate(self, image_bytes, mime_type, prompt):
+                return next(answers)
+
+        recorder = CassetteProvider(Cassette(tmp_path, "record"), "gemini", Provider)
+        recorded = [await recorder.generate(JPEG, "image/jpeg", "prompt") for _ in range(2)]
+
+        def unavailable():
+            raise AssertionError("the provider was created on replay")
+
+        replayer = CassetteProvider(Cassette(tmp_path, "replay", 0), "gemini", unavailable)
+        replayed = [await replayer.generate(JPEG, "image/jpeg", "prompt") for _ in range(3)]
+
+        assert [generation.text for generation in recorded] == ["First note.", "Second note."]
+        assert replayed == [*recorded, recorded[0]]
+        assert replayed[0].usage == Usage(300, 40, 340)
+        with pytest.raises(CassetteMissError):
+            await replayer.generate(JPEG, "image/jpeg", "another prompt")
+
+    def test_replay_needs_no_api_key(self, use_cassette, monkeypatch):
+        monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+        use_cassette("replay")
+
+        provider = create_provider("gemini")
+
+        assert isinstance(provider, CassetteProvider)
+        assert provider.name == "gemini"
+
+    async def test_ai_service_replays_images_and_notes(self, use_cassette, monkeypatch):
+        monkeypatch.setenv("AI_PROVIDER", "stub")
+        monkeypatch.setenv("AI_STUB_LATENCY", "0")
+        artwork = Artwork(id=1, title="Harbour", image_url="https://images.example.com/1.jpg")
+        requests = []
+
+        use_cassette("record")
+        with patch("app.cassettes.httpx.AsyncHTTPTransport", lambda: image_host(requests)):
+            recorded = await AIService().interpret_artwork(artwork)
+
+        use_cassette("replay")
+        with patch.object(StubProvider, "generate", side_effect=AssertionError("not replayed")):
+            replayed = await AIService().interpret_artwork(artwork)
+
+        assert replayed == recorded
+        assert requests == ["https://images.example.com/1.jpg"]
+
+
+def test_cloudinary_listing_is_replayed(use_cassette):
+    resources = {"resources": [{"public_id": "harbour"}, {"public_id": "hills"}]}
+
+    use_cassette("record")
+    with patch("app.seed.cloudinary.api.resources", return_value=resources) as listing:
+        recorded = seed.fetch_cloudinary_images(max_results=2)
+    listing.assert_called_once_with(type="upload", resource_type="image", max_results=2)
+
+    use_cassette("replay")
+    with patch("app.seed.cloudinary.api.resources", side_effect=AssertionError("called")):
+        replayed = seed.fetch_cloudinary_images(max_results=2)
+        # A different request was never recorded; the seed treats it as no images
+        assert seed.fetch_cloudinary_images(max_results=5) == []
+
+    assert replayed == recorded == resources["resources"]
@@ -0,0 +1,142 @@
+"""Unit tests for the circuit breaker."""
+
+import asyncio
+
+import pytest
+
+from app.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def succeed():
+    return "ok"
+
+
+async def fail():
+    raise RuntimeError("upstream error")
+
+
+def make_breaker(clock, **kwargs):
+    options = {"window_size": 4, "min_calls": 4, "failure_rate_threshold": 0.5}
+    options.update(kwargs)
+    return CircuitBreaker("test", reset_timeout=30.0, clock=clock, **options)
+
+
+async def record_failures(breaker, count):
+    for _ in range(count):
+        with pytest.raises(RuntimeError):
+            await breaker.call(fail)
+
+
+class TestTripping:
+    """Test when the breaker opens."""
+
+    async def test_stays_closed_below_min_calls(self):
+        breaker = make_breaker(FakeClock())
+
+        await record_failures(breaker, 3)
+
+        assert breaker.state == CLOSED
+
+    async def test_opens_on_failure_rate(self):
+        breaker = make_breaker(FakeClock())
+
+        await breaker.call(succeed)
+        await breaker.call(succeed)
+        await record_failures(breaker, 2)
+
+        assert breaker.state == OPEN
+
+    async def test_slow_successes_count_as_failures(self):
+        clock = FakeClock()
+        breaker = make_breaker(clock, slow_call_seconds=1.0)
+
+        async def slow():
+            clock.now += 2.0
+            return "late"
+
+        for _ in range(4):
+            assert await breaker.call(slow) == "late"
+
+        assert breaker.state == OPEN
+
+    async def test_timeout_counts_as_failure(self):
+        breaker = make_breaker(FakeClock(), min_calls=1, window_size=1)
+
+        with pytest.raises(TimeoutError):
+            await breaker.call(asyncio.sleep, 1, timeout=0.01)
+
+        assert breaker.state == OPEN
+
+    async def test_cancellation_is_not_a_failure(self):
+        breaker = make_breaker(FakeClock(), min_calls=1, window_size=1)
+        task = asyncio.create_task(breaker.call(asyncio.sleep, 1))
+        await asyncio.sleep(0)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert breaker.state == CLOSED
+
+
+class TestOpenAndHalfOpen:
+    """Test failing fast and recovery."""
+
+    async def test_open_circuit_rejects_without_calling(self):
+        breaker = make_breaker(FakeClock())
+        await record_failures(breaker, 4)
+        calls = []
+
+        async def tracked():
+            calls.append(1)
+
+        with pytest.raises(CircuitOpenError) as exc_info:
+            await breaker.call(tracked)
+
+        assert calls == []
+        assert exc_info.value.retry_after == pytest.approx(30.0)
+
+    async def test_successful_probe_closes_circuit(self):
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        await record_failures(breaker, 4)
+
+        clock.now += 30.0
+        assert breaker.state == HALF_OPEN
+        assert await breaker.call(succeed) == "ok"
+
+        assert breaker.state == CLOSED
+
+    async def test_failed_probe_reopens_circuit(self):
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        await record_failures(breaker, 4)
+
+        clock.now += 30.0
+        await record_failures(breaker, 1)
+
+        assert breaker.state == OPEN
+
+    async def test_only_one_probe_at_a_time(self):
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        await record_failures(breaker, 4)
+        clock.now += 30.0
+        release = asyncio.Event()
+
+        probe = asyncio.create_task(breaker.call(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(succeed)
+
+        release.set()
+        await probe
+        assert breaker.state == CLOSED
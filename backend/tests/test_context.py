@@ -0,0 +1,101 @@
+"""Tests for the lazy GraphQL request context."""
+
+import logging
+import os
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+os.environ.setdefault("JOB_STORE_PATH", ":memory:")
+
+from app import main
+from app.context import RequestContext
+from app.database import ReadSessionLocal, init_db
+from app.main import app
+from app.schema import schema
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    """Record every session the API creates."""
+    init_db()
+    created = []
+
+    def session_factory():
+        session = ReadSessionLocal()
+        session.close = MagicMock(wraps=session.close)
+        created.append(session)
+        return session
+
+    monkeypatch.setattr(main, "ReadSessionLocal", session_factory)
+    return created
+
+
+def test_entries_are_created_on_first_access():
+    factory = MagicMock(return_value="session")
+    context = RequestContext(values={"request_id": "r1"}, factories={"db": factory})
+
+    assert "db" in context
+    assert set(context) == {"request_id", "db"}
+    factory.assert_not_called()
+
+    assert context["db"] == "session"
+    assert context["db"] == "session"
+    factory.assert_called_once()
+    assert context.created == ["db"]
+
+
+def test_release_closes_the_session_and_a_later_access_opens_a_new_one():
+    first, second = MagicMock(), MagicMock()
+    context = RequestContext(factories={"db": MagicMock(side_effect=[first, second])})
+
+    assert context["db"] is first
+    context.release()
+    first.close.assert_called_once()
+
+    assert context["db"] is second
+    context.close()
+    second.close.assert_called_once()
+    assert context.db_held_ms >= 0
+
+
+def test_typename_query_creates_no_session(sessions):
+    response = client.post("/graphql", json={"query": "{ __typename }"})
+
+    assert response.json() == {"data": {"__typename": "Query"}}
+    assert sessions == []
+
+
+def test_database_query_creates_one_session_and_closes_it(sessions):
+    response = client.post("/graphql", json={"query": "{ collections { id } }"})
+
+    assert "errors" not in response.json()
+    assert len(sessions) == 1
+    sessions[0].close.assert_called()
+
+
+def test_context_metrics_are_logged_at_debug_level(sessions, caplog):
+    caplog.set_level(logging.DEBUG, logger="app.context")
+
+    response = client.post("/graphql", json={"query": "{ collections { id } }"})
+
+    assert "errors" not in response.json()
+    record = next(r for r in caplog.records if r.getMessage() == "Request context")
+    assert record.context_created == ["db"]
+    assert record.db_held_ms >= 0
+
+
+def test_session_is_released_when_the_operation_has_executed():
+    db = MagicMock()
+    db.query.return_value.first.return_value = None
+    context = RequestContext(factories={"db": MagicMock(return_value=db)})
+
+    result = schema.execute_sync("{ artist { id } }", context_value=context)
+
+    assert result.errors is None
+    db.close.assert_called_once()
@@ -0,0 +1,201 @@
+"""Tests for bounded image downloads and the image byte budget."""
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.ai_service import AIService, InterpretationErrorCode, StubProvider
+from app.downloads import (
+    ByteBudget,
+    ImageTooLargeError,
+    NotAnImageError,
+    read_image,
+    sniff_mime_type,
+)
+from app.models import Artwork
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(100)
+JPEG = b"\xff\xd8\xff\xe0" + bytes(100)
+
+
+@pytest.mark.parametrize(
+    ("data", "mime_type"),
+    [
+        (JPEG, "image/jpeg"),
+        (PNG, "image/png"),
+        (b"GIF89a" + bytes(10), "image/gif"),
+        (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "image/webp"),
+        (b"\x00\x00\x00\x1cftypavif\x00\x00\x00\x00", "image/avif"),
+        (b"\x00\x00\x00\x18ftypheic\x00\x00\x00\x00", "image/heic"),
+    ],
+)
+def test_mime_type_is_sniffed_from_magic_bytes(data, mime_type):
+    assert sniff_mime_type(data, "application/octet-stream") == mime_type
+
+
+def test_declared_image_type_is_the_fallback():
+    assert sniff_mime_type(b"unknown", "image/bmp; charset=binary") == "image/bmp"
+    with pytest.raises(NotAnImageError):
+        sniff_mime_type(b"<html>Not found</html>", "text/html")
+    with pytest.raises(NotAnImageError):
+        sniff_mime_type(b"unknown", None)
+
+
+def client_for(respond) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(respond))
+
+
+async def chunks(data: bytes, size: int = 10):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def test_body_is_read_and_its_type_sniffed():
+    budget = ByteBudget(1000)
+
+    async with client_for(lambda request: httpx.Response(200, content=PNG)) as client:
+        async with client.stream("GET", "https://example.com/a.jpg") as response:
+            async with budget.lease() as lease:
+                data, mime_type = await read_image(response, 500, lease)
+                assert lease.size == len(PNG)
+
+    # The header is ignored when the bytes say otherwise
+    assert (data, mime_type) == (PNG, "image/png")
+    assert budget.in_flight == 0
+    assert budget.peak == len(PNG)
+
+
+async def test_declared_oversized_body_is_refused_before_reading():
+    budget = ByteBudget(1000)
+    read = False
+
+    async def body():
+        nonlocal read
+        read = True
+        yield JPEG
+
+    def respond(request):
+        return httpx.Response(200, headers={"content-length": "600"}, content=body())
+
+    async with client_for(respond) as client:
+        async with client.stream("GET", "https://example.com/a.jpg") as response:
+            async with budget.lease() as lease:
+                with pytest.raises(ImageTooLargeError):
+                    await read_image(response, 500, lease)
+
+    assert not read
+    assert budget.peak == 0
+
+
+async def test_undeclared_body_reserves_the_maximum_and_stops_at_it():
+    budget = ByteBudget(1000)
+    data = JPEG + bytes(600)
+
+    async with client_for(lambda request: httpx.Response(200, content=chunks(data))) as client:
+        async with client.stream("GET", "https://example.com/a.jpg") as response:
+            async with budget.lease() as lease:
+                with pytest.raises(ImageTooLargeError) as exc_info:
+                    await read_image(response, 500, lease)
+
+    assert exc_info.value.size <= 510
+    assert budget.peak == 500
+    assert budget.in_flight == 0
+
+
+class TestByteBudget:
+    """Test reserving and releasing bytes across tasks."""
+
+    async def test_reservations_wait_in_order(self):
+        budget = ByteBudget(100)
+        order = []
+
+        async def hold(name, size):
+            async with budget.lease() as lease:
+                await lease.reserve(size)
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(hold("a", 60), hold("b", 60), hold("c", 10))
+
+        # c would fit beside a, but does not overtake b
+        assert order == ["a", "b", "c"]
+        assert budget.peak == 70
+        assert budget.waits == 2
+        assert budget.in_flight == 0
+
+    async def test_reservation_larger_than_the_budget_runs_alone(self):
+        budget = ByteBudget(100)
+
+        async with budget.lease() as lease:
+            await lease.reserve(500)
+            assert budget.in_flight == 100
+
+        assert budget.in_flight == 0
+
+    async def test_cancelled_waiter_gives_up_its_place(self):
+        budget = ByteBudget(100)
+        first = await budget.acquire(80)
+        waiter = asyncio.create_task(budget.acquire(50))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        # The queue is empty again, so a small reservation goes straight through
+        assert await budget.acquire(20) == 20
+        budget.release(first)
+        budget.release(20)
+
+        assert budget.in_flight == 0
+
+
+class TestAIServiceDownloads:
+    """Test the image budget and limits through AIService."""
+
+    def make_artworks(self, count):
+        return [
+            Artwork(id=i, title=f"Artwork {i}", image_url=f"https://example.com/{i}.jpg")
+            for i in range(1, count + 1)
+        ]
+
+    def patch_client(self, respond):
+        client_class = httpx.AsyncClient
+        return patch(
+            "app.ai_service.httpx.AsyncClient",
+            lambda **kwargs: client_class(transport=httpx.MockTransport(respond)),
+        )
+
+    async def test_concurrent_interpretations_hold_at_most_the_budget(self):
+        image = JPEG + bytes(896)
+        budget = ByteBudget(2500)
+
+        with self.patch_client(lambda request: httpx.Response(200, content=image)):
+            service = AIService(provider=StubProvider(latency=0.01), budget=budget)
+            results = await service.interpret_artworks(self.make_artworks(10), max_concurrency=10)
+
+        assert all(isinstance(result, str) for result in results)
+        # Two 1000-byte images fit at a time; the rest waited for earlier notes
+        assert budget.peak == 2000
+        assert budget.waits == 8
+        assert budget.in_flight == 0
+
+    async def test_oversized_image_has_its_own_error_code(self, monkeypatch):
+        monkeypatch.setattr("app.ai_service.IMAGE_MAX_BYTES", 50)
+
+        with self.patch_client(lambda request: httpx.Response(200, content=JPEG)):
+            service = AIService(provider=StubProvider(latency=0), budget=ByteBudget(1000))
+            results = await service.interpret_artworks(self.make_artworks(1))
+
+        assert results[0].code == InterpretationErrorCode.IMAGE_TOO_LARGE
+
+    async def test_non_image_response_fails_the_fetch(self):
+        def respond(request):
+            return httpx.Response(200, headers={"content-type": "text/html"}, content=b"<html>")
+
+        with self.patch_client(respond):
+            service = AIService(provider=StubProvider(latency=0), budget=ByteBudget(1000))
+            results = await service.interpret_artworks(self.make_artworks(1))
+
+        assert results[0].code == InterpretationErrorCode.IMAGE_FETCH_FAILED
@@ -0,0 +1,252 @@
+"""Tests for per-client limits and the AI lane on /graphql."""
+
+import asyncio
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+os.environ.setdefault("JOB_STORE_PATH", ":memory:")
+
+from app.database import init_db
+from app.fair_use import (
+    FairUse,
+    Lane,
+    LaneFullError,
+    RateLimited,
+    SlidingWindowLimiter,
+    operation_calls,
+    operation_fields,
+)
+from app.graphql_router import GalleryGraphQLRouter
+from app.main import get_context
+from app.operations import GET_ARTIST
+from app.schema import schema
+
+INTERPRET = '{ generateArtworkInterpretation(artworkId: "missing") { content } }'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def limiter(limit: int, clock: FakeClock) -> SlidingWindowLimiter:
+    return SlidingWindowLimiter(lambda name: limit, window_seconds=10, clock=clock)
+
+
+class TestSlidingWindowLimiter:
+    """Test the sliding-window counters."""
+
+    def test_allows_up_to_the_limit_then_asks_to_wait(self):
+        clock = FakeClock()
+        limits = limiter(3, clock)
+
+        assert [limits.hit("a", ["field"]) for _ in range(3)] == [None, None, None]
+        retry_after = limits.hit("a", ["field"])
+
+        # The next window, until the three calls' weight drops to two
+        assert retry_after == pytest.approx(10 + 10 / 3)
+        clock.now += retry_after - 0.1
+        assert limits.hit("a", ["field"]) is not None
+        clock.now += 0.1
+        assert limits.hit("a", ["field"]) is None
+
+    def test_previous_window_slides_out_gradually(self):
+        clock = FakeClock()
+        limits = limiter(4, clock)
+        for _ in range(4):
+            limits.hit("a", ["field"])
+
+        # Halfway into the next window half of the previous count remains
+        clock.now += 15
+        assert limits.hit("a", ["field"]) is None
+        assert limits.hit("a", ["field"]) is None
+        retry_after = limits.hit("a", ["field"])
+
+        assert retry_after == pytest.approx(2.5)
+        clock.now += retry_after
+        assert limits.hit("a", ["field"]) is None
+
+    def test_clients_and_names_are_counted_separately(self):
+        clock = FakeClock()
+        limits = limiter(1, clock)
+
+        assert limits.hit("a", ["one"]) is None
+        assert limits.hit("b", ["one"]) is None
+        assert limits.hit("a", ["two"]) is None
+        assert limits.hit("a", ["one", "three"]) is not None
+        # Nothing was counted for the rejected request
+        assert limits.hit("a", ["three"]) is None
+
+    def test_zero_disables_the_limit(self):
+        limits = limiter(0, FakeClock())
+
+        assert all(limits.hit("a", ["field"]) is None for _ in range(100))
+
+    def test_idle_keys_are_pruned(self):
+        clock = FakeClock()
+        limits = limiter(5, clock)
+        limits.hit("a", ["field"])
+
+        clock.now += 30
+        limits.hit("b", ["field"])
+
+        assert len(limits) == 1
+
+
+def test_operation_fields_follow_fragments_and_operation_names():
+    query = """
+    query Gallery { ...Top artist { name } }
+    query Ai { generateArtworkInterpretation(artworkId: "1") { content } }
+    fragment Top on Query {
+      collections { id }
+      ... on Query { aliased: search(query: "x") { total } }
+    }
+    """
+
+    assert operation_fields(query, "Gallery") == {"collections", "search", "artist"}
+    assert operation_fields(query, "Ai") == {"generateArtworkInterpretation"}
+    assert operation_fields("{ not valid", None) == frozenset()
+
+
+def test_operation_calls_count_aliases_and_batch_ids():
+    aliased = """
+    {
+      a: generateArtworkInterpretation(artworkId: "1") { content }
+      b: generateArtworkInterpretation(artworkId: "2") { content }
+      a: generateArtworkInterpretation(artworkId: "1") { content }
+    }
+    """
+    batch = """
+    query Batch($ids: [String!]!) {
+      generateArtworkInterpretations(artworkIds: $ids) { artworkId }
+      collections { id }
+    }
+    """
+
+    # Fields sharing a response key are merged and run once
+    assert operation_calls(aliased, None) == ["generateArtworkInterpretation"] * 2
+    assert sorted(operation_calls(batch, None, {"ids": ["1", "2", "3", "1"]})) == [
+        "collections",
+        *["generateArtworkInterpretations"] * 3,
+    ]
+
+
+async def test_lane_queues_then_rejects():
+    lane = Lane(concurrency=1, queue=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with lane.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    assert lane.waiting == 1
+    with pytest.raises(LaneFullError):
+        async with lane.slot():
+            pass
+    release.set()
+    await asyncio.gather(holder, waiter)
+    assert lane.waiting == 0
+
+
+async def test_reads_are_admitted_while_the_ai_lane_is_full():
+    fair_use = FairUse(ai_concurrency=1, ai_queue=0)
+
+    async with fair_use.admit("a", frozenset({"generateArtworkInterpretation"})):
+        async with fair_use.admit("b", frozenset({"collections"})):
+            pass
+        with pytest.raises(RateLimited) as rejected:
+            async with fair_use.admit("b", frozenset({"artworkInterpretation"})):
+                pass
+
+    assert rejected.value.headers == {"Retry-After": "5"}
+
+
+async def test_requests_turned_away_by_a_full_lane_keep_their_quota():
+    fair_use = FairUse(ai_limit=1, ai_concurrency=1, ai_queue=0)
+    fields = frozenset({"generateArtworkInterpretation"})
+
+    async with fair_use.admit("a", fields):
+        with pytest.raises(RateLimited):
+            async with fair_use.admit("b", fields):
+                pass
+
+    # The 429 above did not use up b's one call
+    async with fair_use.admit("b", fields):
+        pass
+
+
+@pytest.fixture
+def client():
+    init_db()
+    app = FastAPI()
+    router = GalleryGraphQLRouter(
+        schema,
+        context_getter=get_context,
+        fair_use=FairUse(ai_limit=1, read_limit=2, window_seconds=60),
+    )
+    app.include_router(router, prefix="/graphql")
+    return TestClient(app)
+
+
+def test_requests_over_the_limit_get_429_with_retry_after(client):
+    responses = [client.post("/graphql", json={"query": GET_ARTIST}) for _ in range(3)]
+
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    # Two windows at most: the previous window's calls fade out over the next
+    assert 60 < int(responses[2].headers["Retry-After"]) <= 120
+
+
+def test_ai_fields_have_their_own_lower_limit(client):
+    first = client.post("/graphql", json={"query": INTERPRET})
+    second = client.post("/graphql", json={"query": INTERPRET})
+    read = client.post("/graphql", json={"query": GET_ARTIST})
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert "Retry-After" in second.headers
+    assert read.status_code == 200
+
+
+def test_aliased_ai_fields_count_against_the_limit(client):
+    aliased = """
+    {
+      a: generateArtworkInterpretation(artworkId: "missing") { content }
+      b: generateArtworkInterpretation(artworkId: "missing") { content }
+    }
+    """
+
+    response = client.post("/graphql", json={"query": aliased})
+
+    # Two calls in one request are over the AI limit of one
+    assert response.status_code == 400
+    assert client.post("/graphql", json={"query": INTERPRET}).status_code == 200
+
+
+def test_batch_counts_each_artwork_against_the_limit():
+    fair_use = FairUse(ai_limit=3, window_seconds=60)
+    batch = """
+    query Batch($ids: [String!]!) {
+      generateArtworkInterpretations(artworkIds: $ids) { artworkId }
+    }
+    """
+
+    async def admit(ids):
+        async with fair_use.admit("a", operation_calls(batch, None, {"ids": ids})):
+            pass
+
+    asyncio.run(admit(["1", "2"]))
+    with pytest.raises(RateLimited):
+        asyncio.run(admit(["3", "4"]))
+    asyncio.run(admit(["5"]))
@@ -0,0 +1,130 @@
+"""Tests for gallery responses spliced from pre-serialized fragments."""
+
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+os.environ.setdefault("JOB_STORE_PATH", ":memory:")
+
+from app import main
+from app import schema as schema_module
+from app.database import SessionLocal, init_db
+from app.fragments import fragment_cache
+from app.models import AIInterpretation, Artist, Artwork, Collection
+from app.operations import GET_ARTIST, GET_COLLECTIONS
+from app.read_model import ReadModel
+
+
+@pytest.fixture
+def db():
+    """A gallery whose text needs escaping, and a collection without description."""
+    init_db()
+    session = SessionLocal()
+    session.query(AIInterpretation).delete()
+    session.query(Artwork).delete()
+    session.query(Collection).delete()
+    session.query(Artist).delete()
+
+    artist = Artist(name='Jérôme "Quoted" Artist', bio="Line one\nLine two — ירושלים")
+    session.add(artist)
+    session.flush()
+    harbours = Collection(title="Harbours", description="By the sea", artist_id=artist.id)
+    hills = Collection(title="Hills", description=None, artist_id=artist.id)
+    session.add_all([harbours, hills])
+    session.flush()
+    session.add_all(
+        Artwork(
+            title=f"Étude {index}",
+            image_url=f"https://example.com/{index}.jpg",
+            artist_id=artist.id,
+            collection_id=(harbours if index % 2 else hills).id,
+        )
+        for index in range(1, 6)
+    )
+    session.commit()
+    fragment_cache.clear()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    def with_read_model(enabled: bool) -> TestClient:
+        monkeypatch.setattr(main, "READ_MODEL_ENABLED", enabled)
+        monkeypatch.setattr(main, "read_model", ReadModel(check_seconds=0))
+        return TestClient(main.app)
+
+    return with_read_model
+
+
+def post(client: TestClient, query: str, **payload) -> bytes:
+    response = client.post("/graphql", json={"query": query, **payload})
+    assert response.status_code == 200
+    return response.content
+
+
+@pytest.mark.parametrize("query", [GET_COLLECTIONS, GET_ARTIST])
+def test_spliced_response_matches_execution(db, client, query):
+    executed = post(client(False), query)
+
+    spliced = post(client(True), query)
+
+    assert len(fragment_cache) > 0
+    assert spliced == executed
+    assert json.loads(spliced)["data"]
+
+
+def test_fragments_are_reused_without_execution(db, client, monkeypatch):
+    http = client(True)
+    first = post(http, GET_COLLECTIONS)
+    cached = len(fragment_cache)
+
+    def fail(*_args):
+        raise AssertionError("operation was executed")
+
+    monkeypatch.setattr(schema_module.Artwork, "from_model", fail)
+    second = post(http, GET_COLLECTIONS)
+
+    assert second == first
+    assert len(fragment_cache) == cached
+
+
+def test_gallery_write_replaces_fragments(db, client):
+    http = client(True)
+    post(http, GET_COLLECTIONS)
+    cached = len(fragment_cache)
+
+    db.query(Artwork).filter_by(title="Étude 1").update({"title": "Renamed"})
+    db.commit()
+    body = json.loads(post(http, GET_COLLECTIONS))
+
+    titles = [a["title"] for c in body["data"]["collections"] for a in c["artworks"]]
+    assert "Renamed" in titles and "Étude 1" not in titles
+    # Fragments of the previous generation were dropped
+    assert len(fragment_cache) == cached
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"query": GET_COLLECTIONS, "operationName": "Other"},
+        {"query": GET_COLLECTIONS.replace("description", ""), "operationName": None},
+        {"query": GET_ARTIST.replace("GetArtist", "GetArtist($x: Int)"), "variables": {"x": 1}},
+    ],
+)
+def test_other_requests_are_executed(db, client, payload):
+    client(True).post("/graphql", json=payload)
+
+    assert len(fragment_cache) == 0
+
+
+def test_without_read_model_requests_are_executed(db, client):
+    post(client(False), GET_COLLECTIONS)
+
+    assert len(fragment_cache) == 0
@@ -1,6 +1,14 @@
+import os
+import time
+
 from fastapi.testclient import TestClient
 
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+os.environ.setdefault("JOB_STORE_PATH", ":memory:")
+
 from app.main import app
+from app.warmup import readiness
 
 client = TestClient(app)
 
@@ -10,3 +18,28 @@ def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_ready_reports_unavailable_before_warmup():
+    """/ready answers 503 until warmup has run."""
+    readiness.reset()
+
+    response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "pending"
+
+
+def test_ready_after_startup_warmup():
+    """The lifespan warms up in the background and /ready then reports ready."""
+    with TestClient(app) as started:
+        for _ in range(100):
+            response = started.get("/ready")
+            if response.status_code == 200:
+                break
+            time.sleep(0.05)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert set(body["steps_ms"]) == {"pool_connections", "gallery_query", "interpretations"}
@@ -0,0 +1,260 @@
+"""Tests for the self-hosted image proxy."""
+
+import asyncio
+import hashlib
+import io
+import os
+import struct
+import zlib
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+
+from app import images
+from app.database import SessionLocal, init_db
+from app.images import ImageProxy, render, router, source_version
+from app.models import AIInterpretation, Artist, Artwork, Collection
+
+IMAGE_URL = "https://images.example.com/harbour.jpg"
+
+
+def jpeg_bytes(size: tuple[int, int]) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 120, 40)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def image_host():
+    """Fake image host; ``requests`` lists the URLs it served."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(str(request.url))
+        if request.url.path.endswith("missing.jpg"):
+            return httpx.Response(404)
+        return httpx.Response(200, content=jpeg_bytes((2000, 1000)))
+
+    transport = httpx.MockTransport(handler)
+    transport.requests = requests
+    return transport
+
+
+@pytest.fixture(scope="module")
+def proxy_workers():
+    """One spawned worker process shared by this module's tests."""
+    proxy = ImageProxy(workers=1)
+    proxy.start()
+    yield proxy._get_executor()
+    proxy.stop()
+
+
+@pytest.fixture
+def proxy(tmp_path, image_host, proxy_workers, monkeypatch):
+    proxy = ImageProxy(cache_dir=tmp_path, workers=1, transport=image_host)
+    proxy._executor = proxy_workers
+    monkeypatch.setattr(images, "image_proxy", proxy)
+    return proxy
+
+
+@pytest.fixture
+def artwork_ids():
+    """Artworks with an available and a missing original."""
+    init_db()
+    db = SessionLocal()
+    try:
+        db.query(AIInterpretation).delete()
+        db.query(Artwork).delete()
+        db.query(Collection).delete()
+        db.query(Artist).delete()
+        artist = Artist(name="Test Artist", bio="Paints outdoors.")
+        db.add(artist)
+        db.flush()
+        available = Artwork(title="Harbour", image_url=IMAGE_URL, artist_id=artist.id)
+        missing = Artwork(
+            title="Lost",
+            image_url="https://images.example.com/missing.jpg",
+            artist_id=artist.id,
+        )
+        db.add_all([available, missing])
+        db.commit()
+        return available.id, missing.id
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client(proxy):
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_render_resizes_and_encodes(tmp_path):
+    original = tmp_path / "original.jpg"
+    original.write_bytes(jpeg_bytes((2000, 1000)))
+    destination = tmp_path / "out.webp"
+
+    render(str(original), str(destination), 640, "webp")
+
+    with Image.open(destination) as result:
+        assert result.format == "WEBP"
+        assert result.size == (640, 320)
+
+
+def test_render_never_upscales(tmp_path):
+    original = tmp_path / "original.jpg"
+    original.write_bytes(jpeg_bytes((300, 200)))
+    destination = tmp_path / "out.avif"
+
+    render(str(original), str(destination), 1200, "avif")
+
+    with Image.open(destination) as result:
+        assert result.format == "AVIF"
+        assert result.size == (300, 200)
+
+
+def test_serves_and_caches_renditions(client, proxy, image_host, artwork_ids):
+    artwork_id, _ = artwork_ids
+
+    first = client.get(f"/images/{artwork_id}/640.webp")
+    second = client.get(f"/images/{artwork_id}/640.webp")
+
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "image/webp"
+    assert first.headers["cache-control"] == images.REVALIDATE_CACHE_CONTROL
+    assert second.content == first.content
+    assert image_host.requests == [IMAGE_URL]
+    with Image.open(io.BytesIO(first.content)) as result:
+        assert result.size == (640, 320)
+
+
+def test_versioned_urls_are_immutable(client, artwork_ids):
+    artwork_id, _ = artwork_ids
+
+    version = source_version(hashlib.sha256(jpeg_bytes((2000, 1000))).hexdigest())
+
+    response = client.get(f"/images/{artwork_id}/320.avif?v={version}")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == images.IMMUTABLE_CACHE_CONTROL
+
+
+def test_matching_etag_returns_not_modified(client, artwork_ids):
+    artwork_id, _ = artwork_ids
+    etag = client.get(f"/images/{artwork_id}/320.webp").headers["etag"]
+
+    response = client.get(f"/images/{artwork_id}/320.webp", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+@pytest.mark.parametrize(
+    "path", ["/images/{id}/500.webp", "/images/{id}/640.gif", "/images/0/640.webp"]
+)
+def test_unknown_sizes_formats_and_artworks_are_not_found(client, artwork_ids, path):
+    response = client.get(path.format(id=artwork_ids[0]))
+
+    assert response.status_code == 404
+
+
+def test_unavailable_original_is_a_bad_gateway(client, artwork_ids):
+    _, missing_id = artwork_ids
+
+    response = client.get(f"/images/{missing_id}/640.webp")
+
+    assert response.status_code == 502
+
+
+def test_oversized_original_is_a_bad_gateway(client, proxy, artwork_ids, monkeypatch):
+    monkeypatch.setattr(images, "IMAGE_MAX_BYTES", 1024)
+    artwork_id, _ = artwork_ids
+
+    response = client.get(f"/images/{artwork_id}/640.webp")
+
+    assert response.status_code == 502
+    assert not (proxy.cache_dir / "originals").exists()
+
+
+def test_changed_original_is_picked_up_on_revalidation(tmp_path, proxy_workers, monkeypatch):
+    """Unchanged originals are confirmed by ETag; a new image gets new renditions."""
+    host = {"color": (200, 120, 40), "conditional": []}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        etag = f'"{host["color"]}"'
+        host["conditional"].append(request.headers.get("if-none-match") == etag)
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        buffer = io.BytesIO()
+        Image.new("RGB", (400, 200), host["color"]).save(buffer, format="JPEG")
+        return httpx.Response(200, content=buffer.getvalue(), headers={"ETag": etag})
+
+    proxy = ImageProxy(cache_dir=tmp_path, workers=1, transport=httpx.MockTransport(handler))
+    proxy._executor = proxy_workers
+    monkeypatch.setattr(images, "IMAGE_REVALIDATE_SECONDS", 0)
+
+    async def rendition():
+        return await proxy.rendition(IMAGE_URL, 320, "webp")
+
+    first = asyncio.run(rendition())
+    unchanged = asyncio.run(rendition())
+    host["color"] = (20, 40, 200)
+    changed = asyncio.run(rendition())
+
+    assert host["conditional"] == [False, True, False]
+    assert unchanged == first
+    assert changed != first
+    with Image.open(changed) as result:
+        assert result.convert("RGB").getpixel((10, 10))[2] > 150
+
+
+def png_header(width: int, height: int) -> bytes:
+    """A PNG that declares its size but holds no pixel data."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        crc = zlib.crc32(kind + data)
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IEND", b"")
+
+
+def test_decompression_bomb_is_a_bad_gateway(tmp_path, proxy_workers, artwork_ids, monkeypatch):
+    """An original with too many pixels to decode is refused, not a 500."""
+    bomb = httpx.MockTransport(
+        lambda request: httpx.Response(200, content=png_header(20000, 20000))
+    )
+    proxy = ImageProxy(cache_dir=tmp_path, workers=1, transport=bomb)
+    proxy._executor = proxy_workers
+    monkeypatch.setattr(images, "image_proxy", proxy)
+    app = FastAPI()
+    app.include_router(router)
+
+    response = TestClient(app).get(f"/images/{artwork_ids[0]}/640.webp")
+
+    assert response.status_code == 502
+
+
+async def test_concurrent_requests_share_one_download(proxy, image_host):
+    paths = await asyncio.gather(
+        *(proxy.rendition(IMAGE_URL, width, "webp") for width in (320, 640))
+    )
+
+    assert image_host.requests == [IMAGE_URL]
+    assert all(path.exists() for path in paths)
+
+
+async def test_stored_source_records_are_preloaded(tmp_path, proxy, image_host):
+    await proxy.source(IMAGE_URL)
+    restarted = ImageProxy(cache_dir=tmp_path, workers=1, transport=image_host)
+
+    assert restarted.load_sources([IMAGE_URL, "https://images.example.com/new.jpg"]) == 1
+    await restarted.source(IMAGE_URL)
+    assert image_host.requests == [IMAGE_URL]
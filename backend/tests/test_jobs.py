@@ -0,0 +1,432 @@
+"""Tests for the background interpretation job queue."""
+
+import asyncio
+import os
+import sqlite3
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+os.environ["JOB_STORE_PATH"] = ":memory:"
+
+from app.ai_service import InterpretationError, InterpretationErrorCode
+from app.database import SessionLocal, init_db
+from app.interpretation_cache import interpretation_cache
+from app.jobs import JobQueue, JobStatus, JobStore, get_job_queue
+from app.main import app
+from app.models import AIInterpretation, Artist, Artwork, Collection
+from app.prompts import get_prompt
+from app.schema import schema
+
+
+@pytest.fixture
+def artwork_ids():
+    """Two artworks in the test database."""
+    init_db()
+    interpretation_cache.clear()
+    db = SessionLocal()
+    try:
+        db.query(AIInterpretation).delete()
+        db.query(Artwork).delete()
+        db.query(Collection).delete()
+        db.query(Artist).delete()
+
+        artist = Artist(name="Test Artist", bio="Paints outdoors.")
+        collection = Collection(title="Test Collection", description=None)
+        db.add_all([artist, collection])
+        db.flush()
+        artworks = [
+            Artwork(
+                title=f"Test Artwork {index}",
+                image_url=f"https://example.com/{index}.jpg",
+                artist_id=artist.id,
+                collection_id=collection.id,
+            )
+            for index in (1, 2)
+        ]
+        db.add_all(artworks)
+        db.commit()
+        return [artwork.id for artwork in artworks]
+    finally:
+        db.close()
+
+
+def make_ai_service(result="A queued note."):
+    ai_service = MagicMock()
+    ai_service.prompt = get_prompt()
+    if isinstance(result, Exception):
+        ai_service.interpret_artwork = AsyncMock(side_effect=result)
+    else:
+        ai_service.interpret_artwork = AsyncMock(return_value=result)
+    return ai_service
+
+
+class TestJobStore:
+    """Test job persistence."""
+
+    def test_deduplicates_active_jobs(self):
+        """An active job with the same key is returned instead of a new one."""
+        store = JobStore(":memory:")
+
+        first, created = store.create(1, "1:abc")
+        second, created_again = store.create(1, "1:abc")
+        other, _ = store.create(2, "2:abc")
+
+        assert created and not created_again
+        assert second.id == first.id
+        assert other.id != first.id
+
+    def test_finished_jobs_do_not_block_new_ones(self):
+        """Once a job finishes, the same artwork can be queued again."""
+        store = JobStore(":memory:")
+        first, _ = store.create(1, "1:abc")
+        store.mark_succeeded(first.id, "Done.")
+
+        second, created = store.create(1, "1:abc")
+
+        assert created
+        assert second.id != first.id
+
+    def test_requeues_only_jobs_whose_lease_expired(self):
+        """Jobs a live worker is running stay running; abandoned ones are queued again."""
+        store = JobStore(":memory:")
+        abandoned, _ = store.create(1, "1:abc")
+        store.claim(abandoned.id, "stopped-worker", timedelta(seconds=-1))
+        in_hand, _ = store.create(2, "2:abc")
+        store.claim(in_hand.id, "sibling-worker", timedelta(minutes=1))
+        queued, _ = store.create(3, "3:abc")
+
+        requeued = store.requeue_expired()
+
+        assert [job.id for job in requeued] == [abandoned.id]
+        assert store.get(in_hand.id).status == JobStatus.RUNNING
+        assert [job.id for job in store.queued()] == [abandoned.id, queued.id]
+
+    def test_renewing_extends_the_owners_leases(self):
+        store = JobStore(":memory:")
+        job, _ = store.create(1, "1:abc")
+        store.claim(job.id, "worker", timedelta(seconds=-1))
+
+        assert store.renew("other-worker", timedelta(minutes=1)) == 0
+        assert store.renew("worker", timedelta(minutes=1)) == 1
+        assert store.requeue_expired() == []
+
+    def test_adds_lease_columns_to_an_existing_store(self, tmp_path):
+        """Job stores created before leases keep working, and their running jobs resume."""
+        path = str(tmp_path / "jobs.db")
+        connection = sqlite3.connect(path)
+        connection.executescript(
+            "CREATE TABLE interpretation_jobs (id TEXT PRIMARY KEY, artwork_id INTEGER NOT NULL, "
+            "dedup_key TEXT NOT NULL, status TEXT NOT NULL, content TEXT, error_code TEXT, "
+            "created_at TEXT NOT NULL, updated_at TEXT NOT NULL);"
+            "INSERT INTO interpretation_jobs VALUES ('old', 1, '1:abc', 'running', NULL, NULL, "
+            "'2026-01-01T00:00:00+00:00', '2026-01-01T00:00:00+00:00');"
+        )
+        connection.close()
+
+        store = JobStore(path)
+
+        assert [job.id for job in store.requeue_expired()] == ["old"]
+        store.close()
+
+    def test_claim_runs_each_job_once(self, tmp_path):
+        """Only the first claim on a queued job wins, even from another process's store."""
+        path = str(tmp_path / "jobs.db")
+        store, other_store = JobStore(path), JobStore(path)
+        job, _ = store.create(1, "1:abc")
+
+        claimed = store.claim(job.id, "worker", timedelta(minutes=1))
+
+        assert claimed.status == JobStatus.RUNNING
+        assert other_store.claim(job.id, "other-worker", timedelta(minutes=1)) is None
+        store.close()
+        other_store.close()
+
+    def test_purges_old_finished_jobs(self):
+        """Finished jobs past retention are deleted; active jobs are kept."""
+        store = JobStore(":memory:")
+        finished, _ = store.create(1, "1:abc")
+        store.mark_failed(finished.id, InterpretationErrorCode.TIMEOUT)
+        active, _ = store.create(2, "2:abc")
+
+        assert store.purge_finished(timedelta(seconds=-1)) == 1
+        assert store.get(finished.id) is None
+        assert store.get(active.id) is not None
+
+
+class TestJobQueue:
+    """Test the worker pool."""
+
+    async def test_runs_job_and_caches_result(self, artwork_ids):
+        """A queued job succeeds and its text becomes the artwork's fallback."""
+        queue = JobQueue(JobStore(":memory:"), make_ai_service("A queued note."))
+        await queue.start()
+        try:
+            job = queue.enqueue(artwork_ids[0])
+            finished = await queue.wait(job.id, timeout=5)
+        finally:
+            await queue.stop()
+
+        assert finished.status == JobStatus.SUCCEEDED
+        assert finished.content == "A queued note."
+        assert interpretation_cache.get(artwork_ids[0]).content == "A queued note."
+
+    async def test_records_error_code_on_failure(self, artwork_ids):
+        """Generation failures are stored with their error code."""
+        error = InterpretationError("Slow", InterpretationErrorCode.TIMEOUT)
+        queue = JobQueue(JobStore(":memory:"), make_ai_service(error))
+        await queue.start()
+        try:
+            job = queue.enqueue(artwork_ids[0])
+            finished = await queue.wait(job.id, timeout=5)
+        finally:
+            await queue.stop()
+
+        assert finished.status == JobStatus.FAILED
+        assert finished.error_code == InterpretationErrorCode.TIMEOUT
+
+    async def test_missing_artwork_fails_job(self, artwork_ids):
+        """A job for a deleted artwork fails with ARTWORK_NOT_FOUND."""
+        queue = JobQueue(JobStore(":memory:"), make_ai_service())
+        await queue.start()
+        try:
+            job = queue.enqueue(9999)
+            finished = await queue.wait(job.id, timeout=5)
+        finally:
+            await queue.stop()
+
+        assert finished.error_code == InterpretationErrorCode.ARTWORK_NOT_FOUND
+
+    async def test_limits_concurrent_generations(self, artwork_ids):
+        """No more jobs run at once than there are workers."""
+        in_flight = 0
+        peak = 0
+
+        async def interpret(artwork):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return "Done."
+
+        ai_service = make_ai_service()
+        ai_service.interpret_artwork = AsyncMock(side_effect=interpret)
+        store = JobStore(":memory:")
+        queue = JobQueue(store, ai_service, concurrency=2)
+        # Distinct dedup keys so every job runs
+        jobs = [store.create(artwork_ids[index % 2], f"key-{index}")[0] for index in range(6)]
+
+        await queue.start()
+        try:
+            for job in jobs:
+                await queue.wait(job.id, timeout=5)
+        finally:
+            await queue.stop()
+
+        assert ai_service.interpret_artwork.call_count == 6
+        assert peak == 2
+
+    async def test_watch_reports_each_status_change(self, artwork_ids):
+        """Watchers see queued, running and the final status in order."""
+        release = asyncio.Event()
+
+        async def interpret(artwork):
+            await release.wait()
+            return "Done."
+
+        ai_service = make_ai_service()
+        ai_service.interpret_artwork = AsyncMock(side_effect=interpret)
+        queue = JobQueue(JobStore(":memory:"), ai_service)
+        job = queue.enqueue(artwork_ids[0])
+
+        statuses = []
+
+        async def watch():
+            async for update in queue.watch(job.id):
+                statuses.append(update.status)
+                if update.status == JobStatus.RUNNING:
+                    release.set()
+
+        watcher = asyncio.create_task(watch())
+        await asyncio.sleep(0)
+        await queue.start()
+        try:
+            await asyncio.wait_for(watcher, timeout=5)
+        finally:
+            await queue.stop()
+
+        assert statuses == [JobStatus.QUEUED, JobStatus.RUNNING, JobStatus.SUCCEEDED]
+
+    async def test_watchers_leave_nothing_behind(self, artwork_ids):
+        """A subscriber that disconnects early drops its wake-up event."""
+        queue = JobQueue(JobStore(":memory:"), make_ai_service())
+        job = queue.enqueue(artwork_ids[0])
+
+        updates = queue.watch(job.id)
+        assert (await anext(updates)).status == JobStatus.QUEUED
+        assert job.id in queue._watchers
+        await updates.aclose()
+
+        assert queue._watchers == {}
+
+    async def test_running_jobs_keep_their_lease(self, artwork_ids, tmp_path):
+        """A sibling worker does not take over a job that outlives its first lease."""
+        release = asyncio.Event()
+
+        async def interpret(artwork):
+            await release.wait()
+            return "Done."
+
+        ai_service = make_ai_service()
+        ai_service.interpret_artwork = AsyncMock(side_effect=interpret)
+        path = str(tmp_path / "jobs.db")
+        queue = JobQueue(JobStore(path), ai_service, lease_seconds=0.15)
+        sibling = JobStore(path)
+        job = queue.enqueue(artwork_ids[0])
+
+        await queue.start()
+        try:
+            await asyncio.sleep(0.4)
+            assert sibling.requeue_expired() == []
+            release.set()
+            finished = await queue.wait(job.id, timeout=5)
+        finally:
+            await queue.stop()
+            sibling.close()
+
+        assert finished.status == JobStatus.SUCCEEDED
+        assert ai_service.interpret_artwork.call_count == 1
+
+    async def test_takes_over_jobs_abandoned_by_another_worker(self, artwork_ids, tmp_path):
+        path = str(tmp_path / "jobs.db")
+        other = JobStore(path)
+        job, _ = other.create(artwork_ids[0], "abandoned")
+        other.claim(job.id, "hung-worker", timedelta(seconds=0.1))
+        queue = JobQueue(JobStore(path), make_ai_service("Recovered."), lease_seconds=0.15)
+
+        await queue.start()
+        try:
+            # Not expired at start; picked up by a later lease round
+            finished = await queue.wait(job.id, timeout=5)
+        finally:
+            await queue.stop()
+            other.close()
+
+        assert finished.content == "Recovered."
+
+    async def test_watch_sees_jobs_run_by_another_worker(self, artwork_ids, tmp_path, monkeypatch):
+        """Subscribers on one process follow a job another process runs."""
+        monkeypatch.setattr("app.jobs.WATCH_POLL_SECONDS", 0.01)
+        path = str(tmp_path / "jobs.db")
+        watching = JobQueue(JobStore(path), make_ai_service())
+        running = JobQueue(JobStore(path), make_ai_service("Elsewhere."))
+        job = watching.enqueue(artwork_ids[0])
+
+        await running.start()
+        try:
+            finished = await watching.wait(job.id, timeout=5)
+        finally:
+            await running.stop()
+
+        assert finished.content == "Elsewhere."
+
+
+class TestJobMutation:
+    """Test enqueueing and polling over GraphQL."""
+
+    ENQUEUE = """
+        mutation Enqueue($artworkId: String!) {
+            enqueueArtworkInterpretation(artworkId: $artworkId) {
+                id
+                status
+            }
+        }
+    """
+    POLL = """
+        query Poll($id: String!) {
+            interpretationJob(id: $id) {
+                status
+                errorCode
+                interpretation {
+                    content
+                    context
+                }
+            }
+        }
+    """
+
+    def test_enqueue_then_poll_for_result(self, artwork_ids, monkeypatch):
+        """The mutation returns a job ID whose result can be polled."""
+        monkeypatch.setattr(get_job_queue(), "_store", JobStore(":memory:"))
+        monkeypatch.setattr(get_job_queue(), "ai_service", make_ai_service("Polled note."))
+        artwork_id = str(artwork_ids[0])
+
+        with TestClient(app) as client:
+            response = client.post(
+                "/graphql", json={"query": self.ENQUEUE, "variables": {"artworkId": artwork_id}}
+            )
+            job = response.json()["data"]["enqueueArtworkInterpretation"]
+            assert job["status"] == "QUEUED"
+
+            client.portal.call(get_job_queue().wait, job["id"], 5)
+            response = client.post(
+                "/graphql", json={"query": self.POLL, "variables": {"id": job["id"]}}
+            )
+
+        result = response.json()["data"]["interpretationJob"]
+        assert result["status"] == "SUCCEEDED"
+        assert result["errorCode"] is None
+        assert result["interpretation"] == {
+            "content": "Polled note.",
+            "context": f"artwork:{artwork_id}",
+        }
+
+    def test_enqueueing_twice_returns_same_job(self, artwork_ids, monkeypatch):
+        """A second request for an artwork with an active job is deduplicated."""
+        monkeypatch.setattr(get_job_queue(), "_store", JobStore(":memory:"))
+        monkeypatch.setattr(get_job_queue(), "ai_service", make_ai_service())
+        variables = {"artworkId": str(artwork_ids[0])}
+
+        # Without the lifespan no workers run, so the first job stays queued
+        client = TestClient(app)
+        first = client.post("/graphql", json={"query": self.ENQUEUE, "variables": variables})
+        second = client.post("/graphql", json={"query": self.ENQUEUE, "variables": variables})
+
+        first_id = first.json()["data"]["enqueueArtworkInterpretation"]["id"]
+        assert second.json()["data"]["enqueueArtworkInterpretation"]["id"] == first_id
+
+    def test_enqueue_unknown_artwork_returns_null(self, artwork_ids, monkeypatch):
+        """Unknown artworks are not queued."""
+        monkeypatch.setattr(get_job_queue(), "_store", JobStore(":memory:"))
+        client = TestClient(app)
+
+        response = client.post(
+            "/graphql", json={"query": self.ENQUEUE, "variables": {"artworkId": "9999"}}
+        )
+
+        assert response.json()["data"]["enqueueArtworkInterpretation"] is None
+
+    async def test_subscription_streams_until_finished(self, artwork_ids):
+        """Subscribers receive every status change of the job."""
+        queue = JobQueue(JobStore(":memory:"), make_ai_service("Streamed note."))
+        job = queue.enqueue(artwork_ids[0])
+        db = SessionLocal()
+        await queue.start()
+        try:
+            updates = await schema.subscribe(
+                "subscription Watch($id: String!) { interpretationJob(id: $id) { status } }",
+                variable_values={"id": job.id},
+                context_value={"db": db, "job_queue": queue},
+            )
+            statuses = [update.data["interpretationJob"]["status"] async for update in updates]
+        finally:
+            await queue.stop()
+            db.close()
+
+        assert statuses[0] == "QUEUED"
+        assert statuses[-1] == "SUCCEEDED"
@@ -0,0 +1,156 @@
+"""Tests for structured logging, request IDs and the slow-query log."""
+
+import io
+import json
+import logging
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+os.environ.setdefault("JOB_STORE_PATH", ":memory:")
+
+from app import logs
+from app.logs import (
+    DebugSampler,
+    JsonFormatter,
+    configure_logging,
+    instrument_engine,
+    request_id,
+    shutdown_logging,
+)
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def log_stream(monkeypatch):
+    """Configure JSON logging into a buffer; yields a function returning the parsed records."""
+    monkeypatch.delenv("LOG_FORMAT", raising=False)
+    stream = io.StringIO()
+    configure_logging(level="INFO", stream=stream)
+
+    def records() -> list[dict]:
+        shutdown_logging()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield records
+    configure_logging()
+
+
+def test_records_are_json_lines_with_extra_fields_and_request_id(log_stream):
+    token = request_id.set("req-1")
+    try:
+        logging.getLogger("app.test").info("Served artwork %s", 7, extra={"artwork_id": 7})
+    finally:
+        request_id.reset(token)
+
+    [record] = [r for r in log_stream() if r["logger"] == "app.test"]
+    assert record["level"] == "INFO"
+    assert record["message"] == "Served artwork 7"
+    assert record["request_id"] == "req-1"
+    assert record["artwork_id"] == 7
+
+
+def test_http_client_request_lines_are_left_out(log_stream):
+    logging.getLogger("httpx").info("HTTP Request: GET https://example.com/1.jpg")
+    logging.getLogger("httpcore.connection").debug("connect_tcp.started")
+    logging.getLogger("httpx").warning("Retrying request")
+
+    records = [r for r in log_stream() if r["logger"].startswith(("httpx", "httpcore"))]
+    assert [r["message"] for r in records] == ["Retrying request"]
+
+
+def test_exception_traceback_is_included(log_stream):
+    try:
+        raise ValueError("broken")
+    except ValueError:
+        logging.getLogger("app.test").exception("Step failed")
+
+    [record] = [r for r in log_stream() if r["logger"] == "app.test"]
+    assert "ValueError: broken" in record["exception"]
+
+
+def test_formatter_leaves_out_standard_attributes():
+    record = logging.makeLogRecord({"name": "app.test", "msg": "hello", "levelno": 20})
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert set(entry) == {"time", "level", "logger", "message"}
+
+
+def test_debug_sampling_keeps_or_drops_a_request_as_a_whole():
+    sampler = DebugSampler(0.5)
+    debug = logging.makeLogRecord({"levelno": logging.DEBUG, "levelname": "DEBUG"})
+    warning = logging.makeLogRecord({"levelno": logging.WARNING})
+
+    decisions = {}
+    for index in range(200):
+        token = request_id.set(f"request-{index}")
+        try:
+            first = sampler.filter(debug)
+            assert all(sampler.filter(debug) == first for _ in range(5))
+            assert sampler.filter(warning)
+            decisions[index] = first
+        finally:
+            request_id.reset(token)
+
+    kept = sum(decisions.values())
+    assert 50 < kept < 150
+
+
+def test_zero_sample_rate_drops_all_debug_records():
+    sampler = DebugSampler(0.0)
+    debug = logging.makeLogRecord({"levelno": logging.DEBUG})
+
+    assert not sampler.filter(debug)
+
+
+def test_slow_statements_are_logged_as_warnings(monkeypatch, caplog):
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    monkeypatch.setattr(logs, "SLOW_QUERY_MS", 1_000_000)
+    with caplog.at_level(logging.WARNING, logger="app.sql"):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    assert not caplog.records
+
+    monkeypatch.setattr(logs, "SLOW_QUERY_MS", 0)
+    with caplog.at_level(logging.WARNING, logger="app.sql"):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 2"))
+    [record] = caplog.records
+    assert record.name == "app.sql.slow"
+    assert record.statement == "SELECT 2"
+    assert record.duration_ms >= 0
+
+
+def test_statements_are_debug_records_when_enabled(caplog):
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    with caplog.at_level(logging.DEBUG, logger="app.sql"):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 3"))
+
+    assert [record.statement for record in caplog.records] == ["SELECT 3"]
+
+
+def test_response_echoes_supplied_request_id():
+    response = client.get("/health", headers={"X-Request-ID": "abc-123"})
+
+    assert response.headers["X-Request-ID"] == "abc-123"
+
+
+def test_request_id_is_generated_when_missing_or_invalid():
+    generated = client.get("/health").headers["X-Request-ID"]
+    replaced = client.get("/health", headers={"X-Request-ID": "bad id\n"}).headers["X-Request-ID"]
+
+    assert len(generated) == 32
+    assert len(replaced) == 32
+    assert generated != replaced
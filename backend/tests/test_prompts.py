@@ -0,0 +1,68 @@
+"""Unit tests for the versioned prompt registry."""
+
+import pytest
+
+from app.ai_service import AIService, StubProvider
+from app.models import Artwork
+from app.prompts import DEFAULT_PROMPT_VERSION, PROMPTS, PromptTemplate, get_prompt
+
+
+class TestPromptTemplate:
+    """Test template rendering and identity."""
+
+    def test_renders_artwork_title(self):
+        """Placeholders are filled from the artwork."""
+        template = PromptTemplate(version="test", template='Describe "{title}".')
+
+        assert template.render(Artwork(title="Harbour")) == 'Describe "Harbour".'
+
+    def test_title_is_not_reinterpreted_as_template(self):
+        """Braces inside the title are inserted literally."""
+        template = PromptTemplate(version="test", template="Title: {title}")
+
+        assert template.render(Artwork(title="{oops}")) == "Title: {oops}"
+
+    def test_hash_is_stable_and_content_based(self):
+        """Equal text gives equal hashes; any edit changes the hash."""
+        first = PromptTemplate(version="a", template="Look at {title}.")
+        same_text = PromptTemplate(version="b", template="Look at {title}.")
+        edited = PromptTemplate(version="a", template="Look at {title}!")
+
+        assert first.hash == same_text.hash
+        assert first.hash != edited.hash
+        assert len(first.hash) == 16
+
+    def test_rejects_unknown_placeholders(self):
+        """Templates may only use fields the renderer provides."""
+        with pytest.raises(ValueError, match="Unknown prompt placeholders: year"):
+            PromptTemplate(version="bad", template="{title} ({year})")
+
+
+class TestPromptRegistry:
+    """Test prompt selection."""
+
+    def test_defaults_to_latest_version(self, monkeypatch):
+        """Without PROMPT_VERSION the default version is used."""
+        monkeypatch.delenv("PROMPT_VERSION", raising=False)
+
+        assert get_prompt() is PROMPTS[DEFAULT_PROMPT_VERSION]
+
+    def test_selects_version_from_environment(self, monkeypatch):
+        """PROMPT_VERSION picks the registered template."""
+        monkeypatch.setenv("PROMPT_VERSION", "v1")
+
+        assert get_prompt().version == "v1"
+
+    def test_unknown_version_raises(self, monkeypatch):
+        """An unregistered version fails with the available choices."""
+        monkeypatch.setenv("PROMPT_VERSION", "v999")
+
+        with pytest.raises(ValueError, match="Unknown prompt version 'v999'"):
+            get_prompt()
+
+    def test_service_builds_prompt_from_selected_template(self):
+        """AIService renders its configured template."""
+        template = PromptTemplate(version="short", template="Note on {title}")
+        service = AIService(provider=StubProvider(), prompt=template)
+
+        assert service._build_prompt(Artwork(title="Dunes")) == "Note on Dunes"
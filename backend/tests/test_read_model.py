@@ -0,0 +1,177 @@
+"""Tests for the gallery generation marker and the in-memory read model."""
+
+import os
+
+import pytest
+from sqlalchemy import event, insert
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+
+from app.database import SessionLocal, get_engine, init_db
+from app.generation import get_generation
+from app.models import AIInterpretation, Artist, Artwork, Collection
+from app.operations import GET_COLLECTIONS
+from app.read_model import ArtworkView, ReadModel
+from app.schema import schema
+
+
+@pytest.fixture
+def db():
+    """Test database with two collections and three artworks."""
+    init_db()
+    session = SessionLocal()
+    session.query(AIInterpretation).delete()
+    session.query(Artwork).delete()
+    session.query(Collection).delete()
+    session.query(Artist).delete()
+
+    artist = Artist(name="Test Artist", bio="Paints outdoors.")
+    first = Collection(title="Harbours", description="By the sea")
+    second = Collection(title="Hills", description=None)
+    session.add_all([artist, first, second])
+    session.flush()
+    session.add_all(
+        [
+            Artwork(
+                title=f"Artwork {index}",
+                image_url=f"https://example.com/{index}.jpg",
+                artist_id=artist.id,
+                collection_id=collection.id,
+            )
+            for index, collection in enumerate([first, first, second], start=1)
+        ]
+    )
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def statements():
+    """Record SQL statements executed on the application engine."""
+    executed = []
+
+    def record(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(get_engine(), "before_cursor_execute", record)
+    yield executed
+    event.remove(get_engine(), "before_cursor_execute", record)
+
+
+class TestGenerationMarker:
+    """Test that gallery writes move the generation."""
+
+    def test_flushed_changes_bump_generation(self, db):
+        """Committing an edited ORM object bumps it once."""
+        before = get_generation(db)
+
+        collection = db.query(Collection).first()
+        collection.title = "Renamed"
+        db.commit()
+
+        assert get_generation(db) == before + 1
+
+    def test_bulk_statements_bump_generation(self, db):
+        """Bulk inserts and Query.delete() are tracked too."""
+        before = get_generation(db)
+        artist_id = db.query(Artist.id).scalar()
+
+        db.execute(
+            insert(Artwork),
+            [{"title": "Bulk", "image_url": "https://example.com/b.jpg", "artist_id": artist_id}],
+        )
+        db.query(Artwork).filter_by(title="Bulk").delete()
+        db.commit()
+
+        assert get_generation(db) == before + 2
+
+    def test_rolled_back_writes_do_not_bump(self, db):
+        """The bump is part of the writing transaction."""
+        before = get_generation(db)
+
+        db.query(Collection).first().title = "Discarded"
+        db.flush()
+        db.rollback()
+
+        assert get_generation(db) == before
+
+    def test_interpretation_writes_do_not_bump(self, db):
+        """Only gallery tables are tracked."""
+        before = get_generation(db)
+        artwork_id = db.query(Artwork.id).first()[0]
+
+        db.add(AIInterpretation(artwork_id=artwork_id, content="Note.", context="artwork:1"))
+        db.commit()
+
+        assert get_generation(db) == before
+
+
+class TestReadModel:
+    """Test snapshot building and refresh."""
+
+    def test_snapshot_mirrors_database(self, db):
+        """Collections, artworks and the artist are frozen in ID order."""
+        gallery = ReadModel().snapshot(db)
+
+        assert [c.title for c in gallery.collections] == ["Harbours", "Hills"]
+        assert [a.title for a in gallery.collections[0].artworks] == ["Artwork 1", "Artwork 2"]
+        assert gallery.artist.name == "Test Artist"
+        artwork = gallery.collections[1].artworks[0]
+        assert gallery.artworks_by_id[artwork.id] is artwork
+        assert artwork.artist is gallery.artist
+        with pytest.raises(AttributeError):
+            artwork.title = "Changed"
+
+    def test_views_are_compact(self, db):
+        """Views use slots instead of a per-instance dict."""
+        artwork = next(iter(ReadModel().snapshot(db).artworks_by_id.values()))
+
+        assert isinstance(artwork, ArtworkView)
+        assert not hasattr(artwork, "__dict__")
+
+    def test_reads_between_checks_skip_database(self, db, statements):
+        """Within the check interval the snapshot is served without any SQL."""
+        read_model = ReadModel(check_seconds=60)
+        first = read_model.snapshot(db)
+        statements.clear()
+
+        assert read_model.snapshot(db) is first
+        assert statements == []
+
+    def test_unchanged_generation_keeps_snapshot(self, db, statements):
+        """A check that finds the same generation reads one row and reuses the snapshot."""
+        read_model = ReadModel(check_seconds=0)
+        first = read_model.snapshot(db)
+        statements.clear()
+
+        assert read_model.snapshot(db) is first
+        assert len(statements) == 1
+
+    def test_rebuilds_after_gallery_change(self, db):
+        """A write moves the generation and the next check swaps in a new snapshot."""
+        read_model = ReadModel(check_seconds=0)
+        first = read_model.snapshot(db)
+
+        db.query(Collection).filter_by(title="Hills").one().title = "Mountains"
+        db.commit()
+        second = read_model.snapshot(db)
+
+        assert second is not first
+        assert second.generation > first.generation
+        assert [c.title for c in second.collections] == ["Harbours", "Mountains"]
+        # The old snapshot is untouched for readers still holding it
+        assert [c.title for c in first.collections] == ["Harbours", "Hills"]
+
+    def test_graphql_results_match_orm(self, db):
+        """GetCollections returns the same data from the read model as from the ORM."""
+        from_orm = schema.execute_sync(GET_COLLECTIONS, context_value={"db": db})
+        from_read_model = schema.execute_sync(
+            GET_COLLECTIONS, context_value={"db": db, "read_model": ReadModel()}
+        )
+
+        assert from_read_model.errors is None
+        assert from_read_model.data == from_orm.data
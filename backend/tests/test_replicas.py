@@ -0,0 +1,198 @@
+"""Tests for routing reads to replicas and serving from an edge snapshot."""
+
+import os
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+
+from app.database import ReadSession, create_edge_engine  # noqa: E402
+from app.edge import export_edge_database  # noqa: E402
+from app.generation import bump_generation  # noqa: E402
+from app.models import AICall, Artist, Artwork, Base  # noqa: E402
+from app.replicas import ReplicaRouter  # noqa: E402
+from app.search import SearchKind, create_search_index, search_documents  # noqa: E402
+
+
+def make_database(path, generation: int = 0):
+    """A SQLite database at ``path`` whose gallery is at ``generation``."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        for _ in range(generation):
+            bump_generation(db)
+        db.commit()
+    return engine
+
+
+def set_generation(engine, generation: int) -> None:
+    with Session(engine) as db:
+        db.connection().exec_driver_sql(f"UPDATE gallery_generation SET generation = {generation}")
+        db.commit()
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """A primary at generation 2 and two replica URLs, one caught up and one behind."""
+    primary = make_database(tmp_path / "primary.db", generation=2)
+    make_database(tmp_path / "fresh.db", generation=2)
+    make_database(tmp_path / "behind.db", generation=1)
+    urls = [f"sqlite:///{tmp_path / 'fresh.db'}", f"sqlite:///{tmp_path / 'behind.db'}"]
+    yield primary, urls
+    primary.dispose()
+
+
+def make_router(primary, urls, check_seconds: float = 60) -> ReplicaRouter:
+    return ReplicaRouter(urls, lambda: primary, create_engine, check_seconds)
+
+
+class TestReplicaRouter:
+    """Test choosing the engine for read sessions."""
+
+    def test_without_replicas_reads_use_the_primary(self, databases):
+        primary, _ = databases
+        router = make_router(primary, [])
+
+        assert router.read_engine() is primary
+        assert router.fallbacks == 0
+
+    def test_lagging_replicas_are_left_out_of_rotation(self, databases):
+        primary, urls = databases
+        router = make_router(primary, urls)
+
+        engines = {router.read_engine() for _ in range(3)}
+
+        assert [str(engine.url) for engine in engines] == [urls[0]]
+        assert router.lag == {urls[0]: 0, urls[1]: 1}
+
+    def test_fresh_replicas_take_reads_in_turn(self, databases):
+        primary, urls = databases
+        router = make_router(primary, urls, check_seconds=0)
+        set_generation(router.engines()[1], 2)
+
+        served = [str(router.read_engine().url) for _ in range(4)]
+
+        assert served == [urls[0], urls[1], urls[0], urls[1]]
+
+    def test_falls_back_to_the_primary_until_a_replica_catches_up(self, databases):
+        primary, urls = databases
+        router = make_router(primary, urls[1:], check_seconds=0)
+
+        assert router.read_engine() is primary
+        assert router.fallbacks == 1
+
+        set_generation(router.engines()[0], 2)
+        assert str(router.read_engine().url) == urls[1]
+        assert router.fallbacks == 1
+
+    def test_unreachable_replica_is_left_out(self, databases, tmp_path):
+        primary, urls = databases
+        missing = f"sqlite:///file:{tmp_path / 'missing.db'}?mode=ro&uri=true"
+        router = make_router(primary, [missing, urls[0]])
+
+        assert str(router.read_engine().url) == urls[0]
+        assert router.lag[missing] is None
+
+    def test_checks_at_most_once_per_interval(self, databases):
+        primary, urls = databases
+        router = make_router(primary, urls[:1])
+        router.read_engine()
+
+        set_generation(primary, 3)
+        # Still within the interval: the replica stays in rotation
+        assert str(router.read_engine().url) == urls[0]
+
+        router.reset()
+        assert router.read_engine() is primary
+
+
+class TestReadSession:
+    """Test that a read session keeps one engine."""
+
+    def test_engine_is_chosen_once_per_session(self, databases, monkeypatch):
+        primary, urls = databases
+        router = make_router(primary, urls, check_seconds=0)
+        set_generation(router.engines()[1], 2)
+        monkeypatch.setattr("app.database.replica_router", router)
+
+        with ReadSession() as db:
+            binds = {str(db.get_bind().url) for _ in range(3)}
+        with ReadSession() as db:
+            second = str(db.get_bind().url)
+
+        assert binds == {urls[0]}
+        assert second == urls[1]
+
+
+class TestEdgeDatabase:
+    """Test exporting and serving a read-only snapshot."""
+
+    @pytest.fixture
+    def source(self, tmp_path):
+        engine = make_database(tmp_path / "source.db")
+        with engine.begin() as connection:
+            create_search_index(connection)
+        with Session(engine) as db:
+            artist = Artist(name="Edge Artist", bio="Paints harbours.")
+            db.add(artist)
+            db.flush()
+            for n in range(5):
+                db.add(
+                    Artwork(
+                        title=f"Harbour {n}",
+                        image_url="https://example.com/h.jpg",
+                        artist_id=artist.id,
+                    )
+                )
+            bump_generation(db)
+            db.add(
+                AICall(
+                    artwork_id=1,
+                    provider="stub",
+                    model="stub",
+                    prompt_version="v1",
+                    prompt_hash="abc",
+                    image_bytes=1,
+                    latency_ms=1.0,
+                )
+            )
+            db.commit()
+        yield engine
+        engine.dispose()
+
+    def test_export_copies_the_served_tables(self, source, tmp_path):
+        path = tmp_path / "edge.db"
+
+        counts = export_edge_database(source, path, batch_size=2)
+
+        assert counts["artworks"] == 5
+        assert counts["gallery_generation"] == 1
+        # The usage ledger stays on the primary
+        assert "ai_calls" not in counts
+        assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+
+    def test_snapshot_serves_reads_and_search_but_refuses_writes(self, source, tmp_path):
+        path = tmp_path / "edge.db"
+        export_edge_database(source, path)
+        engine = create_edge_engine(path)
+        try:
+            with Session(engine) as db:
+                titles = db.scalars(select(Artwork.title).order_by(Artwork.id)).all()
+                page = search_documents(db, "harbour", limit=10)
+
+                assert titles == [f"Harbour {n}" for n in range(5)]
+                assert {hit.kind for hit in page.hits} >= {SearchKind.ARTWORK}
+
+                db.add(Artist(name="Intruder", bio=""))
+                with pytest.raises(OperationalError, match="readonly"):
+                    db.flush()
+        finally:
+            engine.dispose()
+
+    def test_missing_snapshot_is_an_error(self, tmp_path):
+        with pytest.raises(FileNotFoundError, match="export it with app.edge"):
+            create_edge_engine(tmp_path / "absent.db")
@@ -27,7 +27,7 @@ def setup_database():
         db.query(Artist).delete()
 
         # Create test artist
-        artist = Artist(name="Jack Pillemer")
+        artist = Artist(name="Jack Pillemer", bio="Paints what he sees.")
         db.add(artist)
         db.flush()
 
@@ -0,0 +1,192 @@
+"""Tests for the full-text search index and the search query."""
+
+import os
+
+import pytest
+from sqlalchemy import insert, text
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+
+from app.database import SessionLocal, init_db
+from app.models import AIInterpretation, Artist, Artwork, Collection
+from app.read_model import ReadModel
+from app.repository import InterpretationRepository, SearchRepository
+from app.schema import schema
+from app.search import SearchKind, rebuild_search_index
+
+SEARCH = """
+    query Search($query: String!, $first: Int!, $offset: Int!) {
+        search(query: $query, first: $first, offset: $offset) {
+            total
+            hits { kind id title snippet artwork { id title } }
+        }
+    }
+"""
+
+
+@pytest.fixture
+def db():
+    """Test database with a small gallery and one stored interpretation."""
+    init_db()
+    session = SessionLocal()
+    session.query(AIInterpretation).delete()
+    session.query(Artwork).delete()
+    session.query(Collection).delete()
+    session.query(Artist).delete()
+
+    artist = Artist(name="Test Artist", bio="Paints olive trees in the Judean hills.")
+    collection = Collection(title="Harbours", description="Boats and lighthouses by the sea")
+    session.add_all([artist, collection])
+    session.flush()
+    session.add_all(
+        [
+            Artwork(
+                title=title,
+                image_url=f"https://example.com/{index}.jpg",
+                artist_id=artist.id,
+                collection_id=collection.id,
+            )
+            for index, title in enumerate(["Lighthouse at Dusk", "Market Street", "Olive Grove"])
+        ]
+    )
+    session.flush()
+    market = session.query(Artwork).filter_by(title="Market Street").one()
+    InterpretationRepository(session).add(market.id, "Crowded stalls under a sea of awnings.")
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def search(db, query: str, limit: int = 10, offset: int = 0):
+    return SearchRepository(db).search(query, limit, offset)
+
+
+def kinds_and_titles(page) -> list[tuple[SearchKind, str]]:
+    return [(hit.kind, hit.title) for hit in page.hits]
+
+
+class TestSearchIndex:
+    """Test ranking and incremental maintenance of the index."""
+
+    def test_matches_every_indexed_field(self, db):
+        """Titles, descriptions, the bio and interpretations are all searchable."""
+        assert kinds_and_titles(search(db, "lighthouse")) == [
+            (SearchKind.ARTWORK, "Lighthouse at Dusk"),
+            (SearchKind.COLLECTION, "Harbours"),
+        ]
+        assert [hit.kind for hit in search(db, "olive").hits] == [
+            SearchKind.ARTWORK,
+            SearchKind.ARTIST,
+        ]
+        interpretation = search(db, "awnings").hits[0]
+        assert interpretation.kind == SearchKind.INTERPRETATION
+        assert (
+            interpretation.artwork_id
+            == db.query(Artwork.id).filter_by(title="Market Street").scalar()
+        )
+        assert "<mark>awnings</mark>" in interpretation.snippet
+
+    def test_words_are_stemmed_and_last_word_is_a_prefix(self, db):
+        """ "boat" finds "Boats"; "lightho" finds "Lighthouse" while typing."""
+        assert search(db, "boat").total == 1
+        assert search(db, "lightho").total == 2
+        assert search(db, "sea boats").total == 1
+
+    def test_query_syntax_is_not_exposed(self, db):
+        """Quotes and operators are plain words: every one must match."""
+        assert search(db, 'sea" (').total == 2
+        assert search(db, "sea OR lighthouse").total == 0
+        assert search(db, "  ").total == 0
+
+    def test_paginates_ranked_hits(self, db):
+        """Pages are consistent slices of one ranking; total counts all matches."""
+        everything = search(db, "sea", limit=10)
+        first_page = search(db, "sea", limit=1)
+        second_page = search(db, "sea", limit=1, offset=1)
+
+        assert first_page.total == second_page.total == everything.total == 2
+        assert first_page.hits + second_page.hits == everything.hits
+
+    def test_orm_changes_update_index(self, db):
+        """Edits and deletes through the ORM are reflected after commit."""
+        artwork = db.query(Artwork).filter_by(title="Market Street").one()
+        artwork.title = "Night Market"
+        db.commit()
+        assert kinds_and_titles(search(db, "night")) == [(SearchKind.ARTWORK, "Night Market")]
+        assert search(db, "street").total == 0
+
+        db.delete(db.query(AIInterpretation).one())
+        db.commit()
+        assert search(db, "awnings").total == 0
+
+    def test_bulk_statements_update_index(self, db):
+        """Bulk inserts and deletes rebuild the affected kinds before commit."""
+        artist_id = db.query(Artist.id).scalar()
+        db.execute(
+            insert(Artwork),
+            [
+                {
+                    "title": "Desert Bloom",
+                    "image_url": "https://example.com/d.jpg",
+                    "artist_id": artist_id,
+                }
+            ],
+        )
+        db.query(Collection).delete()
+        db.commit()
+
+        assert search(db, "desert").total == 1
+        assert search(db, "harbours").total == 0
+
+    def test_rolled_back_changes_are_not_indexed(self, db):
+        """Index writes share the transaction of the data they describe."""
+        db.query(Artwork).filter_by(title="Olive Grove").one().title = "Cypress Grove"
+        db.flush()
+        db.rollback()
+
+        assert search(db, "cypress").total == 0
+        assert search(db, "grove").total == 1
+
+    def test_rebuild_matches_incremental_index(self, db):
+        """Rebuilding from the tables yields the same results."""
+        before = search(db, "sea olive lighthouse market")
+        db.execute(text("DELETE FROM search_index"))
+        rebuild_search_index(db)
+        db.commit()
+
+        assert search(db, "sea olive lighthouse market") == before
+        assert search(db, "sea").total == 2
+
+
+class TestSearchQuery:
+    """Test the search GraphQL field."""
+
+    @pytest.mark.parametrize("read_model", [None, ReadModel()])
+    def test_hits_link_to_artworks(self, db, read_model):
+        """Artwork and interpretation hits resolve their artwork."""
+        result = schema.execute_sync(
+            SEARCH,
+            variable_values={"query": "market", "first": 5, "offset": 0},
+            context_value={"db": db, "read_model": read_model},
+        )
+
+        assert result.errors is None
+        hit = result.data["search"]["hits"][0]
+        assert hit["kind"] == "ARTWORK"
+        assert hit["artwork"]["title"] == "Market Street"
+        assert hit["snippet"] == "<mark>Market</mark> Street"
+
+    def test_page_size_is_capped(self, db):
+        """first is clamped to the maximum page size."""
+        result = schema.execute_sync(
+            SEARCH,
+            variable_values={"query": "sea", "first": 1000, "offset": -5},
+            context_value={"db": db},
+        )
+
+        assert result.errors is None
+        assert result.data["search"]["total"] == 2
+        assert len(result.data["search"]["hits"]) == 2
@@ -0,0 +1,117 @@
+"""Tests for the cross-process cache backend."""
+
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from app.interpretation_cache import (
+    CachedInterpretation,
+    InterpretationCache,
+    SharedInterpretationCache,
+    create_interpretation_cache,
+)
+from app.shared_cache import SQLiteCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache.db")
+
+
+class TestSQLiteCache:
+    """Test the namespaced SQLite cache."""
+
+    def test_round_trip_per_namespace(self, cache_path):
+        """Values are stored per namespace and can be deleted."""
+        cache = SQLiteCache(cache_path)
+        cache.set("a", "key", b"first")
+        cache.set("b", "key", b"second")
+
+        assert cache.get("a", "key") == b"first"
+        assert cache.get("b", "key") == b"second"
+        cache.delete("a", "key")
+        assert cache.get("a", "key") is None
+        assert cache.count("b") == 1
+
+    def test_expired_entries_are_misses(self, cache_path):
+        """An entry past its TTL is not returned."""
+        cache = SQLiteCache(cache_path)
+        cache.set("a", "stale", b"value", ttl=-1)
+        cache.set("a", "fresh", b"value", ttl=60)
+
+        assert cache.get("a", "stale") is None
+        assert cache.get("a", "fresh") == b"value"
+
+    def test_evicts_oldest_beyond_limit(self, cache_path):
+        """Writing past max_entries drops the oldest entries of that namespace."""
+        cache = SQLiteCache(cache_path)
+        for index in range(4):
+            cache.set("a", str(index), b"value", max_entries=2)
+
+        assert cache.count("a") == 2
+        assert cache.get("a", "0") is None
+        assert cache.get("a", "3") == b"value"
+
+    def test_entries_are_shared_between_instances(self, cache_path):
+        """Two caches on one file, as in two worker processes, see each other's writes."""
+        writer, reader = SQLiteCache(cache_path), SQLiteCache(cache_path)
+
+        writer.set("a", "key", b"value")
+
+        assert reader.get("a", "key") == b"value"
+        reader.clear("a")
+        assert writer.get("a", "key") is None
+
+
+class TestInterpretationCacheBackends:
+    """Test the interpretation cache backends."""
+
+    def test_shared_cache_round_trips_entries(self, cache_path):
+        """Entries survive serialization and are visible to another instance."""
+        entry = CachedInterpretation(
+            id="7",
+            artwork_id=3,
+            content="A note.",
+            generated_at=datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        )
+        SharedInterpretationCache(SQLiteCache(cache_path)).put(entry)
+
+        other = SharedInterpretationCache(SQLiteCache(cache_path))
+
+        assert other.get(3) == entry
+        assert other.get(4) is None
+        assert len(other) == 1
+
+    async def test_async_access_runs_off_the_event_loop(self, cache_path):
+        """aget and aput query SQLite from a worker thread, not the loop's."""
+        threads = []
+
+        class RecordingCache(SQLiteCache):
+            def get(self, namespace, key):
+                threads.append(threading.get_ident())
+                return super().get(namespace, key)
+
+            def set(self, namespace, key, value, ttl=None, max_entries=None):
+                threads.append(threading.get_ident())
+                super().set(namespace, key, value, ttl, max_entries)
+
+        cache = SharedInterpretationCache(RecordingCache(cache_path))
+        entry = CachedInterpretation(
+            id="7", artwork_id=3, content="A note.", generated_at=datetime.now(timezone.utc)
+        )
+
+        await cache.aput(entry)
+
+        assert await cache.aget(3) == entry
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
+
+    def test_backend_is_selected_by_name(self, cache_path, monkeypatch):
+        """CACHE_BACKEND picks the implementation; unknown names are rejected."""
+        monkeypatch.setenv("CACHE_PATH", cache_path)
+
+        assert isinstance(create_interpretation_cache("memory"), InterpretationCache)
+        assert isinstance(create_interpretation_cache("sqlite"), SharedInterpretationCache)
+        with pytest.raises(ValueError, match="Unknown cache backend"):
+            create_interpretation_cache("redis")
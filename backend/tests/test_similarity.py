@@ -0,0 +1,230 @@
+"""Tests for color features and the related-artworks index."""
+
+import io
+import os
+
+import httpx
+import numpy as np
+import pytest
+from PIL import Image
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+
+from app.database import SessionLocal, init_db
+from app.models import AIInterpretation, Artist, Artwork, Collection
+from app.read_model import ReadModel
+from app.schema import schema
+from app.similarity import (
+    FEATURE_SIZE,
+    SimilarityIndex,
+    SimilarityIndexFile,
+    compute_features,
+    update_index,
+)
+
+COLORS = {
+    "red": (220, 20, 30),
+    "crimson": (200, 30, 50),
+    "blue": (20, 40, 210),
+    "navy": (10, 20, 160),
+}
+
+RELATED_ARTWORKS = """
+    query RelatedArtworks($id: String!, $k: Int!) {
+        relatedArtworks(id: $id, k: $k) { id title }
+    }
+"""
+
+
+def solid_image(color: tuple[int, int, int], fmt: str = "PNG") -> bytes:
+    image = Image.new("RGB", (120, 80), color)
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def image_transport(requests: list[str]) -> httpx.MockTransport:
+    """Serve https://example.com/<color>.png as a solid image of that color."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        name = request.url.path.strip("/").removesuffix(".png")
+        if name not in COLORS:
+            return httpx.Response(404)
+        return httpx.Response(200, content=solid_image(COLORS[name]))
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture
+def db():
+    """Test database with one artwork per color."""
+    init_db()
+    session = SessionLocal()
+    session.query(AIInterpretation).delete()
+    session.query(Artwork).delete()
+    session.query(Collection).delete()
+    session.query(Artist).delete()
+
+    artist = Artist(name="Test Artist", bio="Paints outdoors.")
+    session.add(artist)
+    session.flush()
+    session.add_all(
+        [
+            Artwork(title=name, image_url=f"https://example.com/{name}.png", artist_id=artist.id)
+            for name in COLORS
+        ]
+    )
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def artwork_id(db, title: str) -> int:
+    return db.query(Artwork.id).filter_by(title=title).scalar()
+
+
+class TestFeatures:
+    """Test the color feature vectors."""
+
+    def test_features_are_unit_length_histograms(self):
+        """A vector has one value per color bin and unit L2 norm."""
+        features = compute_features(solid_image(COLORS["red"], fmt="JPEG"))
+
+        assert features.shape == (FEATURE_SIZE,)
+        assert np.linalg.norm(features) == pytest.approx(1.0)
+
+    def test_similar_colors_score_higher(self):
+        """Two reds are closer to each other than to blue."""
+        red, crimson, blue = (
+            compute_features(solid_image(COLORS[c])) for c in COLORS if c != "navy"
+        )
+
+        assert red @ crimson > red @ blue
+
+
+class TestSimilarityIndex:
+    """Test nearest-neighbour search and persistence."""
+
+    def test_related_returns_top_k_without_self(self):
+        """Neighbours are ordered by similarity and exclude the query artwork."""
+        index = SimilarityIndex.from_features(
+            {
+                1: np.array([1.0, 0.0] + [0.0] * (FEATURE_SIZE - 2)),
+                2: np.array([0.8, 0.6] + [0.0] * (FEATURE_SIZE - 2)),
+                3: np.array([0.0, 1.0] + [0.0] * (FEATURE_SIZE - 2)),
+            }
+        )
+
+        related = index.related(1, k=5)
+
+        assert [artwork for artwork, _ in related] == [2, 3]
+        assert related[0][1] == pytest.approx(0.8)
+        assert index.related(99, k=2) == []
+
+    def test_save_and_reload_after_rebuild(self, tmp_path):
+        """The API-side file reloads when a rebuild replaces the index."""
+        vector = np.ones(FEATURE_SIZE) / np.sqrt(FEATURE_SIZE)
+        index_file = SimilarityIndexFile(tmp_path)
+        assert index_file.get() is None
+
+        SimilarityIndex.from_features({1: vector, 2: vector}).save(tmp_path)
+        first = index_file.get()
+        assert len(first) == 2
+        assert index_file.get() is first
+
+        SimilarityIndex.from_features({1: vector, 2: vector, 3: vector}).save(tmp_path)
+        assert len(index_file.get()) == 3
+
+    def test_rebuilds_keep_the_current_and_previous_generation(self, tmp_path):
+        vector = np.ones(FEATURE_SIZE) / np.sqrt(FEATURE_SIZE)
+        for count in (1, 2, 3):
+            SimilarityIndex.from_features(dict.fromkeys(range(count), vector)).save(tmp_path)
+
+        assert len(list(tmp_path.glob("ids-*.npy"))) == 2
+        assert len(SimilarityIndex.load(tmp_path)) == 3
+
+    def test_files_of_an_unfinished_rebuild_are_ignored(self, tmp_path):
+        """Until CURRENT names a generation, its files are never read."""
+        red = compute_features(solid_image(COLORS["red"]))
+        blue = compute_features(solid_image(COLORS["blue"]))
+        SimilarityIndex.from_features({1: red, 2: red}).save(tmp_path)
+        current = (tmp_path / "CURRENT").read_text()
+        # A rebuild of the same size that stopped before swapping CURRENT
+        np.save(tmp_path / "vectors-next.npy", np.stack([blue, blue]))
+        np.save(tmp_path / "ids-next.npy", np.array([1, 2], dtype=np.int64))
+
+        index = SimilarityIndex.load(tmp_path)
+
+        assert (tmp_path / "CURRENT").read_text() == current
+        assert np.allclose(index.vectors, np.stack([red, red]))
+
+
+class TestUpdateIndex:
+    """Test building the index from the artworks table."""
+
+    async def test_builds_then_only_featurizes_new_artworks(self, db, tmp_path):
+        """A second run reuses stored vectors and drops deleted artworks."""
+        requests = []
+        index = await update_index(db, tmp_path, transport=image_transport(requests))
+        assert len(index) == 4
+        assert len(requests) == 4
+
+        db.query(Artwork).filter_by(title="navy").delete()
+        db.add(
+            Artwork(
+                title="missing",
+                image_url="https://example.com/missing.png",
+                artist_id=db.query(Artist.id).scalar(),
+            )
+        )
+        db.commit()
+        requests.clear()
+
+        index = await update_index(db, tmp_path, transport=image_transport(requests))
+
+        assert requests == ["/missing.png"]
+        assert artwork_id(db, "red") in index
+        assert len(index) == 3
+
+    async def test_oversized_images_are_skipped(self, db, tmp_path, monkeypatch):
+        monkeypatch.setattr("app.similarity.IMAGE_MAX_BYTES", 64)
+
+        index = await update_index(db, tmp_path, transport=image_transport([]))
+
+        assert len(index) == 0
+
+
+class TestRelatedArtworksQuery:
+    """Test the relatedArtworks GraphQL field."""
+
+    @pytest.fixture
+    async def index_file(self, db, tmp_path):
+        await update_index(db, tmp_path, transport=image_transport([]))
+        return SimilarityIndexFile(tmp_path)
+
+    @pytest.mark.parametrize("read_model", [None, ReadModel()])
+    def test_returns_closest_artworks(self, db, index_file, read_model):
+        """Reds are related to reds first, from the ORM or the read model."""
+        result = schema.execute_sync(
+            RELATED_ARTWORKS,
+            variable_values={"id": str(artwork_id(db, "red")), "k": 2},
+            context_value={"db": db, "similarity_index": index_file, "read_model": read_model},
+        )
+
+        assert result.errors is None
+        assert [a["title"] for a in result.data["relatedArtworks"]] == ["crimson", "navy"]
+
+    def test_unindexed_artwork_has_no_related(self, db, tmp_path):
+        """Without an index the field is empty rather than an error."""
+        result = schema.execute_sync(
+            RELATED_ARTWORKS,
+            variable_values={"id": str(artwork_id(db, "red")), "k": 3},
+            context_value={"db": db, "similarity_index": SimilarityIndexFile(tmp_path)},
+        )
+
+        assert result.errors is None
+        assert result.data["relatedArtworks"] == []
@@ -0,0 +1,103 @@
+"""Tests for the static snapshot export."""
+
+import json
+import os
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+
+from app.database import SessionLocal, init_db
+from app.main import app
+from app.models import AIInterpretation, Artist, Artwork, Collection
+from app.snapshot import OPERATIONS, content_hash, write_snapshot
+
+
+@pytest.fixture
+def db():
+    """Test database with one artwork and two stored interpretations of it."""
+    init_db()
+    session = SessionLocal()
+    session.query(AIInterpretation).delete()
+    session.query(Artwork).delete()
+    session.query(Collection).delete()
+    session.query(Artist).delete()
+
+    artist = Artist(name="Test Artist", bio="Paints outdoors.")
+    collection = Collection(title="Test Collection", description="Harbours")
+    session.add_all([artist, collection])
+    session.flush()
+    artwork = Artwork(
+        title="Test Artwork",
+        image_url="https://example.com/1.jpg",
+        artist_id=artist.id,
+        collection_id=collection.id,
+    )
+    session.add(artwork)
+    session.flush()
+    session.add_all(
+        [
+            AIInterpretation(
+                artwork_id=artwork.id,
+                content="Older note.",
+                context=f"artwork:{artwork.id}",
+                generated_at=datetime(2025, 1, 1),
+            ),
+            AIInterpretation(
+                artwork_id=artwork.id,
+                content="Newer note.",
+                context=f"artwork:{artwork.id}",
+                generated_at=datetime(2025, 6, 1),
+            ),
+        ]
+    )
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def test_snapshots_match_live_responses(db, tmp_path):
+    """Each snapshot file is the body /graphql returns for the same operation."""
+    manifest = write_snapshot(db, tmp_path)
+
+    client = TestClient(app)
+    for name, query in OPERATIONS.items():
+        live = client.post("/graphql", json={"query": query}).json()
+        assert json.loads((tmp_path / manifest["operations"][name]).read_bytes()) == live
+
+
+def test_file_names_carry_content_hash(db, tmp_path):
+    """File names embed the hash of their bytes, and the manifest lists them."""
+    manifest = write_snapshot(db, tmp_path)
+
+    saved = json.loads((tmp_path / "manifest.json").read_text())
+    assert saved["operations"] == manifest["operations"]
+    for path in manifest["operations"].values():
+        assert path.split(".")[-2] == content_hash((tmp_path / path).read_bytes())
+
+
+def test_unchanged_data_gives_same_snapshot(db, tmp_path):
+    """Re-exporting identical data reproduces the same files and snapshot ID."""
+    first = write_snapshot(db, tmp_path)
+    second = write_snapshot(db, tmp_path)
+
+    assert second["snapshotId"] == first["snapshotId"]
+    assert second["operations"] == first["operations"]
+
+
+def test_interpretations_are_optional(db, tmp_path):
+    """Only the latest stored interpretation is exported, and only on request."""
+    assert write_snapshot(db, tmp_path / "plain")["interpretations"] == {}
+
+    manifest = write_snapshot(db, tmp_path / "full", include_interpretations=True)
+
+    ((artwork_id, path),) = manifest["interpretations"].items()
+    body = json.loads((tmp_path / "full" / path).read_bytes())
+    interpretation = body["data"]["generateArtworkInterpretation"]
+    assert interpretation["content"] == "Newer note."
+    assert interpretation["context"] == f"artwork:{artwork_id}"
@@ -0,0 +1,95 @@
+"""Cold-start guards: what importing the app loads and how long /health takes.
+
+Each check runs in a fresh interpreter so modules imported by other tests
+do not hide a regression.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Generous for slow CI machines; the module checks below are the strict guard.
+# Override with STARTUP_BUDGET_MS to profile a deployment target.
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "2500"))
+
+# SDKs that must only be imported once an AI request or seed run needs them
+DEFERRED_MODULES = ["google.genai", "httpx", "cloudinary", "psycopg2"]
+
+PROBE = """
+import json, sys, time
+
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+loaded = [name for name in {deferred!r} if name in sys.modules]
+engine_created = app.database._engine is not None
+
+from fastapi.testclient import TestClient
+
+with TestClient(app.main.app) as client:
+    ready = time.perf_counter()
+    status = client.get("/health").status_code
+
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - started) * 1000,
+    "loaded": loaded,
+    "engine_created": engine_created,
+    "status": status,
+}}))
+"""
+
+
+def run_probe(tmp_path: Path) -> dict:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'startup.db'}",
+        "JOB_STORE_PATH": ":memory:",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(deferred=DEFERRED_MODULES)],
+        cwd=Path(__file__).resolve().parents[1],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_defers_heavy_sdks_and_engine(tmp_path):
+    """Importing app.main loads no AI/HTTP/Cloudinary SDK and creates no engine."""
+    probe = run_probe(tmp_path)
+
+    assert probe["loaded"] == []
+    assert probe["engine_created"] is False
+
+
+def test_health_within_startup_budget(tmp_path):
+    """A fresh process serves /health within the startup budget."""
+    probe = run_probe(tmp_path)
+
+    assert probe["status"] == 200
+    assert probe["startup_ms"] < STARTUP_BUDGET_MS, (
+        f"import {probe['import_ms']:.0f}ms, ready {probe['startup_ms']:.0f}ms"
+    )
+
+
+def test_import_survives_bad_prompt_config(tmp_path):
+    """An unknown PROMPT_VERSION fails startup, not the import of app.main."""
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.main"],
+        cwd=Path(__file__).resolve().parents[1],
+        env={
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{tmp_path / 'startup.db'}",
+            "PROMPT_VERSION": "v999",
+        },
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
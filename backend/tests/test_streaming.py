@@ -0,0 +1,167 @@
+"""Tests for incremental delivery (@stream/@defer) of gallery queries."""
+
+import json
+import os
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+os.environ.setdefault("JOB_STORE_PATH", ":memory:")
+
+from app import schema as schema_module
+from app.database import SessionLocal, init_db
+from app.main import app
+from app.models import AIInterpretation, Artist, Artwork, Collection
+from app.operations import GET_COLLECTIONS
+from app.read_model import ReadModel
+from app.repository import ArtworkRepository
+from app.schema import schema
+
+ARTWORKS = 12
+
+STREAMED_COLLECTIONS = """
+query GetCollections {
+  collections {
+    id
+    title
+    artworks @stream(initialCount: 2) {
+      id
+      title
+    }
+  }
+}
+"""
+
+DEFERRED_ARTIST = """
+query {
+  collections {
+    id
+    artworks {
+      id
+      ... @defer(label: "artist") {
+        artist { name bio }
+      }
+    }
+  }
+}
+"""
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """One collection of twelve artworks, streamed in batches of five."""
+    monkeypatch.setattr(schema_module, "ARTWORK_STREAM_BATCH_SIZE", 5)
+    init_db()
+    session = SessionLocal()
+    session.query(AIInterpretation).delete()
+    session.query(Artwork).delete()
+    session.query(Collection).delete()
+    session.query(Artist).delete()
+
+    artist = Artist(name="Test Artist", bio="Paints outdoors.")
+    collection = Collection(title="Harbours", description=None)
+    session.add_all([artist, collection])
+    session.flush()
+    session.add_all(
+        Artwork(
+            title=f"Artwork {index}",
+            image_url=f"https://example.com/{index}.jpg",
+            artist_id=artist.id,
+            collection_id=collection.id,
+        )
+        for index in range(1, ARTWORKS + 1)
+    )
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+async def collect(result) -> tuple[dict, list[dict]]:
+    """Initial payload and subsequent payloads of an incremental result."""
+    subsequent = [payload.formatted async for payload in result.subsequent_results]
+    return result.initial_result.formatted, subsequent
+
+
+def streamed_titles(initial: dict, subsequent: list[dict]) -> list[str]:
+    titles = [artwork["title"] for artwork in initial["data"]["collections"][0]["artworks"]]
+    for payload in subsequent:
+        for increment in payload.get("incremental", []):
+            titles.extend(artwork["title"] for artwork in increment.get("items", []))
+    return titles
+
+
+@pytest.mark.parametrize("use_read_model", [False, True])
+async def test_stream_sends_initial_artworks_then_the_rest(db, use_read_model):
+    context = {"db": db, "read_model": ReadModel() if use_read_model else None}
+
+    result = await schema.execute(STREAMED_COLLECTIONS, context_value=context)
+    initial, subsequent = await collect(result)
+
+    assert len(initial["data"]["collections"][0]["artworks"]) == 2
+    assert initial["hasNext"] is True
+    assert streamed_titles(initial, subsequent) == [
+        f"Artwork {index}" for index in range(1, ARTWORKS + 1)
+    ]
+    assert subsequent[-1]["hasNext"] is False
+
+
+async def test_queries_without_directives_are_unchanged(db):
+    streamed = await schema.execute(STREAMED_COLLECTIONS, context_value={"db": db})
+    initial, subsequent = await collect(streamed)
+
+    result = schema.execute_sync(GET_COLLECTIONS, context_value={"db": db})
+
+    assert result.errors is None
+    artworks = result.data["collections"][0]["artworks"]
+    assert [artwork["title"] for artwork in artworks] == streamed_titles(initial, subsequent)
+
+
+async def test_disabled_stream_returns_the_full_list(db):
+    query = STREAMED_COLLECTIONS.replace("initialCount: 2", "initialCount: 2, if: false")
+
+    result = await schema.execute(query, context_value={"db": db})
+
+    assert result.errors is None
+    assert len(result.data["collections"][0]["artworks"]) == ARTWORKS
+
+
+async def test_defer_sends_artist_later(db):
+    result = await schema.execute(DEFERRED_ARTIST, context_value={"db": db})
+    initial, subsequent = await collect(result)
+
+    first = initial["data"]["collections"][0]["artworks"][0]
+    assert "artist" not in first
+    deferred = [
+        increment["data"] for payload in subsequent for increment in payload.get("incremental", [])
+    ]
+    assert {"artist": {"name": "Test Artist", "bio": "Paints outdoors."}} in deferred
+
+
+def test_collection_artworks_are_read_in_batches(db):
+    collection_id = db.query(Collection.id).scalar()
+
+    batches = list(ArtworkRepository(db).iter_by_collection(collection_id, batch_size=5))
+
+    assert [len(batch) for batch in batches] == [5, 5, 2]
+    assert [artwork.title for artwork in batches[0]][:2] == ["Artwork 1", "Artwork 2"]
+
+
+def test_http_stream_responds_with_multipart(db):
+    client = TestClient(app)
+
+    response = client.post(
+        "/graphql",
+        json={"query": STREAMED_COLLECTIONS},
+        headers={"Accept": "multipart/mixed"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("multipart/mixed")
+    parts = [json.loads(body) for body in re.findall(r"\r\n\r\n(.*?)\r\n---", response.text)]
+    assert len(parts[0]["data"]["collections"][0]["artworks"]) == 2
+    assert parts[-1]["hasNext"] is False
@@ -0,0 +1,294 @@
+"""Tests for recording and reporting AI token usage."""
+
+import asyncio
+import os
+import threading
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+
+from app.ai_service import (  # noqa: E402
+    AIService,
+    GeminiProvider,
+    InterpretationError,
+    InterpretationErrorCode,
+    StubProvider,
+    gemini_usage,
+)
+from app.circuit_breaker import CircuitBreaker  # noqa: E402
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.models import AICall, Artist, Artwork  # noqa: E402
+from app.prompts import PromptTemplate  # noqa: E402
+from app.usage import Generation, Usage, UsageLog, format_report, usage_report  # noqa: E402
+
+JPEG = b"\xff\xd8\xff\xe0" + bytes(1020)
+
+
+@pytest.fixture
+def db():
+    init_db()
+    session = SessionLocal()
+    session.query(AICall).delete()
+    session.commit()
+    yield session
+    session.query(AICall).delete()
+    session.commit()
+    session.close()
+
+
+def image_host():
+    client_class = httpx.AsyncClient
+
+    def respond(request):
+        return httpx.Response(200, content=JPEG)
+
+    return patch(
+        "app.ai_service.httpx.AsyncClient",
+        lambda **kwargs: client_class(transport=httpx.MockTransport(respond)),
+    )
+
+
+def make_artwork(artwork_id: int = 7) -> Artwork:
+    return Artwork(id=artwork_id, title="Harbour", image_url="https://example.com/7.jpg")
+
+
+class TestProviderUsage:
+    """Test reading token counts from providers."""
+
+    def test_gemini_usage_metadata(self):
+        metadata = SimpleNamespace(
+            prompt_token_count=1290, candidates_token_count=150, total_token_count=1440
+        )
+
+        assert gemini_usage(metadata) == Usage(1290, 150, 1440)
+        assert gemini_usage(None) is None
+
+    async def test_gemini_provider_reports_model_and_usage(self, monkeypatch):
+        monkeypatch.setenv("GEMINI_API_KEY", "test_key")
+        response = MagicMock()
+        response.text = "A quiet harbour."
+        response.usage_metadata = SimpleNamespace(
+            prompt_token_count=300, candidates_token_count=20, total_token_count=None
+        )
+        client = MagicMock()
+        client.aio.models.generate_content = AsyncMock(return_value=response)
+
+        with patch("app.ai_service.genai.Client", return_value=client):
+            provider = GeminiProvider(model="gemini-test")
+            generation = await provider.generate(JPEG, "image/jpeg", "prompt")
+
+        assert generation == Generation("A quiet harbour.", "gemini-test", Usage(300, 20, 320))
+
+
+class TestRecording:
+    """Test that AIService records every provider call."""
+
+    def service(self, usage: UsageLog, provider=None, **kwargs) -> AIService:
+        prompt = PromptTemplate(version="v9", template="Describe {title}.")
+        return AIService(
+            provider=provider or StubProvider(latency=0), prompt=prompt, usage=usage, **kwargs
+        )
+
+    async def test_successful_call_is_recorded_with_its_usage(self, db):
+        usage = UsageLog(enabled=True, flush_size=100)
+
+        with image_host():
+            text = await self.service(usage).interpret_artwork(make_artwork())
+        assert usage.flush() == 1
+
+        call = db.query(AICall).one()
+        assert text
+        assert (call.artwork_id, call.provider, call.model) == (7, "stub", "stub")
+        assert (call.prompt_version, call.image_bytes, call.error_code) == ("v9", len(JPEG), None)
+        assert call.prompt_hash == PromptTemplate(version="v9", template="Describe {title}.").hash
+        assert call.input_tokens == 258 + len("Describe Harbour.") // 4
+        assert call.total_tokens == call.input_tokens + call.output_tokens
+        assert call.latency_ms >= 0
+
+    async def test_failed_calls_are_recorded_but_open_circuits_are_not(self, db):
+        usage = UsageLog(enabled=True, flush_size=100)
+        provider = MagicMock()
+        provider.name = "gemini"
+        provider.model = "gemini-test"
+        provider.generate = AsyncMock(side_effect=RuntimeError("quota exceeded"))
+        breaker = CircuitBreaker("ai_generation", min_calls=1, window_size=1)
+        service = self.service(usage, provider, generation_breaker=breaker)
+
+        with image_host():
+            for _ in range(2):
+                with pytest.raises(InterpretationError):
+                    await service.interpret_artwork(make_artwork())
+        usage.flush()
+
+        call = db.query(AICall).one()
+        assert call.error_code == InterpretationErrorCode.GENERATION_FAILED.value
+        assert call.model == "gemini-test"
+        assert call.input_tokens is None
+
+    async def test_calls_are_written_in_batches(self, db):
+        usage = UsageLog(enabled=True, flush_size=3)
+
+        with image_host():
+            service = self.service(usage)
+            await service.interpret_artworks([make_artwork(i) for i in range(1, 5)])
+
+        # Three were written together; the fourth waits for the next batch
+        assert db.query(AICall).count() == 3
+        assert usage.pending == 1
+
+    async def test_started_log_writes_on_an_interval(self, db):
+        usage = UsageLog(enabled=True, flush_size=100, flush_seconds=0.05)
+        await usage.start()
+        try:
+            with image_host():
+                await self.service(usage).interpret_artwork(make_artwork())
+            for _ in range(50):
+                if not usage.pending:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await usage.stop()
+
+        assert db.query(AICall).count() == 1
+
+    async def test_started_log_writes_off_the_event_loop(self, db):
+        threads = []
+
+        def session():
+            threads.append(threading.get_ident())
+            return SessionLocal()
+
+        usage = UsageLog(session, enabled=True, flush_size=2, flush_seconds=60)
+        await usage.start()
+        try:
+            with image_host():
+                await self.service(usage).interpret_artworks([make_artwork(i) for i in (1, 2, 3)])
+            for _ in range(50):
+                if threads:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            # Writes the third call, still buffered
+            await usage.stop()
+
+        assert db.query(AICall).count() == 3
+        assert threads and threading.get_ident() not in threads
+
+    def test_failed_write_drops_the_batch(self):
+        def broken_session():
+            raise RuntimeError("database is gone")
+
+        usage = UsageLog(broken_session, enabled=True, flush_size=100)
+        usage.record(
+            artwork_id=1,
+            provider="stub",
+            model="stub",
+            prompt_version="v1",
+            prompt_hash="abc",
+            usage=None,
+            image_bytes=10,
+            latency_ms=1.0,
+        )
+
+        # Accounting never fails the caller
+        assert usage.flush() == 0
+        assert usage.pending == 0
+
+    def test_disabled_log_records_nothing(self):
+        usage = UsageLog(enabled=False)
+        usage.record(
+            artwork_id=1,
+            provider="stub",
+            model="stub",
+            prompt_version="v1",
+            prompt_hash="abc",
+            usage=None,
+            image_bytes=10,
+            latency_ms=1.0,
+        )
+
+        assert usage.pending == 0
+
+
+class TestReport:
+    """Test aggregating recorded calls."""
+
+    @pytest.fixture
+    def calls(self, db):
+        artist = Artist(name="Usage Artist", bio="")
+        db.add(artist)
+        db.flush()
+        artwork = Artwork(
+            title="Harbour", image_url="https://example.com/h.jpg", artist_id=artist.id
+        )
+        db.add(artwork)
+        db.flush()
+        now = datetime.utcnow()
+
+        def call(artwork_id, model, version, tokens, latency_ms, error_code=None, age_days=0):
+            db.add(
+                AICall(
+                    artwork_id=artwork_id,
+                    provider="gemini",
+                    model=model,
+                    prompt_version=version,
+                    prompt_hash=f"{version}-hash",
+                    input_tokens=tokens and tokens - 100,
+                    output_tokens=tokens and 100,
+                    total_tokens=tokens,
+                    image_bytes=2048,
+                    latency_ms=latency_ms,
+                    error_code=error_code,
+                    called_at=now - timedelta(days=age_days),
+                )
+            )
+
+        call(artwork.id, "flash", "v1", 1400, 900.0)
+        call(artwork.id, "flash", "v1", 1200, 700.0)
+        call(artwork.id, "flash", "v2", None, 20000.0, error_code="TIMEOUT")
+        call(999, "flash-lite", "v2", 600, 300.0)
+        call(999, "flash-lite", "v2", 600, 300.0, age_days=30)
+        db.commit()
+        yield artwork
+        db.delete(artwork)
+        db.delete(artist)
+        db.commit()
+
+    def test_groups_by_artwork_most_expensive_first(self, db, calls):
+        first, second = usage_report(db, ["artwork"])
+
+        assert first.key == (f"{calls.id} Harbour",)
+        assert (first.calls, first.failures, first.total_tokens) == (3, 1, 2600)
+        assert first.avg_input_tokens == 1200.0
+        assert first.avg_latency_ms == 7200.0
+        assert first.max_latency_ms == 20000.0
+        assert first.avg_image_kb == 2.0
+        # Reseeded or deleted artworks keep their rows, shown by ID alone
+        assert second.key == ("999",)
+
+    def test_groups_by_several_dimensions_since_a_time(self, db, calls):
+        since = datetime.utcnow() - timedelta(days=7)
+        rows = usage_report(db, ["model", "prompt"], since=since)
+
+        assert [(row.key, row.calls, row.total_tokens) for row in rows] == [
+            (("gemini", "flash", "v1", "v1-hash"), 2, 2600),
+            (("gemini", "flash-lite", "v2", "v2-hash"), 1, 600),
+            (("gemini", "flash", "v2", "v2-hash"), 1, 0),
+        ]
+
+    def test_formats_a_table(self, db, calls):
+        table = format_report(usage_report(db, ["model"], limit=1), ["model"])
+
+        header, row = table.splitlines()
+        assert header.split()[:4] == ["provider", "model", "calls", "fails"]
+        assert row.split()[:5] == ["gemini", "flash", "3", "1", "2400"]
+
+    def test_unknown_dimension_is_rejected(self, db):
+        with pytest.raises(ValueError, match="Unknown usage dimension 'colour'"):
+            usage_report(db, ["colour"])
@@ -0,0 +1,221 @@
+"""Tests for interpretation variant pools."""
+
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+
+from app.ai_service import InterpretationError, InterpretationErrorCode
+from app.database import SessionLocal, init_db
+from app.interpretation_cache import interpretation_cache
+from app.models import AIInterpretation, Artist, Artwork, Collection
+from app.pregenerate import pregenerate
+from app.prompts import get_prompt
+from app.repository import InterpretationRepository
+from app.schema import schema
+from app.variants import VariantPool
+
+ARTWORK_INTERPRETATION = """
+    query ArtworkInterpretation($artworkId: String!) {
+        artworkInterpretation(artworkId: $artworkId) { id content errorCode }
+    }
+"""
+
+
+@pytest.fixture
+def artwork_id():
+    """One artwork in the test database, without interpretations."""
+    init_db()
+    interpretation_cache.clear()
+    db = SessionLocal()
+    try:
+        db.query(AIInterpretation).delete()
+        db.query(Artwork).delete()
+        db.query(Collection).delete()
+        db.query(Artist).delete()
+        artist = Artist(name="Test Artist", bio="Paints outdoors.")
+        db.add(artist)
+        db.flush()
+        artwork = Artwork(
+            title="Test Artwork", image_url="https://example.com/1.jpg", artist_id=artist.id
+        )
+        db.add(artwork)
+        db.commit()
+        return artwork.id
+    finally:
+        db.close()
+
+
+def make_ai_service(*results):
+    """AI service double returning "Note 1", "Note 2", ... (or the given results)."""
+    ai_service = MagicMock()
+    ai_service.prompt = get_prompt()
+    outcomes = list(results) or [f"Note {n}" for n in range(1, 100)]
+    ai_service.interpret_artwork = AsyncMock(side_effect=outcomes)
+    return ai_service
+
+
+def store_variants(artwork_id, *contents, prompt_hash=None):
+    db = SessionLocal()
+    try:
+        repo = InterpretationRepository(db)
+        for content in contents:
+            repo.add(artwork_id, content, prompt_hash=prompt_hash or get_prompt().hash)
+        db.commit()
+    finally:
+        db.close()
+
+
+def stored_contents(artwork_id) -> list[str]:
+    db = SessionLocal()
+    try:
+        variants = InterpretationRepository(db).get_variants(artwork_id, get_prompt().hash)
+        return sorted(variant.content for variant in variants)
+    finally:
+        db.close()
+
+
+class TestVariantPool:
+    """Test serving and replenishing variants."""
+
+    async def test_rotates_stored_variants_without_provider_calls(self, artwork_id):
+        """A full pool is served round-robin from memory."""
+        store_variants(artwork_id, "A", "B", "C")
+        store_variants(artwork_id, "Old prompt", prompt_hash="oldhash")
+        ai_service = make_ai_service()
+        pool = VariantPool(ai_service=ai_service, pool_size=3, max_serves=10)
+
+        db = SessionLocal()
+        try:
+            served = [pool.next(db, artwork_id).content for _ in range(6)]
+        finally:
+            db.close()
+
+        assert served == ["A", "B", "C", "A", "B", "C"]
+        ai_service.interpret_artwork.assert_not_called()
+
+    async def test_empty_pool_is_filled_in_background(self, artwork_id):
+        """The first view generates one variant; the rest of the pool follows."""
+        pool = VariantPool(ai_service=make_ai_service(), pool_size=3, max_serves=10)
+        db = SessionLocal()
+        try:
+            assert pool.next(db, artwork_id) is None
+            artwork = db.get(Artwork, artwork_id)
+            first = await pool.generate(artwork)
+            await pool.drain()
+            pool.next(db, artwork_id)
+            await pool.drain()
+        finally:
+            db.close()
+
+        assert first.content == "Note 1"
+        assert stored_contents(artwork_id) == ["Note 1", "Note 2", "Note 3"]
+
+    async def test_worn_variant_is_replaced(self, artwork_id):
+        """After max_serves, the most-served variant is swapped for a new one."""
+        store_variants(artwork_id, "A", "B")
+        pool = VariantPool(ai_service=make_ai_service("Fresh"), pool_size=2, max_serves=2)
+
+        db = SessionLocal()
+        try:
+            served = [pool.next(db, artwork_id).content for _ in range(3)]
+            await pool.drain()
+            served += [pool.next(db, artwork_id).content for _ in range(2)]
+        finally:
+            db.close()
+
+        # "A" reached two serves on the third request and was retired
+        assert served == ["A", "B", "A", "B", "Fresh"]
+        assert stored_contents(artwork_id) == ["B", "Fresh"]
+
+    async def test_failed_replenishment_backs_off(self, artwork_id):
+        """A provider failure is not retried on every serve."""
+        store_variants(artwork_id, "A")
+        error = InterpretationError("Circuit open", InterpretationErrorCode.CIRCUIT_OPEN)
+        ai_service = make_ai_service(error, "Unused")
+        pool = VariantPool(ai_service=ai_service, pool_size=2, max_serves=10)
+
+        db = SessionLocal()
+        try:
+            for _ in range(3):
+                pool.next(db, artwork_id)
+                await pool.drain()
+        finally:
+            db.close()
+
+        assert ai_service.interpret_artwork.call_count == 1
+        assert stored_contents(artwork_id) == ["A"]
+
+    async def test_read_only_pool_keeps_new_variants_in_memory(self, artwork_id):
+        """Edge instances serve new variants without writing them."""
+        store_variants(artwork_id, "A")
+        pool = VariantPool(
+            ai_service=make_ai_service("Fresh"), pool_size=2, max_serves=10, read_only=True
+        )
+
+        db = SessionLocal()
+        try:
+            pool.next(db, artwork_id)
+            await pool.drain()
+            served = [pool.next(db, artwork_id) for _ in range(2)]
+        finally:
+            db.close()
+
+        assert [variant.content for variant in served] == ["Fresh", "A"]
+        assert served[0].id < 0
+        assert stored_contents(artwork_id) == ["A"]
+
+
+class TestArtworkInterpretationQuery:
+    """Test the artworkInterpretation GraphQL field."""
+
+    async def test_serves_variants_in_rotation(self, artwork_id):
+        """Repeat views get different stored notes."""
+        store_variants(artwork_id, "A", "B")
+        pool = VariantPool(ai_service=make_ai_service(), pool_size=2)
+        db = SessionLocal()
+        try:
+            results = [
+                await schema.execute(
+                    ARTWORK_INTERPRETATION,
+                    variable_values={"artworkId": str(artwork_id)},
+                    context_value={"db": db, "variant_pool": pool},
+                )
+                for _ in range(2)
+            ]
+        finally:
+            db.close()
+
+        assert [r.data["artworkInterpretation"]["content"] for r in results] == ["A", "B"]
+
+    async def test_generation_failure_without_variants_is_an_error(self, artwork_id):
+        """With no variant and no fallback, the error code is reported."""
+        error = InterpretationError("Timed out", InterpretationErrorCode.TIMEOUT)
+        pool = VariantPool(ai_service=make_ai_service(error))
+        db = SessionLocal()
+        try:
+            result = await schema.execute(
+                ARTWORK_INTERPRETATION,
+                variable_values={"artworkId": str(artwork_id)},
+                context_value={"db": db, "variant_pool": pool},
+            )
+        finally:
+            db.close()
+
+        assert result.data["artworkInterpretation"] is None
+        assert result.errors[0].extensions["code"] == "TIMEOUT"
+
+
+async def test_pregenerate_tops_up_variants(artwork_id):
+    """--variants generates only the missing variants for the active prompt."""
+    store_variants(artwork_id, "A")
+    ai_service = make_ai_service()
+
+    with patch("app.pregenerate.AIService", return_value=ai_service):
+        stored = await pregenerate(variants=3)
+
+    assert stored == 2
+    assert stored_contents(artwork_id) == ["A", "Note 1", "Note 2"]
@@ -0,0 +1,131 @@
+"""Tests for the startup warmup."""
+
+import os
+from datetime import datetime
+
+# Set test database URL before importing app modules
+os.environ["DATABASE_URL"] = "sqlite:///./test_gallery.db"
+
+from app import warmup
+from app.database import SessionLocal, init_db
+from app.interpretation_cache import CachedInterpretation, interpretation_cache
+from app.models import AIInterpretation, Artist, Artwork, Collection
+from app.warmup import Readiness, warm_up
+
+
+def seed_artwork_with_interpretation() -> int:
+    init_db()
+    db = SessionLocal()
+    try:
+        db.query(AIInterpretation).delete()
+        db.query(Artwork).delete()
+        db.query(Collection).delete()
+        db.query(Artist).delete()
+        artist = Artist(name="Test Artist", bio="Paints outdoors.")
+        collection = Collection(title="Test Collection", description=None)
+        db.add_all([artist, collection])
+        db.flush()
+        artwork = Artwork(
+            title="Test Artwork",
+            image_url="https://example.com/1.jpg",
+            artist_id=artist.id,
+            collection_id=collection.id,
+        )
+        db.add(artwork)
+        db.flush()
+        db.add(
+            AIInterpretation(
+                artwork_id=artwork.id,
+                content="Stored note.",
+                context=f"artwork:{artwork.id}",
+                generated_at=datetime(2025, 1, 1),
+            )
+        )
+        db.commit()
+        return artwork.id
+    finally:
+        db.close()
+
+
+async def test_warmup_preloads_interpretations():
+    """Stored interpretations are in the fallback cache once warmup is ready."""
+    artwork_id = seed_artwork_with_interpretation()
+    interpretation_cache.clear()
+    state = Readiness()
+
+    await warm_up(state)
+
+    assert state.ready
+    assert list(state.steps) == list(warmup.STEPS)
+    assert interpretation_cache.get(artwork_id).content == "Stored note."
+
+
+async def test_warmup_keeps_live_interpretations():
+    """A live interpretation cached before warmup finishes is not replaced."""
+    artwork_id = seed_artwork_with_interpretation()
+    interpretation_cache.clear()
+    live = CachedInterpretation("ephemeral-1", artwork_id, "Live note.", datetime.now())
+    interpretation_cache.put(live)
+
+    await warm_up(Readiness())
+
+    assert interpretation_cache.get(artwork_id) is live
+
+
+async def test_failed_step_reports_not_ready(monkeypatch):
+    """A failing step leaves the process not ready, with the reason."""
+
+    def broken():
+        raise RuntimeError("database unreachable")
+
+    monkeypatch.setitem(warmup.STEPS, "pool_connections", broken)
+    monkeypatch.setattr(warmup, "WARMUP_RETRY_SECONDS", 0)
+    state = Readiness()
+
+    await warm_up(state)
+
+    assert not state.ready
+    assert state.as_dict() == {
+        "status": "failed",
+        "steps_ms": {},
+        "error": "pool_connections: database unreachable",
+    }
+
+
+async def test_failed_step_is_retried_before_warmup_fails(monkeypatch):
+    """A brief outage at boot only delays readiness."""
+    calls = []
+
+    def flaky():
+        calls.append(len(calls))
+        if len(calls) < 3:
+            raise RuntimeError("connection refused")
+
+    monkeypatch.setitem(warmup.STEPS, "pool_connections", flaky)
+    monkeypatch.setattr(warmup, "WARMUP_RETRY_SECONDS", 0)
+    seed_artwork_with_interpretation()
+    state = Readiness()
+
+    await warm_up(state)
+
+    assert state.ready
+    assert "error" not in state.as_dict()
+    assert len(calls) == 3
+
+
+async def test_gives_up_after_the_last_attempt(monkeypatch):
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise RuntimeError("database unreachable")
+
+    monkeypatch.setitem(warmup.STEPS, "pool_connections", broken)
+    monkeypatch.setattr(warmup, "WARMUP_ATTEMPTS", 3)
+    monkeypatch.setattr(warmup, "WARMUP_RETRY_SECONDS", 0)
+    state = Readiness()
+
+    await warm_up(state)
+
+    assert state.status == "failed"
+    assert len(calls) == 3